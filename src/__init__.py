@@ -55,6 +55,8 @@ def unregister():
         PANEL_EXTENSIONS_TO_REGISTER,
         PROPERTIES_TO_REGISTER,
     )
+    from .api import shutdown_api_executor
+    from .api.http import CONNECTION_POOL
 
     for cls in CLASSES_TO_REGISTER:
         if cls in PROPERTIES_TO_REGISTER:
@@ -70,6 +72,9 @@ def unregister():
     for load_post_handler in LOAD_POST_HANDLERS_TO_REGISTER:
         bpy.app.handlers.load_post.remove(load_post_handler)
 
+    shutdown_api_executor()
+    CONNECTION_POOL.close_all()
+
 
 def reload_addon():
     module_prefix = f"{__name__}."
@@ -1,2 +1,6 @@
+from .async_client import *
 from .client import *
+from .keyframes import *
+from .metrics import *
 from .models import *
+from .session import *
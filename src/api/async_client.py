@@ -0,0 +1,57 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import wraps
+from typing import Any, Callable
+
+from bpy.types import Context
+
+from .client import APIClient
+
+_api_executor: ThreadPoolExecutor | None = None
+
+
+def get_api_executor() -> ThreadPoolExecutor:
+    """Returns the worker threads of the API requests. They are started on the first use,
+    so the add-on can be enabled again after unregister shut them down"""
+
+    global _api_executor
+
+    if _api_executor is None:
+        _api_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="outer_scout_api")
+
+    return _api_executor
+
+
+def shutdown_api_executor():
+    global _api_executor
+
+    if _api_executor is not None:
+        _api_executor.shutdown(wait=False, cancel_futures=True)
+        _api_executor = None
+
+
+class AsyncAPIClient:
+    """Wraps APIClient so that every public method is called on a worker thread and returns a Future of its Result.
+
+    Arguments are used on the worker thread, so they shouldn't reference Blender data
+    (for example, post_texture_recorder should be called on the main thread)"""
+
+    client: APIClient
+
+    def __init__(self, client: APIClient):
+        self.client = client
+
+    @staticmethod
+    def from_context(context: Context) -> "AsyncAPIClient":
+        return AsyncAPIClient(APIClient.from_context(context))
+
+    def __getattr__(self, name: str) -> Callable[..., Future]:
+        method = getattr(self.client, name)
+
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(f"{self.__class__.__name__} can only call public {APIClient.__name__} methods")
+
+        @wraps(method)
+        def submit(*args: Any, **kwargs: Any) -> Future:
+            return get_api_executor().submit(method, *args, **kwargs)
+
+        return submit
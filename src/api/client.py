@@ -1,13 +1,21 @@
-from typing import Any, Literal, Never
+import json
+import random
+from contextlib import contextmanager
+from dataclasses import replace
+from http import HTTPStatus
+from time import perf_counter, sleep, time
+from typing import Any, Generator, Iterator, Literal, Never
 
 from bpy.types import Context
 
 from ..properties import OuterScoutPreferences, TextureRecordingProperties
-from ..utils import Result
-from .http import Request, Response
+from ..utils import Result, iter_json_object
+from .http import Request, RequestTimeout, Response, StreamedResponse, TransferSize
+from .metrics import API_METRICS, RequestSample, route_template
 from .models import (
     ActiveCameraJson,
     ApiVersionJson,
+    BatchRequestJson,
     CameraJson,
     ColorTextureRecorderJson,
     EnvironmentJson,
@@ -21,22 +29,51 @@ from .models import (
     PostRecordingJson,
     PostSceneJson,
     ProblemJson,
+    PutColumnarKeyframesJson,
     PutKeyframesJson,
     RecordingStatusJson,
     Transform,
     TransformRecorderJson,
 )
+from .session import APISession
 
 ACCEPTED_API_VERSION = (0, 1)
 
 
+BATCH_FEATURE = "batch"
+
+GZIP_FEATURE = "gzip"
+
+GZIP_REQUEST_THRESHOLD = 16 * 1024
+
+RouteClass = Literal["poll", "default", "long"]
+
+RETRYABLE_METHODS = frozenset(("GET", "PUT", "DELETE"))
+
+RETRYABLE_STATUSES = frozenset((HTTPStatus.BAD_GATEWAY, HTTPStatus.SERVICE_UNAVAILABLE, HTTPStatus.GATEWAY_TIMEOUT))
+
+RETRY_BACKOFF_BASE = 0.1
+
+
 class APIClient:
     base_url: str
-    api_version: tuple[int, int] | None
+    session: APISession
+    timeouts: dict[RouteClass, RequestTimeout]
+    max_retries: int
+
+    _batch: "APIBatch | None"
 
     def __init__(self, preferences: OuterScoutPreferences):
         self.base_url = f"http://localhost:{preferences.api_port}/"
-        self.api_version = None
+        self.session = APISession.of_port(preferences.api_port)
+        self.session.get_cache.ttl = preferences.api_cache_ttl
+        self.timeouts = {
+            "poll": RequestTimeout(connect=preferences.api_connect_timeout, read=preferences.api_poll_timeout),
+            "default": RequestTimeout(connect=preferences.api_connect_timeout, read=preferences.api_request_timeout),
+            "long": RequestTimeout(connect=preferences.api_connect_timeout, read=preferences.api_long_request_timeout),
+        }
+        self.max_retries = preferences.api_max_retries
+        self._batch = None
 
     @staticmethod
     def from_context(context: Context) -> "APIClient":
@@ -45,30 +82,56 @@ class APIClient:
     def get_api_version(self) -> Result[ApiVersionJson, str]:
         return self._get("api/version", assert_compat=False).bind(self._parse_json_response)
 
+    @property
+    def api_version(self) -> tuple[int, int] | None:
+        return self.session.api_version
+
     def assert_compatability(self):
         get_version_error: str | None = None
 
-        if self.api_version is None:
+        if self.session.api_version is None:
             get_version_result = self.get_api_version()
             if get_version_result.is_ok:
                 api_version = get_version_result.unwrap()
-                self.api_version = (api_version["major"], api_version["minor"])
+                self.session.api_version = (api_version["major"], api_version["minor"])
+                self.session.features = frozenset(api_version.get("features", ()))
             else:
                 get_version_error = get_version_result.unwrap_error()
 
-        is_api_supported = self.api_version is not None and (
-            self.api_version[0] == ACCEPTED_API_VERSION[0] and self.api_version[1] >= ACCEPTED_API_VERSION[1]
+        api_version = self.session.api_version
+        is_api_supported = api_version is not None and (
+            api_version[0] == ACCEPTED_API_VERSION[0] and api_version[1] >= ACCEPTED_API_VERSION[1]
         )
 
         if not is_api_supported:
             raise AssertionError(
                 f"versions of Outer Scout mod and addon are incompatible. Please, update the addon to support version {ACCEPTED_API_VERSION[0]}.{ACCEPTED_API_VERSION[1]}.x"
-                if self.api_version is not None
+                if api_version is not None
                 else get_version_error
             )
 
+    def supports(self, feature: str) -> bool:
+        self.assert_compatability()
+        return feature in self.session.features
+
+    @contextmanager
+    def batch(self) -> Generator["APIBatch", None, None]:
+        """Queues all write requests made inside the context and sends them in one round trip on exit.
+        Queued requests immediately return Ok(None), the actual results are in the APIBatch object"""
+
+        if self._batch is not None:
+            raise ValueError(f"{self.__class__.__name__} batch is already started")
+
+        batch = self._batch = APIBatch(self)
+        try:
+            yield batch
+        finally:
+            self._batch = None
+
+        batch.flush()
+
     def get_environment(self) -> Result[EnvironmentJson, str]:
-        return self._get("environment").bind(self._parse_json_response)
+        return self._get("environment", cached=True).bind(self._parse_json_response)
 
     def post_scene(self, scene: PostSceneJson) -> Result[Never, str]:
         return self._post("scene", data=scene)
@@ -80,7 +143,19 @@ class APIClient:
         return self._post("scene/recording", data=recording)
 
     def get_recording_status(self) -> Result[RecordingStatusJson, str]:
-        return self._get("scene/recording/status").bind(self._parse_json_response)
+        return self._get("scene/recording/status", route_class="poll").bind(self._parse_json_response)
+
+    def wait_recording_status(self, *, frames_recorded: int, timeout: float) -> Result[RecordingStatusJson, str]:
+        """Long-polling variant of get_recording_status. The API responds when the number of recorded frames
+        differs from the given one, when the recording ends, or after the timeout"""
+        poll_timeout = self.timeouts["poll"]
+
+        return self._get_response(
+            route="scene/recording/status",
+            method="GET",
+            query={"framesRecorded": str(frames_recorded), "timeout": str(timeout)},
+            timeout=replace(poll_timeout, read=poll_timeout.read + timeout),
+        ).bind(self._parse_json_response)
 
     def get_active_camera(self) -> Result[ActiveCameraJson, str]:
         return self._get("scene/active-camera").bind(self._parse_json_response)
@@ -103,15 +178,39 @@ class APIClient:
     ) -> Result[ObjectMeshJson, str]:
         return self._get(
             f"objects/{name}/mesh",
-            query={
-                "ignorePaths": ",".join(ignore_paths),
-                "ignoreLayers": ",".join(ignore_layers),
-                "caseSensitive": str(case_sensitive).lower(),
-            },
+            query=self._object_mesh_query(ignore_paths, ignore_layers, case_sensitive),
+            route_class="long",
         ).bind(self._parse_json_response)
 
+    @contextmanager
+    def stream_object_mesh(
+        self, name: str, *, ignore_paths: list[str], ignore_layers: list[str], case_sensitive: bool
+    ) -> Generator[Result[Iterator[tuple[str, Any]], str], None, None]:
+        """Same as get_object_mesh, but the response is parsed while it's downloaded.
+        Yields an iterator of ("body", MeshBodyJson) and ("sectors", MeshSectorJson) pairs"""
+
+        with self._stream_response(
+            route=f"objects/{name}/mesh",
+            method="GET",
+            query=self._object_mesh_query(ignore_paths, ignore_layers, case_sensitive),
+            timeout=self.timeouts["long"],
+        ) as response_result:
+            yield response_result.map(
+                lambda response: iter_json_object(
+                    response.iter_bytes(), streamed_keys={"sectors"}, encoding=response.charset
+                )
+            )
+
+    @staticmethod
+    def _object_mesh_query(ignore_paths: list[str], ignore_layers: list[str], case_sensitive: bool) -> dict[str, str]:
+        return {
+            "ignorePaths": ",".join(ignore_paths),
+            "ignoreLayers": ",".join(ignore_layers),
+            "caseSensitive": str(case_sensitive).lower(),
+        }
+
     def get_camera(self, object_name: str) -> Result[CameraJson, str]:
-        return self._get(f"objects/{object_name}/camera").bind(self._parse_json_response)
+        return self._get(f"objects/{object_name}/camera", cached=True).bind(self._parse_json_response)
 
     def put_camera(self, *, object_name: str, perspective: PerspectiveJson | None = None):
         return self._put(f"objects/{object_name}/camera", data={"perspective": perspective})
@@ -123,12 +222,17 @@ class APIClient:
         return self._post(f"objects/{object_name}/camera", data={**json, "type": "equirectangular"})
 
     def post_texture_recorder(
-        self, object_name: str, texture_type: Literal["color", "depth"], texture_props: TextureRecordingProperties
+        self,
+        object_name: str,
+        texture_type: Literal["color", "depth"],
+        texture_props: TextureRecordingProperties,
+        *,
+        output_path: str | None = None,
     ):
         json: ColorTextureRecorderJson = {
             "property": f"camera.renderTexture.{texture_type}",
             "format": "mp4",
-            "outputPath": texture_props.absolute_recording_path,
+            "outputPath": output_path or texture_props.absolute_recording_path,
             "constantRateFactor": texture_props.constant_rate_factor,
         }
         return self._post(f"objects/{object_name}/recorders", data=json)
@@ -136,17 +240,17 @@ class APIClient:
     def post_transform_recorder(self, object_name: str, json: TransformRecorderJson):
         return self._post(f"objects/{object_name}/recorders", data={**json, "property": "transform"})
 
-    def put_scene_keyframes(self, json: PutKeyframesJson):
-        return self._put(f"scene/keyframes", data=json)
+    def put_scene_keyframes(self, json: PutKeyframesJson | PutColumnarKeyframesJson):
+        return self._put(f"scene/keyframes", data=json, route_class="long")
 
-    def put_object_keyframes(self, object_name: str, json: PutKeyframesJson):
-        return self._put(f"objects/{object_name}/keyframes", data=json)
+    def put_object_keyframes(self, object_name: str, json: PutKeyframesJson | PutColumnarKeyframesJson):
+        return self._put(f"objects/{object_name}/keyframes", data=json, route_class="long")
 
     def get_ground_body(self) -> Result[GroundBodyJson, str]:
-        return self._get("player/ground-body").bind(self._parse_json_response)
+        return self._get("player/ground-body", cached=True).bind(self._parse_json_response)
 
     def get_player_sectors(self) -> Result[PlayerSectorListJson, str]:
-        return self._get("player/sectors").bind(self._parse_json_response)
+        return self._get("player/sectors", cached=True).bind(self._parse_json_response)
 
     def warp_player(self, *, ground_body: str, local_transform: Transform) -> Result[Never, str]:
         return self._post(
@@ -162,42 +266,344 @@ class APIClient:
         data: Any | None = None,
         query: dict[str, str] | None = None,
         assert_compat=True,
+        timeout: RequestTimeout | None = None,
     ) -> Response:
         if assert_compat:
             self.assert_compatability()
 
-        request = Request(url=self.base_url + route, method=method, data=data, query_params=query)
+        if self._batch is not None and method != "GET":
+            self._batch.add(route=route, method=method, data=data, query=query, timeout=timeout)
+            return None
+
+        if method != "GET":
+            self.session.get_cache.invalidate()
+
+        circuit_breaker = self.session.circuit_breaker
+        if not circuit_breaker.allow_request():
+            Result.do_error(self._circuit_open_error())
+
+        request = Request(
+            url=self.base_url + route,
+            method=method,
+            data=data,
+            query_params=query,
+            compress_threshold=GZIP_REQUEST_THRESHOLD if GZIP_FEATURE in self.session.features else None,
+            timeout=timeout or self.timeouts["default"],
+        )
+
+        start_time = perf_counter()
+        response, retries = self._send_with_retries(
+            request, max_retries=self.max_retries if method in RETRYABLE_METHODS else 0
+        )
+        self._record_sample(method, route, start_time, response, retries=retries)
 
-        response = request.send()
         if response is None:
-            Result.do_error(
-                f"couldn't get a response from the Outer Scout API. Make sure that it's available at {self.base_url}"
-            )
+            circuit_breaker.record_failure()
+            self.session.reset()
+            Result.do_error(self._unreachable_error())
+
+        circuit_breaker.record_success()
 
         if response.is_error:
-            Result.do_error(
-                response.json(ProblemJson)
-                .map(
-                    lambda p: (f"[{p['type']}]" if "title" not in p else p["title"])
-                    + (f": {p['detail']}" if "detail" in p else "")
-                )
-                .unwrap_or_else(lambda _: f"Outer Scout API error: {response.body}")
-            )
+            Result.do_error(self._format_error_response(response))
 
         return response
 
+    @staticmethod
+    def _send_with_retries(request: Request, *, max_retries: int) -> tuple[Response | None, int]:
+        """Sends the request again if the mod is unreachable or temporarily unavailable.
+        The attempts share the read timeout of the request, so a request that timed out isn't sent again.
+        Returns the last response and the total number of retries"""
+
+        read_timeout = request.timeout.read
+        deadline = perf_counter() + read_timeout if read_timeout is not None else None
+        retries = 0
+
+        for attempt in range(max_retries + 1):
+            response = request.send()
+            retries += response.retries if response is not None else 0
+
+            if attempt == max_retries or (response is not None and response.status not in RETRYABLE_STATUSES):
+                break
+
+            # jitter prevents the retries of parallel requests from hitting the mod at the same time
+            backoff = RETRY_BACKOFF_BASE * 2**attempt * random.uniform(0.5, 1.5)
+
+            if deadline is not None:
+                remaining_time = deadline - perf_counter() - backoff
+                if remaining_time <= 0:
+                    break
+
+                request = replace(request, timeout=replace(request.timeout, read=remaining_time))
+
+            sleep(backoff)
+            retries += 1
+
+        if response is not None:
+            response = replace(response, retries=retries)
+
+        return response, retries
+
+    @contextmanager
+    def _stream_response(
+        self,
+        *,
+        route: str,
+        method: str,
+        query: dict[str, str] | None = None,
+        timeout: RequestTimeout | None = None,
+    ) -> Generator[Result[StreamedResponse, str], None, None]:
+        try:
+            self.assert_compatability()
+        except AssertionError as assertion_error:
+            yield Result.error(str(assertion_error))
+            return
+
+        circuit_breaker = self.session.circuit_breaker
+        if not circuit_breaker.allow_request():
+            yield Result.error(self._circuit_open_error())
+            return
+
+        request = Request(
+            url=self.base_url + route, method=method, query_params=query, timeout=timeout or self.timeouts["default"]
+        )
+
+        start_time = perf_counter()
+
+        with request.stream() as response:
+            if response is None:
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.record_success()
+
+            try:
+                if response is None:
+                    self.session.reset()
+                    yield Result.error(self._unreachable_error())
+                elif response.is_error:
+                    yield Result.error(self._format_error_response(response.read()))
+                elif not response.is_json:
+                    yield Result.error("API internal json error: http response is not json")
+                else:
+                    yield Result.ok(response)
+            finally:
+                self._record_sample(method, route, start_time, response)
+
+    @staticmethod
+    def _record_sample(
+        method: str,
+        route: str,
+        start_time: float,
+        response: Response | StreamedResponse | None,
+        *,
+        retries: int | None = None,
+    ):
+        API_METRICS.record(
+            RequestSample(
+                time=time(),
+                method=method,
+                route=route_template(route),
+                status=int(response.status) if response is not None else None,
+                latency=perf_counter() - start_time,
+                sent=response.sent if response is not None else TransferSize(),
+                received=response.received if response is not None else TransferSize(),
+                retries=retries if retries is not None else response.retries if response is not None else 0,
+            )
+        )
+
+    def _unreachable_error(self) -> str:
+        return f"couldn't get a response from the Outer Scout API. Make sure that it's available at {self.base_url}"
+
+    def _circuit_open_error(self) -> str:
+        return (
+            f"the Outer Scout API at {self.base_url} didn't respond several times in a row."
+            + f" Next attempt in {self.session.circuit_breaker.remaining_cooldown:.1f}s"
+        )
+
+    @staticmethod
+    def _format_error_response(response: Response) -> str:
+        return (
+            response.json(ProblemJson)
+            .map(
+                lambda p: (f"[{p['type']}]" if "title" not in p else p["title"])
+                + (f": {p['detail']}" if "detail" in p else "")
+            )
+            .unwrap_or_else(lambda _: f"Outer Scout API error: {response.body}")
+        )
+
     @staticmethod
     def _parse_json_response(response: Response) -> Result[object, str]:
         return response.json().map_error(lambda e: f"API internal json error: {e}")
 
-    def _get(self, route: str, query: dict[str, str] | None = None, *, assert_compat=True):
-        return self._get_response(route=route, method="GET", query=query, assert_compat=assert_compat)
+    def _get(
+        self,
+        route: str,
+        query: dict[str, str] | None = None,
+        *,
+        assert_compat=True,
+        cached=False,
+        route_class: RouteClass = "default",
+    ):
+        timeout = self.timeouts[route_class]
+
+        if not cached:
+            return self._get_response(
+                route=route, method="GET", query=query, assert_compat=assert_compat, timeout=timeout
+            )
+
+        get_cache = self.session.get_cache
+        cache_key = route + ("?" + "&".join(f"{k}={v}" for k, v in sorted(query.items())) if query else "")
+
+        if (cached_response := get_cache.get(cache_key)) is not None:
+            return Result.ok(cached_response)
+
+        return self._get_response(
+            route=route, method="GET", query=query, assert_compat=assert_compat, timeout=timeout
+        ).map(lambda response: get_cache.put(cache_key, response))
+
+    def _post(self, route: str, data: Any, query: dict[str, str] | None = None, *, route_class: RouteClass = "default"):
+        return self._get_response(
+            route=route, method="POST", data=data, query=query, timeout=self.timeouts[route_class]
+        )
+
+    def _put(
+        self,
+        route: str,
+        data: Any | None = None,
+        query: dict[str, str] | None = None,
+        *,
+        route_class: RouteClass = "default",
+    ):
+        return self._get_response(route=route, method="PUT", data=data, query=query, timeout=self.timeouts[route_class])
+
+    def _delete(
+        self,
+        route: str,
+        data: Any | None = None,
+        query: dict[str, str] | None = None,
+        *,
+        route_class: RouteClass = "default",
+    ):
+        return self._get_response(
+            route=route, method="DELETE", data=data, query=query, timeout=self.timeouts[route_class]
+        )
+
+
+class APIBatch:
+    results: list[Result[Response, str]] | None
+
+    _client: APIClient
+    _requests: list[BatchRequestJson]
+    # timeouts of the route classes of the requests, used when they are sent one by one
+    _timeouts: list[RequestTimeout | None]
+
+    def __init__(self, client: APIClient):
+        self.results = None
+
+        self._client = client
+        self._requests = []
+        self._timeouts = []
+
+    def __len__(self):
+        return len(self._requests)
+
+    @property
+    def result(self) -> Result[list[Response], str]:
+        if self.results is None:
+            return Result.error("batch is not sent")
+
+        responses: list[Response] = []
+
+        for request, result in zip(self._requests, self.results):
+            if result.is_error:
+                return Result.error(f"{request['method']} {request['route']}: {result.unwrap_error()}")
+
+            responses.append(result.unwrap())
+
+        return Result.ok(responses)
+
+    def add(
+        self,
+        *,
+        route: str,
+        method: str,
+        data: Any | None = None,
+        query: dict[str, str] | None = None,
+        timeout: RequestTimeout | None = None,
+    ):
+        if self.results is not None:
+            raise ValueError(f"{self.__class__.__name__} is already sent")
+
+        request: BatchRequestJson = {"method": method, "route": route}
+
+        if data is not None:
+            request["body"] = data
+
+        if query is not None:
+            request["query"] = query
+
+        self._requests.append(request)
+        self._timeouts.append(timeout)
+
+    def flush(self):
+        if self.results is not None:
+            return
+
+        if not self._requests:
+            self.results = []
+        elif self._client.supports(BATCH_FEATURE):
+            self.results = self._send_batched()
+        else:
+            self.results = self._send_sequential()
+
+    def _send_batched(self) -> list[Result[Response, str]]:
+        batch_result = (
+            self._client._post("batch", data={"requests": self._requests}, route_class="long")
+            .bind(self._client._parse_json_response)
+            .map(lambda result: result["responses"])
+        )
+
+        if batch_result.is_error:
+            return [batch_result] * len(self._requests)
+
+        batch_responses: list = batch_result.unwrap()
+        if len(batch_responses) != len(self._requests):
+            return [Result.error("API returned invalid number of batch responses")] * len(self._requests)
+
+        results: list[Result[Response, str]] = []
+
+        for batch_response in batch_responses:
+            has_body = "body" in batch_response
+            response = Response(
+                status=HTTPStatus(batch_response["status"]),
+                content_type="application/json" if has_body else "text/plain",
+                body=json.dumps(batch_response["body"]) if has_body else "",
+            )
+
+            if response.is_error:
+                results.append(Result.error(self._client._format_error_response(response)))
+            else:
+                results.append(Result.ok(response))
+
+        return results
+
+    def _send_sequential(self) -> list[Result[Response, str]]:
+        results: list[Result[Response, str]] = []
+
+        for request, timeout in zip(self._requests, self._timeouts):
+            result = self._client._get_response(
+                route=request["route"],
+                method=request["method"],
+                data=request.get("body"),
+                query=request.get("query"),
+                timeout=timeout,
+            )
 
-    def _post(self, route: str, data: Any, query: dict[str, str] | None = None):
-        return self._get_response(route=route, method="POST", data=data, query=query)
+            results.append(result)
 
-    def _put(self, route: str, data: Any | None = None, query: dict[str, str] | None = None):
-        return self._get_response(route=route, method="PUT", data=data, query=query)
+            # requests in the batch might depend on each other, so it's useless to continue
+            if result.is_error:
+                results += [Result.error("previous request in batch failed")] * (len(self._requests) - len(results))
+                break
 
-    def _delete(self, route: str, data: Any | None = None, query: dict[str, str] | None = None):
-        return self._get_response(route=route, method="DELETE", data=data, query=query)
+        return results
@@ -1,2 +1,4 @@
+from .circuit_breaker import *
+from .connection_pool import *
 from .request import *
 from .response import *
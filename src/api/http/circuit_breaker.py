@@ -0,0 +1,56 @@
+from threading import Lock
+from time import monotonic
+
+
+class CircuitBreaker:
+    """Fails fast after repeated connection failures, so that an unreachable server
+    doesn't block every request for the whole timeout. After the cooldown one request
+    is let through to check if the server is back, the others fail fast until it completes"""
+
+    failure_threshold: int
+    cooldown: float
+
+    _failure_count: int
+    _open_until: float | None
+    _probe_in_flight: bool
+    _lock: Lock
+
+    def __init__(self, *, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._failure_count = 0
+        self._open_until = None
+        self._probe_in_flight = False
+        self._lock = Lock()
+
+    @property
+    def remaining_cooldown(self) -> float:
+        with self._lock:
+            return max(0, self._open_until - monotonic()) if self._open_until is not None else 0
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._open_until is None:
+                return True
+
+            if self._probe_in_flight or monotonic() < self._open_until:
+                return False
+
+            # half-open: only the probe is sent, its failure opens the circuit again
+            self._probe_in_flight = True
+            self._failure_count = self.failure_threshold - 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failure_count = 0
+            self._open_until = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._probe_in_flight = False
+            self._failure_count += 1
+            if self._failure_count >= self.failure_threshold:
+                self._open_until = monotonic() + self.cooldown
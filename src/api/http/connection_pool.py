@@ -0,0 +1,55 @@
+from http.client import HTTPConnection
+from threading import Lock
+
+ConnectionKey = tuple[str, int]
+
+
+class ConnectionPool:
+    max_idle_per_host: int
+
+    _idle_connections: dict[ConnectionKey, list[HTTPConnection]]
+    _lock: Lock
+
+    def __init__(self, *, max_idle_per_host=4):
+        self.max_idle_per_host = max_idle_per_host
+
+        self._idle_connections = {}
+        self._lock = Lock()
+
+    def acquire(self, host: str, port: int) -> tuple[HTTPConnection, bool]:
+        """Returns an idle connection to the host if there is one, otherwise creates a new one.
+        The second element is True if the connection was reused and might be stale"""
+
+        with self._lock:
+            idle_connections = self._idle_connections.get((host, port))
+            if idle_connections:
+                return idle_connections.pop(), True
+
+        return HTTPConnection(host, port), False
+
+    def release(self, connection: HTTPConnection):
+        key = (connection.host, connection.port)
+
+        with self._lock:
+            idle_connections = self._idle_connections.setdefault(key, [])
+            if len(idle_connections) < self.max_idle_per_host:
+                idle_connections.append(connection)
+                return
+
+        connection.close()
+
+    def discard(self, connection: HTTPConnection):
+        connection.close()
+
+    def close_all(self):
+        with self._lock:
+            idle_connections = [
+                connection for connections in self._idle_connections.values() for connection in connections
+            ]
+            self._idle_connections.clear()
+
+        for connection in idle_connections:
+            connection.close()
+
+
+CONNECTION_POOL = ConnectionPool()
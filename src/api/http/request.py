@@ -1,18 +1,42 @@
+import gzip
 import json
-import urllib
-import urllib.error
 import urllib.parse
-import urllib.request
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from http import HTTPStatus
-from typing import Any, Literal
+from http.client import HTTPConnection, HTTPException
+from typing import Any, Generator, Literal
 from urllib.parse import quote as url_encode
-from urllib.request import Request as UrllibRequest
 
-from .response import Response
+from .connection_pool import CONNECTION_POOL, ConnectionPool
+from .response import RESPONSE_READ_ERRORS, Response, StreamedResponse, TransferSize
 
 HTTPMethod = Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
 
+STALE_CONNECTION_ERRORS = (ConnectionResetError, ConnectionAbortedError, BrokenPipeError, HTTPException)
+
+# methods that can be sent again after the server might have received them
+IDEMPOTENT_METHODS = frozenset(("GET", "PUT", "DELETE"))
+
+
+@dataclass(frozen=True)
+class RequestTimeout:
+    """Timeouts in seconds. None means that the request waits forever"""
+
+    connect: float | None = None
+    read: float | None = None
+
+
+@dataclass(frozen=True)
+class EncodedRequest:
+    host: str
+    port: int
+    method: str
+    path: str
+    body: bytes | None
+    headers: dict[str, str]
+    sent: TransferSize
+    timeout: RequestTimeout
+
 
 @dataclass(frozen=True)
 class Request:
@@ -22,41 +46,92 @@ class Request:
     data_as_json = True
     query_params: dict[str, str] | None = None
     headers: dict[str, str] = field(default_factory=dict)
+    compress_threshold: int | None = None
+    timeout: RequestTimeout = RequestTimeout()
+
+    def send(self, pool: ConnectionPool = CONNECTION_POOL) -> Response | None:
+        try:
+            with self.stream(pool) as streamed_response:
+                return streamed_response.read() if streamed_response is not None else None
+        except RESPONSE_READ_ERRORS:
+            return None
+
+    @contextmanager
+    def stream(self, pool: ConnectionPool = CONNECTION_POOL) -> Generator[StreamedResponse | None, None, None]:
+        """Sends the request and yields the response without reading its body.
+        The body should be read inside the context, otherwise the connection is not reused"""
+
+        encoded_request = self._encode()
 
-    def send(self) -> Response | None:
-        http_request = self._to_urllib_request()
+        connection, is_reused = pool.acquire(encoded_request.host, encoded_request.port)
+        retries = 0
 
         try:
-            with urllib.request.urlopen(http_request) as http_response:
-                return Response(
-                    status=http_response.status,
-                    content_type=http_response.headers.get_content_type(),
-                    body=http_response.read().decode(http_response.headers.get_content_charset("utf-8")),
-                )
-        except urllib.error.HTTPError as http_error:
-            return Response(
-                status=HTTPStatus(http_error.code),
-                content_type=http_error.headers.get_content_type(),
-                body=http_error.read().decode(http_error.headers.get_content_charset("utf-8")),
-            )
-        except OSError as os_error:
-            print(os_error)
-
-        return None
-
-    def _to_urllib_request(self) -> UrllibRequest:
+            is_sent = False
+            try:
+                self._write_on(connection, encoded_request)
+                is_sent = True
+                http_response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                pool.discard(connection)
+
+                # the server has closed the idle keep-alive socket. If it failed after the request was written,
+                # the server might have handled it, so only idempotent requests are sent again
+                if not is_reused or (is_sent and encoded_request.method not in IDEMPOTENT_METHODS):
+                    raise
+
+                connection = HTTPConnection(encoded_request.host, encoded_request.port)
+                retries += 1
+                self._write_on(connection, encoded_request)
+                http_response = connection.getresponse()
+        except (OSError, HTTPException) as error:
+            pool.discard(connection)
+            print(error)
+            yield None
+            return
+
+        streamed_response = StreamedResponse(http_response, sent=encoded_request.sent, retries=retries)
+
+        try:
+            yield streamed_response
+        except RESPONSE_READ_ERRORS as error:
+            pool.discard(connection)
+            print(error)
+            raise
+        except BaseException:
+            pool.discard(connection)
+            raise
+
+        if streamed_response.is_consumed and not http_response.will_close:
+            pool.release(connection)
+        else:
+            pool.discard(connection)
+
+    @staticmethod
+    def _write_on(connection: HTTPConnection, encoded_request: EncodedRequest):
+        if connection.sock is None:
+            connection.timeout = encoded_request.timeout.connect
+            connection.connect()
+
+        connection.sock.settimeout(encoded_request.timeout.read)
+
+        connection.request(
+            encoded_request.method, encoded_request.path, body=encoded_request.body, headers=encoded_request.headers
+        )
+
+    def _encode(self) -> EncodedRequest:
         url = url_encode(self.url, safe="/:")
 
-        if not url.startswith("http"):
+        if not url.startswith("http://"):
             raise ValueError("only http urls are supported")
 
-        method = self.method.upper()
         headers = self.headers
         data = self.data
         query_params = self.query_params
         request_data = None
 
         headers.setdefault("Accept", "application/json")
+        headers.setdefault("Accept-Encoding", "gzip")
 
         if query_params is not None:
             url += "?" + urllib.parse.urlencode(query_params, doseq=True, safe="/")
@@ -67,5 +142,30 @@ class Request:
                 headers["Content-Type"] = "application/json; charset=UTF-8"
             else:
                 request_data = urllib.parse.urlencode(data).encode()
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        raw_data_size = len(request_data) if request_data is not None else 0
+
+        if (
+            request_data is not None
+            and self.compress_threshold is not None
+            and raw_data_size >= self.compress_threshold
+        ):
+            request_data = gzip.compress(request_data, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+
+        split_url = urllib.parse.urlsplit(url)
+        path = split_url.path or "/"
+        if split_url.query:
+            path += "?" + split_url.query
 
-        return UrllibRequest(url, data=request_data, headers=headers, method=method)
+        return EncodedRequest(
+            host=split_url.hostname,
+            port=split_url.port or 80,
+            method=self.method.upper(),
+            path=path,
+            body=request_data,
+            headers=headers,
+            sent=TransferSize(raw=raw_data_size, wire=len(request_data) if request_data is not None else 0),
+            timeout=self.timeout,
+        )
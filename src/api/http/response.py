@@ -1,7 +1,9 @@
 import json
+import zlib
 from dataclasses import dataclass
 from http import HTTPStatus
-from typing import TypeVar
+from http.client import HTTPException, HTTPResponse
+from typing import Generator, TypeVar
 
 from ...utils import Result
 
@@ -11,12 +13,27 @@ HTTP_SUCCESS_RANGE = range(200, 300)
 
 NOT_JSON_ERROR = ValueError("http response is not json")
 
+RESPONSE_READ_ERRORS = (OSError, HTTPException, zlib.error)
+
+
+@dataclass(frozen=True)
+class TransferSize:
+    raw: int = 0
+    wire: int = 0
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.wire / self.raw if self.raw > 0 else 1
+
 
 @dataclass(frozen=True)
 class Response:
     status: HTTPStatus
     content_type: str
     body: str
+    sent: TransferSize = TransferSize()
+    received: TransferSize = TransferSize()
+    retries: int = 0
 
     @property
     def is_success(self) -> bool:
@@ -37,3 +54,86 @@ class Response:
             return Result.ok(json.loads(self.body))
         except Exception as e:
             return Result.error(e)
+
+
+class StreamedResponse:
+    status: HTTPStatus
+    content_type: str
+    charset: str
+    sent: TransferSize
+    retries: int
+
+    _http_response: HTTPResponse
+    _decompressor: "zlib._Decompress | None"
+    _raw_size: int
+    _wire_size: int
+    _is_consumed: bool
+
+    def __init__(self, http_response: HTTPResponse, *, sent: TransferSize, retries=0):
+        self.status = HTTPStatus(http_response.status)
+        self.content_type = http_response.headers.get_content_type()
+        self.charset = http_response.headers.get_content_charset("utf-8")
+        self.sent = sent
+        self.retries = retries
+
+        is_gzip = http_response.headers.get("Content-Encoding", "").lower() == "gzip"
+
+        self._http_response = http_response
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if is_gzip else None
+        self._raw_size = 0
+        self._wire_size = 0
+        self._is_consumed = False
+
+    @property
+    def is_success(self) -> bool:
+        return self.status in HTTP_SUCCESS_RANGE
+
+    @property
+    def is_error(self) -> bool:
+        return not self.is_success
+
+    @property
+    def is_json(self) -> bool:
+        return "json" in self.content_type
+
+    @property
+    def is_consumed(self) -> bool:
+        return self._is_consumed
+
+    @property
+    def received(self) -> TransferSize:
+        return TransferSize(raw=self._raw_size, wire=self._wire_size)
+
+    def iter_bytes(self, chunk_size=64 * 1024) -> Generator[bytes, None, None]:
+        """Yields decompressed chunks of the body as they arrive"""
+
+        if self._is_consumed:
+            raise ValueError(f"{self.__class__.__name__} body is already read")
+
+        while wire_chunk := self._http_response.read1(chunk_size):
+            self._wire_size += len(wire_chunk)
+
+            chunk = self._decompressor.decompress(wire_chunk) if self._decompressor else wire_chunk
+            if chunk:
+                self._raw_size += len(chunk)
+                yield chunk
+
+        if self._decompressor and (chunk := self._decompressor.flush()):
+            self._raw_size += len(chunk)
+            yield chunk
+
+        # read1 doesn't mark the response as closed, and http.client doesn't reuse the connection until it is
+        self._http_response.read()
+        self._is_consumed = True
+
+    def read(self) -> Response:
+        body = b"".join(self.iter_bytes())
+
+        return Response(
+            status=self.status,
+            content_type=self.content_type,
+            body=body.decode(self.charset),
+            sent=self.sent,
+            received=self.received,
+            retries=self.retries,
+        )
@@ -0,0 +1,108 @@
+import sys
+from array import array
+from base64 import b64encode
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from .models import ColumnarPropertyAnimationJson, PropertyAnimationJson, PutColumnarKeyframesJson, PutKeyframesJson
+
+COLUMNAR_KEYFRAMES_FEATURE = "columnar-keyframes"
+
+# keyframes with "merge" are added to the existing keyframes of the properties instead of replacing them
+CHUNKED_KEYFRAMES_FEATURE = "chunked-keyframes"
+
+# the mod interpolates linearly between the keyframes of a property, so they don't have to be on every frame
+SPARSE_KEYFRAMES_FEATURE = "sparse-keyframes"
+
+
+@dataclass(frozen=True)
+class KeyframeTrack:
+    """Values of an animated property, one for each frame starting from start_frame"""
+
+    start_frame: int
+    values: Sequence[float]
+
+    def __len__(self):
+        return len(self.values)
+
+    def to_json(self) -> PropertyAnimationJson:
+        return {
+            "keyframes": {frame: {"value": value} for frame, value in enumerate(self.values, start=self.start_frame)}
+        }
+
+    def to_columnar_json(self) -> ColumnarPropertyAnimationJson:
+        """Packs values as base64 of a little-endian float32 array"""
+
+        packed_values = array("f", self.values)
+        if sys.byteorder != "little":
+            packed_values.byteswap()
+
+        return {"startFrame": self.start_frame, "values": b64encode(packed_values.tobytes()).decode("ascii")}
+
+
+@dataclass(frozen=True)
+class SparseKeyframeTrack:
+    """Values of an animated property at some frames.
+    Only mods with SPARSE_KEYFRAMES_FEATURE restore the frames between them"""
+
+    frames: Sequence[int]
+    values: Sequence[float]
+
+    def __len__(self):
+        return len(self.frames)
+
+    def to_json(self) -> PropertyAnimationJson:
+        return {"keyframes": {frame: {"value": value} for frame, value in zip(self.frames, self.values)}}
+
+
+def reduce_keyframes(track: KeyframeTrack, *, tolerance: float, keep_last=False) -> SparseKeyframeTrack:
+    """Drops the keyframes that the linear interpolation of the remaining ones restores with an error of at most tolerance.
+    A constant track is reduced to a single keyframe, unless keep_last is set
+    (a chunk of a longer track has to end where the next chunk starts)"""
+
+    values = np.asarray(track.values, dtype=np.float64)
+
+    if len(values) == 0:
+        return SparseKeyframeTrack([], [])
+
+    if not keep_last and np.all(np.abs(values - values[0]) <= tolerance):
+        return SparseKeyframeTrack([track.start_frame], [float(values[0])])
+
+    is_kept = np.zeros(len(values), dtype=bool)
+    is_kept[[0, -1]] = True
+
+    # Ramer-Douglas-Peucker with the vertical distance, so that the error is bounded on every frame
+    segments = [(0, len(values) - 1)]
+
+    while segments:
+        start, end = segments.pop()
+        if end - start < 2:
+            continue
+
+        line = np.linspace(values[start], values[end], end - start + 1)[1:-1]
+        errors = np.abs(values[start + 1 : end] - line)
+        max_error_index = int(errors.argmax())
+
+        if errors[max_error_index] > tolerance:
+            split = start + 1 + max_error_index
+            is_kept[split] = True
+            segments += ((start, split), (split, end))
+
+    kept_indices = np.flatnonzero(is_kept)
+    return SparseKeyframeTrack((kept_indices + track.start_frame).tolist(), values[kept_indices].tolist())
+
+
+def encode_keyframes(
+    tracks: dict[str, KeyframeTrack | SparseKeyframeTrack], *, columnar: bool
+) -> PutKeyframesJson | PutColumnarKeyframesJson:
+    """Columnar format is only supported for KeyframeTrack"""
+
+    if columnar:
+        return {
+            "format": "columnar",
+            "properties": {property: track.to_columnar_json() for property, track in tracks.items()},
+        }
+
+    return {"properties": {property: track.to_json() for property, track in tracks.items()}}
@@ -0,0 +1,129 @@
+import re
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from math import inf
+from threading import Lock
+from typing import Any
+
+from .http import TransferSize
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, inf)
+
+OBJECT_ROUTE_REGEX = re.compile(r"^objects/[^/]+")
+
+
+def route_template(route: str) -> str:
+    return OBJECT_ROUTE_REGEX.sub("objects/{name}", route)
+
+
+@dataclass(frozen=True)
+class RequestSample:
+    time: float
+    method: str
+    route: str
+    status: int | None
+    latency: float
+    sent: TransferSize
+    received: TransferSize
+    retries: int
+
+    @property
+    def is_error(self) -> bool:
+        return self.status is None or self.status >= 400
+
+
+@dataclass
+class RouteMetrics:
+    count: int = 0
+    error_count: int = 0
+    retry_count: int = 0
+    total_latency: float = 0
+    max_latency: float = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    latency_histogram: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+
+    def add(self, sample: RequestSample):
+        self.count += 1
+        self.error_count += sample.is_error
+        self.retry_count += sample.retries
+        self.total_latency += sample.latency
+        self.max_latency = max(self.max_latency, sample.latency)
+        self.bytes_sent += sample.sent.wire
+        self.bytes_received += sample.received.wire
+
+        bucket_index = next(i for i, bucket in enumerate(LATENCY_BUCKETS) if sample.latency <= bucket)
+        self.latency_histogram[bucket_index] += 1
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.count if self.count > 0 else 0
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.count if self.count > 0 else 0
+
+    def latency_percentile(self, percentile: float) -> float:
+        """Upper bound of the histogram bucket that contains the percentile"""
+
+        samples_to_skip = percentile * self.count
+        for bucket, bucket_count in zip(LATENCY_BUCKETS, self.latency_histogram):
+            samples_to_skip -= bucket_count
+            if samples_to_skip <= 0:
+                return min(bucket, self.max_latency)
+
+        return self.max_latency
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "errorCount": self.error_count,
+            "retryCount": self.retry_count,
+            "meanLatency": self.mean_latency,
+            "p95Latency": self.latency_percentile(0.95),
+            "maxLatency": self.max_latency,
+            "bytesSent": self.bytes_sent,
+            "bytesReceived": self.bytes_received,
+            "latencyHistogram": {
+                str(bucket): bucket_count for bucket, bucket_count in zip(LATENCY_BUCKETS, self.latency_histogram)
+            },
+        }
+
+
+class APIMetrics:
+    """Statistics of all requests sent to the mod. Used to find out where the time is spent"""
+
+    samples: deque[RequestSample]
+    routes: dict[str, RouteMetrics]
+
+    _lock: Lock
+
+    def __init__(self, *, max_samples=1024):
+        self.samples = deque(maxlen=max_samples)
+        self.routes = {}
+
+        self._lock = Lock()
+
+    def record(self, sample: RequestSample):
+        with self._lock:
+            self.samples.append(sample)
+            self.routes.setdefault(f"{sample.method} {sample.route}", RouteMetrics()).add(sample)
+
+    def clear(self):
+        with self._lock:
+            self.samples.clear()
+            self.routes.clear()
+
+    def sorted_routes(self) -> list[tuple[str, RouteMetrics]]:
+        with self._lock:
+            return sorted(self.routes.items(), key=lambda item: item[1].total_latency, reverse=True)
+
+    def to_json(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "routes": {route: route_metrics.to_json() for route, route_metrics in self.routes.items()},
+                "samples": [asdict(sample) for sample in self.samples],
+            }
+
+
+API_METRICS = APIMetrics()
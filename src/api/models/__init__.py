@@ -1,5 +1,6 @@
 from .animation import *
 from .api import *
+from .batch import *
 from .camera import *
 from .environment import *
 from .ground_body import *
@@ -1,4 +1,4 @@
-from typing import TypedDict
+from typing import Literal, NotRequired, TypedDict
 
 
 class KeyframeJson(TypedDict):
@@ -11,3 +11,15 @@ class PropertyAnimationJson(TypedDict):
 
 class PutKeyframesJson(TypedDict):
     properties: dict[str, PropertyAnimationJson]
+    merge: NotRequired[bool]
+
+
+class ColumnarPropertyAnimationJson(TypedDict):
+    startFrame: int
+    values: str
+
+
+class PutColumnarKeyframesJson(TypedDict):
+    format: Literal["columnar"]
+    properties: dict[str, ColumnarPropertyAnimationJson]
+    merge: NotRequired[bool]
@@ -5,6 +5,7 @@ class ApiVersionJson(TypedDict):
     patch: int
     minor: int
     major: int
+    features: NotRequired[list[str]]
 
 
 class ProblemJson(TypedDict):
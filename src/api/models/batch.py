@@ -0,0 +1,21 @@
+from typing import Any, NotRequired, TypedDict
+
+
+class BatchRequestJson(TypedDict):
+    method: str
+    route: str
+    query: NotRequired[dict[str, str]]
+    body: NotRequired[Any]
+
+
+class PostBatchJson(TypedDict):
+    requests: list[BatchRequestJson]
+
+
+class BatchResponseJson(TypedDict):
+    status: int
+    body: NotRequired[Any]
+
+
+class BatchResultJson(TypedDict):
+    responses: list[BatchResponseJson]
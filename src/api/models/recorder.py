@@ -10,5 +10,5 @@ class ColorTextureRecorderJson(TypedDict):
 
 class TransformRecorderJson(TypedDict):
     outputPath: str
-    format: Literal["json"]
+    format: Literal["json", "binary"]
     origin: str
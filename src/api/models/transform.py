@@ -1,8 +1,16 @@
 from dataclasses import dataclass
-from typing import TypedDict
+from typing import Sequence, TypedDict
 
+import numpy as np
 from mathutils import Matrix, Quaternion, Vector
 
+from ...utils import (
+    json_transforms_to_values,
+    make_quaternions_compatible,
+    matrices_to_quaternions,
+    matrix_to_array,
+)
+
 RIGHT_HANDED_TO_LEFT = Matrix(
     (
         (1, 0, 0, 0),
@@ -81,3 +89,105 @@ class Transform:
 
     def to_right(self) -> "Transform":
         return Transform.from_matrix(self.to_right_matrix())
+
+
+@dataclass(frozen=True)
+class TransformBatch:
+    """Transforms of many frames in contiguous arrays: (N, 3) positions, (N, 4) rotations (w, x, y, z)
+    and (N, 3) scales. Converts all of them at once instead of one Transform per frame"""
+
+    positions: np.ndarray
+    rotations: np.ndarray
+    scales: np.ndarray
+
+    def __len__(self):
+        return len(self.positions)
+
+    @staticmethod
+    def from_json_list(json_list: Sequence[TransformJson]) -> "TransformBatch":
+        """Raises ValueError if some transform is malformed"""
+
+        return TransformBatch.from_values(json_transforms_to_values(json_list))
+
+    @staticmethod
+    def from_values(values: np.ndarray) -> "TransformBatch":
+        """From (N, 10) values in the order of the json fields: position, rotation (x, y, z, w) and scale,
+        like the rows of a transform recording"""
+
+        values = np.asarray(values, dtype=np.float64)
+        return TransformBatch(values[:, 0:3], values[:, [6, 3, 4, 5]], values[:, 7:10])
+
+    @staticmethod
+    def from_matrices(matrices: np.ndarray) -> "TransformBatch":
+        """Decomposes (N, 4, 4) matrices like Matrix.decompose"""
+
+        scales = np.linalg.norm(matrices[:, :3, :3], axis=1)
+        scales[np.linalg.det(matrices[:, :3, :3]) < 0] *= -1
+
+        return TransformBatch(matrices[:, :3, 3].copy(), matrices_to_quaternions(matrices), scales)
+
+    def to_matrices(self) -> np.ndarray:
+        """Returns (N, 4, 4) matrices, like Matrix.LocRotScale for each transform"""
+
+        w, x, y, z = self.rotations.T
+
+        matrices = np.zeros((len(self), 4, 4))
+        matrices[:, 0, 0] = 1 - 2 * (y * y + z * z)
+        matrices[:, 0, 1] = 2 * (x * y - w * z)
+        matrices[:, 0, 2] = 2 * (x * z + w * y)
+        matrices[:, 1, 0] = 2 * (x * y + w * z)
+        matrices[:, 1, 1] = 1 - 2 * (x * x + z * z)
+        matrices[:, 1, 2] = 2 * (y * z - w * x)
+        matrices[:, 2, 0] = 2 * (x * z - w * y)
+        matrices[:, 2, 1] = 2 * (y * z + w * x)
+        matrices[:, 2, 2] = 1 - 2 * (x * x + y * y)
+
+        matrices[:, :3, :3] *= self.scales[:, np.newaxis, :]
+        matrices[:, :3, 3] = self.positions
+        matrices[:, 3, 3] = 1
+
+        return matrices
+
+    def to_right(self) -> "TransformBatch":
+        """Converts from the Unity left-handed space. Same as to_left, the conversion swaps the Y and Z axes"""
+
+        return self._swap_handedness()
+
+    def to_left(self) -> "TransformBatch":
+        return self._swap_handedness()
+
+    def transformed(self, before: Matrix | None = None, after: Matrix | None = None) -> "TransformBatch":
+        """Returns the transforms of before @ matrix @ after for each transform matrix"""
+
+        matrices = self.to_matrices()
+
+        if before is not None:
+            matrices = matrix_to_array(before) @ matrices
+        if after is not None:
+            matrices = matrices @ matrix_to_array(after)
+
+        return TransformBatch.from_matrices(matrices)
+
+    def make_rotations_compatible(self, previous_rotation: np.ndarray | None = None) -> "TransformBatch":
+        """Flips the rotations in place, see make_quaternions_compatible"""
+
+        make_quaternions_compatible(self.rotations, previous_rotation)
+        return self
+
+    def to_fcurve_values(self) -> dict[str, np.ndarray]:
+        """Values of the Blender object transform properties, one row per transform"""
+
+        return {"location": self.positions, "rotation_quaternion": self.rotations, "scale": self.scales}
+
+    def __getitem__(self, index: int) -> Transform:
+        return Transform(Vector(self.positions[index]), Quaternion(self.rotations[index]), Vector(self.scales[index]))
+
+    def _swap_handedness(self) -> "TransformBatch":
+        # the mirrored rotation turns around the mirrored axis in the opposite direction
+        w, x, y, z = self.rotations.T
+
+        return TransformBatch(
+            self.positions[:, [0, 2, 1]],
+            np.column_stack((w, -x, -z, -y)),
+            self.scales[:, [0, 2, 1]],
+        )
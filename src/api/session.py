@@ -0,0 +1,82 @@
+from threading import Lock
+from time import monotonic
+
+from .http import CircuitBreaker, Response
+
+
+class ResponseCache:
+    ttl: float
+    hits: int
+    misses: int
+
+    _entries: dict[str, tuple[float, Response]]
+    _lock: Lock
+
+    def __init__(self, *, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Response | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and monotonic() - entry[0] <= self.ttl:
+                self.hits += 1
+                return entry[1]
+
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: Response) -> Response:
+        with self._lock:
+            self._entries[key] = (monotonic(), response)
+        return response
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0
+
+
+class APISession:
+    """State shared by every APIClient that talks to the mod at the same port"""
+
+    port: int
+    api_version: tuple[int, int] | None
+    features: frozenset[str]
+    get_cache: ResponseCache
+    circuit_breaker: CircuitBreaker
+
+    def __init__(self, port: int):
+        self.port = port
+        self.api_version = None
+        self.features = frozenset()
+        self.get_cache = ResponseCache(ttl=0)
+        self.circuit_breaker = CircuitBreaker(failure_threshold=3, cooldown=5)
+
+    @staticmethod
+    def of_port(port: int) -> "APISession":
+        with _SESSIONS_LOCK:
+            if port not in _SESSIONS:
+                _SESSIONS[port] = APISession(port)
+            return _SESSIONS[port]
+
+    def reset(self):
+        """Forgets everything known about the mod. Used when it's unreachable, because it might be restarted or updated"""
+        self.api_version = None
+        self.features = frozenset()
+        self.get_cache.invalidate()
+
+
+_SESSIONS: dict[int, APISession] = {}
+
+_SESSIONS_LOCK = Lock()
@@ -1,4 +1,6 @@
 from .align_ground_body import *
+from .convert_transform_recording import *
+from .export_api_metrics import *
 from .generate_body import *
 from .generate_body_background import *
 from .generate_compositor_nodes import *
@@ -7,6 +9,8 @@ from .import_assets import *
 from .import_body import *
 from .import_camera_recording import *
 from .import_transform_recording import *
+from .live_capture import *
+from .live_link import *
 from .record import *
 from .set_scene_origin import *
 from .synchronize import *
@@ -1,16 +1,32 @@
-from typing import Generator
+from concurrent.futures import Future
+from typing import Any, Generator
 
 from bpy.types import Context, Event, Operator, Timer
 
 from ..utils import GeneratorWithState
 
+AsyncYield = set[str] | Future
+
 
 class AsyncOperator(Operator):
-    _async_generator: GeneratorWithState[set[str], None, set[str]]
+    """Operator that runs the _run_async generator in modal mode.
+
+    The generator yields either a set of event types to wait for, or a Future.
+    In the second case it's resumed with the future result when it's done
+    (or the future exception is raised inside the generator)"""
+
+    future_poll_delay = 0.05
+
+    # operators that run until they are stopped pass the events that they don't wait for to the rest of the UI,
+    # so the viewport and their stop button stay usable. ESC calls _cancel
+    runs_in_background = False
+
+    _async_generator: GeneratorWithState[AsyncYield, Any, set[str]]
     _events_to_await: set[str]
+    _awaited_future: Future | None
     _timer: Timer | None
 
-    def _run_async(self, context: Context) -> Generator[set[str], None, set[str]]:
+    def _run_async(self, context: Context) -> Generator[AsyncYield, Any, set[str]]:
         pass
 
     def _after_event(self, context: Context, event: Event):
@@ -19,26 +35,48 @@ class AsyncOperator(Operator):
     def _ended(self, context: Context):
         pass
 
+    def _cancel(self, context: Context):
+        """Asks the generator of a background operator to stop, like its stop button"""
+
     def _add_timer(self, context: Context, time_step: float):
+        self.__remove_timer(context)
         self._timer = context.window_manager.event_timer_add(time_step, window=context.window)
 
-    def __poll_async_generator(self, context: Context) -> set[str]:
-        next(self._async_generator, None)
+    def __poll_async_generator(self, context: Context, future: Future | None = None) -> set[str]:
+        try:
+            if future is not None and (exception := future.exception()) is not None:
+                self._async_generator.throw(exception)
+            else:
+                self._async_generator.send(future.result() if future is not None else None)
+        except StopIteration:
+            pass
 
         if self._async_generator.stopped:
             self.__remove_timer(context)
             self._ended(context)
             return self._async_generator.returned
 
-        self._events_to_await = self._async_generator.last_yielded
+        last_yielded = self._async_generator.last_yielded
+
+        if isinstance(last_yielded, Future):
+            self._awaited_future = last_yielded
+            self._events_to_await = {"TIMER"}
+            if self._timer is None:
+                self._add_timer(context, self.future_poll_delay)
+        else:
+            self._awaited_future = None
+            self._events_to_await = last_yielded
+
         return {"RUNNING_MODAL"}
 
     def __remove_timer(self, context: Context):
         if self._timer is not None:
             context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
 
     def invoke(self, context: Context, _):
         self._timer = None
+        self._awaited_future = None
         self._async_generator = GeneratorWithState(self._run_async(context))
 
         first_result = self.__poll_async_generator(context)
@@ -49,9 +87,14 @@ class AsyncOperator(Operator):
         return first_result
 
     def modal(self, context: Context, event: Event):
-        if event.type not in self._events_to_await:
+        if self.runs_in_background and event.type == "ESC" and event.value == "PRESS":
+            self._cancel(context)
             return {"RUNNING_MODAL"}
 
+        awaited_future = self._awaited_future
+        if event.type not in self._events_to_await or (awaited_future is not None and not awaited_future.done()):
+            return {"PASS_THROUGH"} if self.runs_in_background else {"RUNNING_MODAL"}
+
         self._after_event(context, event)
 
-        return self.__poll_async_generator(context)
+        return self.__poll_async_generator(context, awaited_future)
@@ -0,0 +1,40 @@
+from os import path
+
+from bpy.types import Object, Operator
+
+from ..bpy_register import bpy_register
+from ..properties import ObjectProperties
+from ..utils import Result, convert_json_transform_recording, operator_do, sniff_transform_recording_format
+
+
+@bpy_register
+class ConvertTransformRecordingOperator(Operator):
+    """Convert the json transform recording to the compact binary format. The file is replaced"""
+
+    bl_idname = "outer_scout.convert_transform_recording"
+    bl_label = "Convert To Binary"
+
+    @classmethod
+    def poll(cls, context) -> bool:
+        active_object: Object = context.active_object
+        if not active_object or active_object.type == "CAMERA":
+            return False
+
+        return ObjectProperties.of_object(active_object).transform_props.has_recording_path
+
+    @operator_do
+    def execute(self, context):
+        transform_props = ObjectProperties.of_object(context.active_object).transform_props
+        recording_path = transform_props.absolute_recording_path
+
+        if not path.isfile(recording_path):
+            Result.do_error(f'"{transform_props.recording_path}" is not a file')
+
+        with Result.do_catch((OSError, ValueError)):
+            if sniff_transform_recording_format(recording_path) == "binary":
+                self.report({"INFO"}, f'"{transform_props.recording_path}" is already binary')
+                return
+
+            convert_json_transform_recording(recording_path)
+
+        self.report({"INFO"}, f'converted "{transform_props.recording_path}" to binary')
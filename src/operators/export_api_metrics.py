@@ -0,0 +1,51 @@
+import json
+
+import bpy
+from bpy.props import StringProperty
+from bpy.types import Operator
+from bpy_extras.io_utils import ExportHelper
+
+from ..api import API_METRICS, APISession
+from ..bpy_register import bpy_register
+from ..properties import OuterScoutPreferences
+from ..utils import operator_do
+
+
+@bpy_register
+class ExportAPIMetricsOperator(Operator, ExportHelper):
+    """Save statistics of the requests to Outer Scout mod as JSON. Attach it to bug reports about slow operations"""
+
+    bl_idname = "outer_scout.export_api_metrics"
+    bl_label = "Export API Metrics"
+
+    filename_ext = ".json"
+
+    filter_glob: StringProperty(default="*.json", options={"HIDDEN"})
+
+    @operator_do
+    def execute(self, context):
+        preferences = OuterScoutPreferences.from_context(context)
+        get_cache = APISession.of_port(preferences.api_port).get_cache
+
+        metrics_json = {
+            "blenderVersion": bpy.app.version_string,
+            **API_METRICS.to_json(),
+            "cache": {"hits": get_cache.hits, "misses": get_cache.misses},
+        }
+
+        with open(self.filepath, "w") as metrics_file:
+            json.dump(metrics_json, metrics_file, indent=2)
+
+        self.report({"INFO"}, f"API metrics saved to {self.filepath}")
+
+
+@bpy_register
+class ClearAPIMetricsOperator(Operator):
+    """Clear statistics of the requests to Outer Scout mod"""
+
+    bl_idname = "outer_scout.clear_api_metrics"
+    bl_label = "Clear API Metrics"
+
+    def execute(self, _):
+        API_METRICS.clear()
+        return {"FINISHED"}
@@ -1,16 +1,15 @@
-from collections import Counter
 from math import radians
 from pathlib import Path
 
 import bpy
 from bpy.props import StringProperty
-from bpy.types import Object, Operator
+from bpy.types import Collection, Context, Object, Operator
 from mathutils import Matrix
 
-from ..api import APIClient, Transform
+from ..api import APIClient, MeshBodyJson, MeshSectorJson, Transform
 from ..bpy_register import bpy_register
 from ..properties import OuterScoutPreferences
-from ..utils import get_child_by_path, iter_parents, operator_do
+from ..utils import Result, get_child_by_path, iter_parents, operator_do, timed_phase
 
 
 @bpy_register
@@ -32,7 +31,6 @@ class GenerateBodyOperator(Operator):
         ow_assets_folder, ow_bodies_folder = map(Path, (preferences.ow_assets_folder, preferences.ow_bodies_folder))
 
         body_name = self.body_name
-        body_name_abbr = self._body_name_abbreviation(body_name)
 
         body_fbx_path = ow_bodies_folder.joinpath(body_name + ".fbx")
         if not body_fbx_path.is_file():
@@ -40,45 +38,11 @@ class GenerateBodyOperator(Operator):
             return {"CANCELLED"}
 
         self._log("INFO", f"generating {body_name} object...")
-        self._log("INFO", f"fetching {body_name} assets list")
-
-        api_client = APIClient.from_context(context)
-        body_mesh_json = api_client.get_object_mesh(
-            body_name,
-            ignore_paths=list(map(lambda i: i.name, preferences.import_ignore_paths)),
-            ignore_layers=list(map(lambda i: i.name, preferences.import_ignore_layers)),
-            case_sensitive=False,
-        ).then()
-
-        streamed_asset_paths = Counter(
-            streamed_mesh["path"] for sector in body_mesh_json["sectors"] for streamed_mesh in sector["streamedMeshes"]
-        )
-
-        imported_objs: dict[str, tuple[Object | None, int]] = {
-            asset_path: (None, asset_uses_count) for asset_path, asset_uses_count in streamed_asset_paths.items()
-        }
-
-        self._log("INFO", f"importing {len(imported_objs)} .obj files of streamed assets")
-
-        for asset_path, (_, asset_uses_count) in imported_objs.items():
-            try:
-                obj_path = str(ow_assets_folder.joinpath(asset_path.removesuffix(".asset") + ".obj"))
-                bpy.ops.wm.obj_import(filepath=obj_path)
-            except:
-                self._log("WARNING", f"failed to import .obj file at {obj_path}")
-                continue
-
-            imported_obj = bpy.data.objects[context.view_layer.objects.active.name]
-            if imported_obj.type != "EMPTY":
-                imported_objs[asset_path] = (imported_obj, asset_uses_count)
-
-        bpy.ops.object.select_all(action="SELECT")
-        bpy.ops.object.transform_apply()
-        bpy.ops.object.select_all(action="DESELECT")
 
         body_fbx_path = str(body_fbx_path)
         self._log("INFO", f"importing {body_fbx_path}")
-        fbx_import_result = bpy.ops.import_scene.fbx(filepath=body_fbx_path)
+        with timed_phase("generate_body.import_fbx"):
+            fbx_import_result = bpy.ops.import_scene.fbx(filepath=body_fbx_path)
         if fbx_import_result != {"FINISHED"}:
             self._log("ERROR", f"failed to import ground body fbx: {body_fbx_path}")
             return {"CANCELLED"}
@@ -89,15 +53,6 @@ class GenerateBodyOperator(Operator):
         self._log("INFO", f"deleting {body_name} parents")
         bpy.data.batch_remove(list(iter_parents(fbx_body_object)))
 
-        self._log("INFO", f"clearing {len(bpy.data.materials)} materials")
-        bpy.data.batch_remove(bpy.data.materials)
-
-        self._log("INFO", f"clearing {len(bpy.data.images)} images")
-        bpy.data.batch_remove(bpy.data.images)
-
-        self._log("INFO", "loading sectors")
-        sectors_count = len(body_mesh_json["sectors"])
-
         body_collection = bpy.data.collections.new(body_name)
         context.scene.collection.children.link(body_collection)
 
@@ -106,96 +61,172 @@ class GenerateBodyOperator(Operator):
 
         sector_indices_text.write("{\n")
 
+        # streamed assets are imported when they're used for the first time. Imported objects
+        # stay in the scene collection as templates for copies, and are deleted at the end
+        imported_objs: dict[str, Object | None] = {}
+
+        self._log("INFO", f"fetching {body_name} assets list")
+
+        api_client = APIClient.from_context(context)
+        with api_client.stream_object_mesh(
+            body_name,
+            ignore_paths=list(map(lambda i: i.name, preferences.import_ignore_paths)),
+            ignore_layers=list(map(lambda i: i.name, preferences.import_ignore_layers)),
+            case_sensitive=False,
+        ) as mesh_stream_result:
+            body_json: MeshBodyJson | None = None
+            sectors_to_place: list[MeshSectorJson] = []
+            sector_index = 0
+
+            # sectors are placed while the rest of the response is still downloading
+            for key, value in mesh_stream_result.then():
+                match key:
+                    case "body":
+                        body_json = value
+                    case "sectors":
+                        sectors_to_place.append(value)
+
+                if body_json is None:
+                    continue
+
+                for sector_json in sectors_to_place:
+                    sector_path = sector_json["path"].removeprefix(body_json["path"]).removeprefix("/")
+                    self._log("INFO", f"* sector '{sector_path}' [{sector_index + 1}]")
+
+                    if sector_index > 0:
+                        sector_indices_text.write(",\n")
+                    sector_indices_text.write(f'    "{sector_path}": {sector_index}')
+
+                    sector_collection = bpy.data.collections.new(f"{body_name}.Sector.{sector_index}")
+                    body_collection.children.link(sector_collection)
+
+                    with timed_phase("generate_body.place_sectors"):
+                        self._place_sector(
+                            context,
+                            body_name,
+                            sector_collection,
+                            sector_json,
+                            fbx_body_object,
+                            imported_objs,
+                            ow_assets_folder,
+                        )
+
+                    sector_index += 1
+
+                sectors_to_place.clear()
+
+            if body_json is None:
+                Result.do_error(f"API didn't return the {body_name} mesh body")
+
+        sector_indices_text.write("\n}")
+
+        with timed_phase("generate_body.cleanup"):
+            self._log("INFO", f"clearing {len(bpy.data.materials)} materials")
+            bpy.data.batch_remove(bpy.data.materials)
+
+            self._log("INFO", f"clearing {len(bpy.data.images)} images")
+            bpy.data.batch_remove(bpy.data.images)
+
+            objects_to_delete = context.scene.collection.objects
+            num_of_objects_to_delete = len(objects_to_delete)
+            self._log("INFO", f"deleting {num_of_objects_to_delete} scene objects")
+            bpy.data.batch_remove(objects_to_delete)
+
+        self._log("INFO", "finished")
+        bpy.ops.object.select_all(action="DESELECT")
+
+    def _place_sector(
+        self,
+        context: Context,
+        body_name: str,
+        sector_collection: Collection,
+        sector_info: MeshSectorJson,
+        fbx_body_object: Object,
+        imported_objs: dict[str, Object | None],
+        ow_assets_folder: Path,
+    ):
+        body_name_abbr = self._body_name_abbreviation(body_name)
         identity_transform = Matrix.Identity(4)
 
         # TODO: something to do with importing options...
         add_transform_plain = Matrix.Rotation(radians(180), 4, "Z") @ Matrix.Rotation(radians(90), 4, "X")
         add_transform_streamed = Matrix.Rotation(radians(180), 4, "Z")
 
-        for sector_index, sector_info in enumerate(body_mesh_json["sectors"]):
-            sector_path = sector_info["path"].removeprefix(body_mesh_json["body"]["path"]).removeprefix("/")
-            self._log("INFO", f"* sector '{sector_path}' [{sector_index + 1}/{sectors_count}]")
-
-            sector_indices_text.write(f'    "{sector_path}": {sector_index}')
-            if (sector_index + 1) < sectors_count:
-                sector_indices_text.write(",")
-            sector_indices_text.write("\n")
-
-            sector_collection = bpy.data.collections.new(f"{body_name}.Sector.{sector_index}")
+        self._log("INFO", f'placing plain meshes ({len(sector_info["plainMeshes"])} objects)')
 
-            body_collection.children.link(sector_collection)
+        for plain_mesh_json in sector_info["plainMeshes"]:
+            mesh_path = plain_mesh_json["path"].split("/")[1:]
 
-            self._log("INFO", f'placing plain meshes ({len(sector_info["plainMeshes"])} objects)')
-
-            for plain_mesh_json in sector_info["plainMeshes"]:
-                mesh_path = plain_mesh_json["path"].split("/")[1:]
+            fbx_child = get_child_by_path(fbx_body_object, mesh_path, mask_duplicates=True)
+            if fbx_child is None:
+                self._log("WARNING", f'missing plain mesh child at {plain_mesh_json["path"]}')
+                continue
 
-                fbx_child = get_child_by_path(fbx_body_object, mesh_path, mask_duplicates=True)
-                if fbx_child is None:
-                    self._log("WARNING", f'missing plain mesh child at {plain_mesh_json["path"]}')
-                    continue
+            context.collection.objects.unlink(fbx_child)
+            sector_collection.objects.link(fbx_child)
 
-                context.collection.objects.unlink(fbx_child)
-                sector_collection.objects.link(fbx_child)
+            fbx_child.name = f"{body_name_abbr}.{fbx_child.name}"
+            if fbx_child.data and fbx_child.data.id_type == "MESH":
+                fbx_child.data.name = fbx_child.name
 
-                fbx_child.name = f"{body_name_abbr}.{fbx_child.name}"
-                if fbx_child.data and fbx_child.data.id_type == "MESH":
-                    fbx_child.data.name = fbx_child.name
+            unity_transform = Transform.from_json(plain_mesh_json["transform"])
+            fbx_child["unity_path"] = plain_mesh_json["path"]
+            fbx_child["unity_is_streamed"] = False
 
-                unity_transform = Transform.from_json(plain_mesh_json["transform"])
-                fbx_child["unity_path"] = plain_mesh_json["path"]
-                fbx_child["unity_is_streamed"] = False
+            fbx_child.parent = None
+            fbx_child.matrix_parent_inverse = identity_transform
+            fbx_child.matrix_world = unity_transform.to_right_matrix() @ add_transform_plain
 
-                fbx_child.parent = None
-                fbx_child.matrix_parent_inverse = identity_transform
-                fbx_child.matrix_world = unity_transform.to_right_matrix() @ add_transform_plain
+        self._log("INFO", f'placing streamed meshes ({len(sector_info["streamedMeshes"])} objects)')
 
-            self._log("INFO", f'placing streamed meshes ({len(sector_info["streamedMeshes"])} objects)')
+        for streamed_mesh_json in sector_info["streamedMeshes"]:
+            asset_path = streamed_mesh_json["path"]
+            if asset_path not in imported_objs:
+                with timed_phase("generate_body.import_streamed_assets"):
+                    imported_objs[asset_path] = self._import_streamed_asset(context, ow_assets_folder, asset_path)
 
-            for streamed_mesh_json in sector_info["streamedMeshes"]:
-                asset_path = streamed_mesh_json["path"]
-                if asset_path not in imported_objs:
-                    continue
+            imported_obj = imported_objs[asset_path]
+            if imported_obj is None:
+                continue
 
-                imported_obj, asset_uses_count = imported_objs[asset_path]
-                if imported_obj is None:
-                    continue
+            obj_copy = imported_obj.copy()
+            sector_collection.objects.link(obj_copy)
 
-                obj_copy = imported_obj.copy()
-                sector_collection.objects.link(obj_copy)
+            obj_copy.name = f"{body_name_abbr}.{obj_copy.name}"
+            if obj_copy.data and obj_copy.data.id_type == "MESH":
+                obj_copy.data.name = obj_copy.name
 
-                asset_uses_count -= 1
-                if asset_uses_count <= 0:
-                    bpy.data.objects.remove(imported_obj, do_unlink=True)
-                    imported_objs[asset_path] = (None, 0)
-                else:
-                    imported_objs[asset_path] = (imported_obj, asset_uses_count)
+            unity_transform = Transform.from_json(streamed_mesh_json["transform"])
+            obj_copy["unity_path"] = asset_path
+            obj_copy["unity_is_streamed"] = True
 
-                obj_copy.name = f"{body_name_abbr}.{obj_copy.name}"
-                if obj_copy.data and obj_copy.data.id_type == "MESH":
-                    obj_copy.data.name = obj_copy.name
+            obj_copy.parent = None
+            obj_copy.matrix_parent_inverse = identity_transform
+            obj_copy.matrix_world = unity_transform.to_right_matrix() @ add_transform_streamed
 
-                unity_transform = Transform.from_json(streamed_mesh_json["transform"])
-                obj_copy["unity_path"] = asset_path
-                obj_copy["unity_is_streamed"] = True
+        self._log("INFO", "deleting empties")
+        bpy.data.batch_remove([e for e in sector_collection.objects if e.type == "EMPTY"])
 
-                obj_copy.parent = None
-                obj_copy.matrix_parent_inverse = identity_transform
-                obj_copy.matrix_world = unity_transform.to_right_matrix() @ add_transform_streamed
+    def _import_streamed_asset(self, context: Context, ow_assets_folder: Path, asset_path: str) -> Object | None:
+        obj_path = str(ow_assets_folder.joinpath(asset_path.removesuffix(".asset") + ".obj"))
 
-            self._log("INFO", "deleting empties")
-            bpy.data.batch_remove([e for e in sector_collection.objects if e.type == "EMPTY"])
+        bpy.ops.object.select_all(action="DESELECT")
 
-        sector_indices_text.write("}")
+        try:
+            bpy.ops.wm.obj_import(filepath=obj_path)
+        except:
+            self._log("WARNING", f"failed to import .obj file at {obj_path}")
+            return None
 
-        objects_to_delete = context.scene.collection.objects
-        num_of_objects_to_delete = len(objects_to_delete)
-        self._log("INFO", f"deleting {num_of_objects_to_delete} scene objects")
-        bpy.data.batch_remove(objects_to_delete)
+        imported_obj = bpy.data.objects[context.view_layer.objects.active.name]
+        if imported_obj.type == "EMPTY":
+            return None
 
-        self._log("INFO", "finished")
+        bpy.ops.object.transform_apply()
         bpy.ops.object.select_all(action="DESELECT")
 
+        return imported_obj
+
     def _body_name_abbreviation(self, ground_body_name: str) -> str:
         ground_body_name = ground_body_name.removesuffix("_Body")
         return "".join(ch for ch in ground_body_name if ch.isupper())
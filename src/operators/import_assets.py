@@ -3,7 +3,10 @@ from bpy.types import Camera, Object, Operator
 
 from ..bpy_register import bpy_register
 from ..properties import CameraProperties, ObjectProperties, SceneProperties
-from ..utils import operator_do
+from ..utils import collect_phase_timings, operator_do, read_transform_recordings, timed_phase
+from .import_transform_recording import apply_transform_recording, prepare_transform_recording
+
+IMPORT_STAGES = ("parse", "apply", "cameras")
 
 
 @bpy_register
@@ -21,35 +24,69 @@ class ImportAssetsOperator(Operator):
     @operator_do
     def execute(self, context):
         scene = context.scene
+        recorded_objects: list[Object] = []
 
-        for object in scene.objects:
-            object: Object
+        with collect_phase_timings() as phase_timings:
+            for object in scene.objects:
+                object: Object
 
-            object_props = ObjectProperties.of_object(object)
-            if not object_props.has_unity_object_name:
-                continue
+                object_props = ObjectProperties.of_object(object)
+                if not object_props.has_unity_object_name:
+                    continue
 
-            match object.type:
-                case "CAMERA":
-                    camera: Camera = object.data
-                    camera_props = CameraProperties.of_camera(camera)
-                    if not camera_props.is_active:
-                        continue
+                match object.type:
+                    case "CAMERA":
+                        camera: Camera = object.data
+                        camera_props = CameraProperties.of_camera(camera)
+                        if not camera_props.is_active:
+                            continue
+
+                        with timed_phase("import_assets.cameras"), context.temp_override(active_object=object):
+                            bpy.ops.outer_scout.import_camera_recording()
+                            if camera_props.hdri_node_group:
+                                bpy.ops.outer_scout.generate_hdri_nodes()
+                    case _:
+                        transform_props = object_props.transform_props
+
+                        if transform_props.has_recording_path and transform_props.mode == "RECORD":
+                            recorded_objects.append(object)
 
-                    with context.temp_override(active_object=object):
-                        bpy.ops.outer_scout.import_camera_recording()
-                        if camera_props.hdri_node_group:
-                            bpy.ops.outer_scout.generate_hdri_nodes()
-                case _:
-                    transform_props = object_props.transform_props
+            # all recordings are parsed first, large json ones concurrently. Then only the keyframes are written.
+            # An object whose recording can't be read is reported and skipped
+            with timed_phase("import_assets.parse"):
+                prepared_objects: list[tuple[Object, range | None]] = []
+                for object in recorded_objects:
+                    segment_result = prepare_transform_recording(context, object)
+                    if segment_result.is_error:
+                        self.report({"WARNING"}, f'"{object.name}": {segment_result.unwrap_error()}')
+                    else:
+                        prepared_objects.append((object, segment_result.unwrap()))
 
-                    if transform_props.has_recording_path and transform_props.mode == "RECORD":
-                        with context.temp_override(active_object=object):
-                            bpy.ops.outer_scout.import_transform_recording()
+                recordings = read_transform_recordings(
+                    [
+                        ObjectProperties.of_object(object).transform_props.absolute_recording_path
+                        for object, _ in prepared_objects
+                    ]
+                )
 
-                        if transform_props.record_once:
-                            transform_props.mode = "APPLY"
+            with timed_phase("import_assets.apply"):
+                for (object, segment), recording in zip(prepared_objects, recordings):
+                    if recording.is_error:
+                        self.report({"WARNING"}, f'"{object.name}": {recording.unwrap_error()}')
+                        continue
+
+                    apply_transform_recording(self, context, object, recording.unwrap(), segment)
+
+                    transform_props = ObjectProperties.of_object(object).transform_props
+                    if transform_props.record_once:
+                        transform_props.mode = "APPLY"
 
         scene_props = SceneProperties.from_context(context)
         if scene_props.compositor_node_group:
             bpy.ops.outer_scout.generate_compositor_nodes()
+
+        self.report(
+            {"INFO"},
+            "imported assets: "
+            + ", ".join(f"{stage} {phase_timings.get(f'import_assets.{stage}', 0):.2f}s" for stage in IMPORT_STAGES),
+        )
@@ -1,11 +1,12 @@
 from os import path
+from shutil import which
 
 import bpy
-from bpy.types import Camera, CameraBackgroundImage, MovieClip, Object, Operator, Scene
+from bpy.types import Camera, CameraBackgroundImage, Context, MovieClip, Object, Operator
 
 from ..bpy_register import bpy_register
-from ..properties import CameraProperties, TextureRecordingProperties
-from ..utils import Result, operator_do
+from ..properties import CameraProperties, OuterScoutPreferences, SceneRecordingProperties, TextureRecordingProperties
+from ..utils import Result, get_segment_path, operator_do, splice_video
 
 
 @bpy_register
@@ -25,15 +26,16 @@ class ImportCameraRecordingOperator(Operator):
 
     @operator_do
     def execute(self, context):
-        scene = context.scene
         camera: Camera = context.active_object.data
 
         camera.show_background_images = True
 
         camera_props = CameraProperties.of_camera(camera)
 
-        color_movie_clip = self._import_texture(scene, camera_props.color_texture_props, f"{camera.name}.color").then()
-        self._import_texture(scene, camera_props.depth_texture_props, f"{camera.name}.depth").then()
+        color_movie_clip = self._import_texture(
+            context, camera_props.color_texture_props, f"{camera.name}.color"
+        ).then()
+        self._import_texture(context, camera_props.depth_texture_props, f"{camera.name}.depth").then()
 
         if camera_props.outer_scout_type == "PERSPECTIVE":
             camera_background: CameraBackgroundImage | None = next(
@@ -47,15 +49,24 @@ class ImportCameraRecordingOperator(Operator):
                 camera_background.clip = color_movie_clip
 
     @Result.do()
-    def _import_texture(self, scene: Scene, texture_props: TextureRecordingProperties, clip_id: str) -> MovieClip:
+    def _import_texture(self, context: Context, texture_props: TextureRecordingProperties, clip_id: str) -> MovieClip:
         if not texture_props.has_recording_path:
             return
 
+        scene = context.scene
         recording_path = texture_props.absolute_recording_path
+        was_spliced = self._splice_texture(context, texture_props).then()
+
         if not path.isfile(recording_path):
             Result.do_error(f'"{texture_props.recording_path}" is not a file')
 
         old_movie_clip: MovieClip = texture_props.movie_clip
+
+        if was_spliced and old_movie_clip is not None and bpy.path.abspath(old_movie_clip.filepath) == recording_path:
+            # assigning the path reloads the clip, so it stays the same wherever it's used
+            old_movie_clip.filepath = old_movie_clip.filepath
+            return old_movie_clip
+
         new_movie_clip = bpy.data.movieclips.load(recording_path)
 
         if old_movie_clip is not None:
@@ -70,3 +81,37 @@ class ImportCameraRecordingOperator(Operator):
         new_movie_clip.frame_start = scene.frame_start
 
         return new_movie_clip
+
+    @Result.do()
+    def _splice_texture(self, context: Context, texture_props: TextureRecordingProperties) -> bool:
+        """Splices the video of the last partial recording into the full one. Returns True if it was spliced"""
+
+        recording_props = SceneRecordingProperties.from_context(context)
+        segment = recording_props.segment_frame_range
+        if segment is None:
+            return False
+
+        recording_path = texture_props.absolute_recording_path
+        segment_path = get_segment_path(recording_path, segment.start, segment.stop - 1)
+        if not path.isfile(segment_path):
+            return False
+
+        if not path.isfile(recording_path):
+            Result.do_error(f'"{texture_props.recording_path}" is not a file, record the whole range first')
+
+        ffmpeg_path = OuterScoutPreferences.from_context(context).ffmpeg_path or which("ffmpeg")
+        if not ffmpeg_path:
+            Result.do_error("FFmpeg is required to splice the recorded range, set its path in the preferences")
+
+        with Result.do_catch((OSError, RuntimeError)):
+            splice_video(
+                bpy.path.abspath(ffmpeg_path),
+                recording_path,
+                segment_path,
+                offset=segment.start - recording_props.segment_scene_frame_start,
+                frame_count=len(segment),
+                recording_frame_count=len(recording_props.segment_scene_frame_range),
+                constant_rate_factor=texture_props.constant_rate_factor,
+            )
+
+        return True
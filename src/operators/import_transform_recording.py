@@ -1,14 +1,25 @@
-import json
 from os import path
-from traceback import format_exception
 
-from bpy.types import Object, Operator
+import numpy as np
+from bpy.types import Context, Object, Operator
 from mathutils import Matrix
 
-from ..api import Transform
+from ..api import TransformBatch
 from ..bpy_register import bpy_register
-from ..properties import ObjectProperties
-from ..utils import Result, operator_do
+from ..properties import ObjectProperties, SceneRecordingProperties
+from ..utils import (
+    Result,
+    get_segment_path,
+    insert_keyframes,
+    multiply_quaternions,
+    operator_do,
+    read_transform_recording,
+    remove_keyframes,
+    splice_transform_recording,
+    timed_phase,
+)
+
+TRANSFORM_DATA_PATHS = ("location", "rotation_quaternion", "scale")
 
 
 @bpy_register
@@ -28,36 +39,109 @@ class ImportTransformRecordingOperator(Operator):
 
     @operator_do
     def execute(self, context):
-        scene = context.scene
         active_object: Object = context.active_object
-        transform_props = ObjectProperties.of_object(active_object).transform_props
-
-        if not path.isfile(transform_props.absolute_recording_path):
-            Result.do_error(f'"{transform_props.recording_path}" is not a file')
-
-        with open(transform_props.absolute_recording_path, "r") as recording_file:
-            try:
-                recording_json = json.load(recording_file)
-            except json.JSONDecodeError as json_decode_error:
-                Result.do_error(f"invalid json recording file: {json_decode_error}")
-
-        if (anim_data := active_object.animation_data) and (existing_action := anim_data.action):
-            for fcurve in list(existing_action.fcurves):
-                if fcurve.data_path in ("location", "rotation_quaternion", "scale"):
-                    existing_action.fcurves.remove(fcurve)
-
-        active_object.matrix_parent_inverse = Matrix.Identity(4)
-        active_object.rotation_mode = "QUATERNION"
-
-        if active_object.parent is not None:
-            self.report({"WARNING"}, f'animation of "{active_object.name}" might be broken because it has a parent')
-
-        for frame, transform_json in enumerate(recording_json["values"], start=scene.frame_start):
-            try:
-                active_object.matrix_world = Transform.from_json(transform_json).to_right_matrix()
-            except Exception as exception:
-                self.report({"ERROR"}, "".join(format_exception(exception)))
-                continue
-            active_object.keyframe_insert("location", frame=frame)
-            active_object.keyframe_insert("rotation_quaternion", frame=frame)
-            active_object.keyframe_insert("scale", frame=frame)
+        recording_path = ObjectProperties.of_object(active_object).transform_props.absolute_recording_path
+
+        segment = prepare_transform_recording(context, active_object).then()
+
+        # binary recordings are memory-mapped, only the imported frames are read from them
+        with timed_phase("import_transform_recording.load"):
+            with Result.do_catch((OSError, ValueError)):
+                recording_values = read_transform_recording(recording_path)
+
+        apply_transform_recording(self, context, active_object, recording_values, segment)
+
+
+@Result.do()
+def prepare_transform_recording(context: Context, object: Object) -> range | None:
+    """Splices the segment of the last partial recording into the transform recording of the object.
+    Returns the frames of the segment, which are the only ones to import, or None to import the whole recording"""
+
+    scene = context.scene
+    transform_props = ObjectProperties.of_object(object).transform_props
+    recording_path = transform_props.absolute_recording_path
+
+    # only the frames of the last partial recording are replaced, if its segment file is still there
+    recording_props = SceneRecordingProperties.from_context(context)
+    segment = recording_props.segment_frame_range
+    segment_path = get_segment_path(recording_path, segment.start, segment.stop - 1) if segment else None
+    needs_splice = segment_path is not None and path.isfile(segment_path)
+
+    if not path.isfile(recording_path):
+        Result.do_error(f'"{transform_props.recording_path}" is not a file')
+
+    if not needs_splice:
+        return None
+
+    with timed_phase("import_transform_recording.splice"):
+        with Result.do_catch((OSError, ValueError, KeyError)):
+            splice_transform_recording(
+                recording_path, segment_path, offset=segment.start - recording_props.segment_scene_frame_start
+            )
+
+    return recording_props.get_segment_import_range(scene)
+
+
+def apply_transform_recording(
+    operator: Operator, context: Context, object: Object, recording_values: np.ndarray, segment: range | None
+):
+    """Replaces the transform keyframes of the object with the (frames, 10) recording values.
+    With a segment, only the keyframes on its frames are replaced. Malformed frames (NaN values) are skipped"""
+
+    scene = context.scene
+    imported_frames = (
+        segment if segment is not None else range(scene.frame_start, scene.frame_start + len(recording_values))
+    )
+
+    remove_keyframes(object, TRANSFORM_DATA_PATHS, imported_frames if segment is not None else None)
+
+    object.matrix_parent_inverse = Matrix.Identity(4)
+    object.rotation_mode = "QUATERNION"
+
+    if object.parent is not None:
+        operator.report({"WARNING"}, f'animation of "{object.name}" might be broken because it has a parent')
+
+    with timed_phase("import_transform_recording.decompose"):
+        imported_values = recording_values[
+            imported_frames.start - scene.frame_start : imported_frames.stop - scene.frame_start
+        ]
+        frames_array = np.array(imported_frames, dtype=np.float64)
+
+        is_valid = ~np.isnan(imported_values).any(axis=1)
+        if not is_valid.all():
+            operator.report(
+                {"WARNING"},
+                f'skipped {np.count_nonzero(~is_valid)} malformed frames of "{object.name}",'
+                + f" the first one is {int(frames_array[~is_valid][0])}",
+            )
+            imported_values = imported_values[is_valid]
+            frames_array = frames_array[is_valid]
+
+        transforms = get_basis_transforms(object, TransformBatch.from_values(imported_values).to_right())
+
+    with timed_phase("import_transform_recording.keyframes"):
+        for data_path, values in transforms.to_fcurve_values().items():
+            insert_keyframes(object, data_path, frames_array, values)
+
+
+def get_basis_transforms(object: Object, world_transforms: TransformBatch) -> TransformBatch:
+    """Location, rotation and scale values that put the object at the world transforms, like setting matrix_world.
+    The parent is taken at the current frame, and the delta transforms are removed"""
+
+    if object.parent is not None:
+        parent_matrix = object.parent.matrix_world @ object.matrix_parent_inverse
+        world_transforms = world_transforms.transformed(before=parent_matrix.inverted())
+
+    delta_scale = np.array(object.delta_scale)
+    delta_rotation = np.array(object.delta_rotation_quaternion.normalized().inverted())
+
+    rotations = multiply_quaternions(delta_rotation, world_transforms.rotations)
+
+    # a recorded quaternion can have any sign, but setting matrix_world gives w >= 0 like Matrix.to_quaternion
+    rotations[rotations[:, 0] < 0] *= -1
+
+    return TransformBatch(
+        world_transforms.positions - np.array(object.delta_location),
+        rotations,
+        world_transforms.scales / np.where(delta_scale != 0, delta_scale, 1),
+    )
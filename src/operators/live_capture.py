@@ -0,0 +1,243 @@
+from array import array
+from concurrent.futures import Future
+from math import radians
+
+import bpy
+import numpy as np
+from bpy.types import Context, Event, Object
+from mathutils import Matrix
+
+from ..api import APIClient, TransformBatch, TransformJson, get_api_executor
+from ..bpy_register import bpy_register
+from ..properties import (
+    LiveCaptureProperties,
+    LiveLinkProperties,
+    ObjectProperties,
+    SceneProperties,
+    SceneRecordingProperties,
+)
+from ..utils import Result, defer, insert_keyframes, operator_do, remove_keyframes, with_defers
+from .async_operator import AsyncOperator
+from .import_transform_recording import TRANSFORM_DATA_PATHS, get_basis_transforms
+
+CAPTURE_SAMPLE_SIZE = 10
+
+# identity values of the fields that the API leaves out, like in the transform recordings
+CAPTURE_TRANSFORM_FIELDS = (("position", (0, 0, 0)), ("rotation", (0, 0, 0, 1)), ("scale", (1, 1, 1)))
+
+
+class TransformCaptureBuffer:
+    """Preallocated Unity transforms of several objects, one slot for each frame of the scene range.
+    The timeline loops during the capture, so the slots are reused like a ring buffer"""
+
+    frame_start: int
+    frame_count: int
+    object_count: int
+    captured_count: int
+
+    _values: array
+    _is_captured: array
+
+    def __init__(self, *, frame_start: int, frame_end: int, object_count: int):
+        self.frame_start = frame_start
+        self.frame_count = frame_end - frame_start + 1
+        self.object_count = object_count
+        self.captured_count = 0
+
+        self._values = array("d", bytes(8 * self.frame_count * object_count * CAPTURE_SAMPLE_SIZE))
+        self._is_captured = array("B", bytes(self.frame_count))
+
+    def __contains__(self, frame: int) -> bool:
+        return 0 <= frame - self.frame_start < self.frame_count
+
+    def write(self, frame: int, transforms: list[TransformJson]):
+        slot = frame - self.frame_start
+        values = self._values
+        offset = slot * self.object_count * CAPTURE_SAMPLE_SIZE
+
+        for transform in transforms:
+            for field, identity_values in CAPTURE_TRANSFORM_FIELDS:
+                field_values = transform.get(field) or identity_values
+                for i in range(len(identity_values)):
+                    values[offset + i] = field_values[i]
+                offset += len(identity_values)
+
+        if not self._is_captured[slot]:
+            self._is_captured[slot] = 1
+            self.captured_count += 1
+
+    def captured_frames(self) -> list[int]:
+        return [self.frame_start + slot for slot, is_captured in enumerate(self._is_captured) if is_captured]
+
+    def read_transforms(self, object_index: int) -> TransformBatch:
+        """Unity transforms of the object on the captured frames"""
+
+        values = np.frombuffer(self._values, dtype=np.float64).reshape(
+            self.frame_count, self.object_count, CAPTURE_SAMPLE_SIZE
+        )
+        is_captured = np.frombuffer(self._is_captured, dtype=np.uint8).astype(bool)
+        return TransformBatch.from_values(values[is_captured, object_index])
+
+
+@bpy_register
+class LiveCaptureOperator(AsyncOperator):
+    """Play the timeline and capture the transforms of the selected objects from Outer Wilds.
+    Keyframes are created when the capture is stopped. Run again or press ESC to stop"""
+
+    bl_idname = "outer_scout.live_capture"
+    bl_label = "Live Capture"
+
+    runs_in_background = True
+
+    @classmethod
+    def poll(cls, context) -> bool:
+        if SceneRecordingProperties.from_context(context).in_progress:
+            cls.poll_message_set("Recording is in progress")
+            return False
+
+        # both operators drive the scene objects
+        if LiveLinkProperties.from_context(context).in_progress:
+            cls.poll_message_set("Live Link is in progress")
+            return False
+
+        if not SceneProperties.from_context(context).is_scene_created:
+            return False
+
+        if LiveCaptureProperties.from_context(context).in_progress:
+            return True
+
+        if context.mode != "OBJECT":
+            cls.poll_message_set("Not in object mode")
+            return False
+
+        if not get_capturable_objects(context):
+            cls.poll_message_set("Select objects with Unity object names")
+            return False
+
+        return True
+
+    @operator_do
+    @with_defers
+    def _run_async(self, context: Context):
+        capture_props = LiveCaptureProperties.from_context(context)
+
+        if capture_props.in_progress:
+            # the running operator stops on the next timer tick
+            capture_props.in_progress = False
+            return
+
+        scene = context.scene
+        scene_props = SceneProperties.from_context(context)
+        api_client = APIClient.from_context(context)
+
+        captured_objects = get_capturable_objects(context)
+        captured_object_names = [captured_object.name for captured_object in captured_objects]
+        unity_object_names = [
+            ObjectProperties.of_object(captured_object).unity_object_name for captured_object in captured_objects
+        ]
+
+        capture_buffer = TransformCaptureBuffer(
+            frame_start=scene.frame_start, frame_end=scene.frame_end, object_count=len(captured_objects)
+        )
+
+        capture_props.in_progress = True
+        capture_props.captured_frames = 0
+        defer(setattr, capture_props, "in_progress", False)
+
+        if not context.screen.is_animation_playing:
+            bpy.ops.screen.animation_play()
+            defer(stop_playback, context)
+
+        self._add_timer(context, scene.render.fps_base / scene.render.fps)
+
+        last_captured_frame: int | None = None
+
+        while True:
+            yield {"TIMER"}
+
+            if not capture_props.in_progress:
+                break
+
+            frame = scene.frame_current
+            if frame == last_captured_frame or frame not in capture_buffer:
+                continue
+
+            # the frame is remembered before the request, the timeline keeps playing while it's sent
+            transforms_future: Future = get_api_executor().submit(
+                get_object_transforms, api_client, unity_object_names, origin=scene_props.origin_parent
+            )
+
+            capture_buffer.write(frame, (yield transforms_future).then())
+
+            last_captured_frame = frame
+            capture_props.captured_frames = capture_buffer.captured_count
+
+        if capture_buffer.captured_count == 0:
+            self.report({"WARNING"}, "no frames were captured")
+            return
+
+        for object_index, object_name in enumerate(captured_object_names):
+            if (captured_object := bpy.data.objects.get(object_name)) is None:
+                self.report({"WARNING"}, f'"{object_name}" was deleted during the capture')
+                continue
+
+            if captured_object.parent is not None:
+                self.report({"WARNING"}, f'animation of "{object_name}" might be broken because it has a parent')
+
+            insert_captured_keyframes(scene_props, captured_object, capture_buffer, object_index)
+
+        self.report({"INFO"}, f"captured {capture_buffer.captured_count} frames")
+
+    def _after_event(self, context: Context, _: Event):
+        context.area.tag_redraw()
+
+    def _cancel(self, context: Context):
+        LiveCaptureProperties.from_context(context).in_progress = False
+
+
+def get_capturable_objects(context: Context) -> list[Object]:
+    return [
+        selected_object
+        for selected_object in context.selected_objects
+        if ObjectProperties.of_object(selected_object).has_unity_object_name
+    ]
+
+
+@Result.do()
+def get_object_transforms(api_client: APIClient, object_names: list[str], *, origin: str) -> list[TransformJson]:
+    return [api_client.get_object(object_name, origin=origin).then()["transform"] for object_name in object_names]
+
+
+def stop_playback(context: Context):
+    if context.screen.is_animation_playing:
+        bpy.ops.screen.animation_cancel(restore_frame=False)
+
+
+def insert_captured_keyframes(
+    scene_props: SceneProperties, object: Object, capture_buffer: TransformCaptureBuffer, object_index: int
+):
+    """Replaces the object transform animation with the captured frames. The keyframes are converted like the ones
+    of an imported transform recording"""
+
+    ground_body: Object | None = scene_props.ground_body
+    ground_matrix = ground_body.matrix_world if ground_body is not None else Matrix.Identity(4)
+
+    # in Unity camera looks forward, but in Blender it looks down
+    local_rotation = Matrix.Rotation(radians(90), 4, "X") if object.type == "CAMERA" else Matrix.Identity(4)
+
+    frames = capture_buffer.captured_frames()
+
+    remove_keyframes(object, TRANSFORM_DATA_PATHS)
+
+    object.matrix_parent_inverse = Matrix.Identity(4)
+    object.rotation_mode = "QUATERNION"
+
+    captured_transforms = capture_buffer.read_transforms(object_index).to_right()
+    world_transforms = captured_transforms.transformed(ground_matrix, local_rotation)
+
+    # compatible rotations prevent interpolation from taking the long way around
+    transforms = get_basis_transforms(object, world_transforms).make_rotations_compatible()
+
+    frames_array = np.array(frames, dtype=np.float64)
+    for data_path, values in transforms.to_fcurve_values().items():
+        insert_keyframes(object, data_path, frames_array, values)
@@ -0,0 +1,152 @@
+from concurrent.futures import Future
+from time import perf_counter
+
+from bpy.types import Camera, Context, Event, Object
+
+from ..api import APIClient, PerspectiveJson, Transform, get_api_executor
+from ..bpy_register import bpy_register
+from ..properties import LiveCaptureProperties, LiveLinkProperties, SceneProperties, SceneRecordingProperties
+from ..utils import Result, defer, operator_do, with_defers
+from .async_operator import AsyncOperator
+from .synchronize import get_camera_perspective_json, get_ow_local_transform
+
+LIVE_LINK_EPSILON = 1e-6
+
+LIVE_LINK_STATS_SMOOTHING = 0.1
+
+
+@bpy_register
+class LiveLinkOperator(AsyncOperator):
+    """Continuously send the active camera to the Outer Wilds active camera. Run again or press ESC to stop"""
+
+    bl_idname = "outer_scout.live_link"
+    bl_label = "Live Link"
+
+    runs_in_background = True
+
+    @classmethod
+    def poll(cls, context) -> bool:
+        if SceneRecordingProperties.from_context(context).in_progress:
+            cls.poll_message_set("Recording is in progress")
+            return False
+
+        # both operators drive the scene objects
+        if LiveCaptureProperties.from_context(context).in_progress:
+            cls.poll_message_set("Live Capture is in progress")
+            return False
+
+        return SceneProperties.from_context(context).is_scene_created
+
+    @operator_do
+    @with_defers
+    def _run_async(self, context: Context):
+        live_link_props = LiveLinkProperties.from_context(context)
+
+        if live_link_props.in_progress:
+            # the running operator stops on the next timer tick
+            live_link_props.in_progress = False
+            return
+
+        scene_props = SceneProperties.from_context(context)
+        api_client = APIClient.from_context(context)
+
+        ow_camera_name = api_client.get_active_camera().then()["name"]
+        if ow_camera_name == "PlayerCamera":
+            Result.do_error("player camera cannot be modified")
+
+        live_link_props.in_progress = True
+        live_link_props.achieved_rate = 0
+        live_link_props.latency = 0
+        defer(setattr, live_link_props, "in_progress", False)
+
+        self._add_timer(context, 1 / live_link_props.target_rate)
+        target_rate = live_link_props.target_rate
+
+        last_sent_state: tuple[float, ...] | None = None
+        last_sent_time: float | None = None
+
+        while True:
+            yield {"TIMER"}
+
+            if not live_link_props.in_progress:
+                break
+
+            if target_rate != live_link_props.target_rate:
+                target_rate = live_link_props.target_rate
+                self._add_timer(context, 1 / target_rate)
+
+            camera_object: Object | None = context.scene.camera
+            if camera_object is None or camera_object.type != "CAMERA":
+                continue
+
+            camera_state = get_camera_state(camera_object)
+            if last_sent_state is not None and states_equal(camera_state, last_sent_state):
+                continue
+
+            transform = get_ow_local_transform(scene_props, camera_object.matrix_world, is_camera=True)
+            perspective = get_camera_perspective_json(camera_object.data)
+
+            # only one update is in flight. The next one is sampled after it's done, so stale frames never queue up
+            send_future: Future = get_api_executor().submit(
+                send_camera,
+                api_client,
+                object_name=ow_camera_name,
+                origin=scene_props.origin_parent,
+                transform=transform,
+                perspective=perspective,
+            )
+
+            send_result, latency = yield send_future
+            send_result.then()
+
+            last_sent_state = camera_state
+
+            now = perf_counter()
+            if last_sent_time is not None:
+                live_link_props.achieved_rate = smooth(live_link_props.achieved_rate, 1 / (now - last_sent_time))
+            live_link_props.latency = smooth(live_link_props.latency, latency)
+            last_sent_time = now
+
+    def _after_event(self, context: Context, _: Event):
+        context.area.tag_redraw()
+
+    def _cancel(self, context: Context):
+        LiveLinkProperties.from_context(context).in_progress = False
+
+
+def send_camera(
+    api_client: APIClient, *, object_name: str, origin: str, transform: Transform, perspective: PerspectiveJson
+) -> tuple[Result, float]:
+    """Sends the transform and perspective in one round trip. Returns the result and its duration in seconds"""
+
+    start_time = perf_counter()
+
+    with api_client.batch() as batch:
+        api_client.put_object(name=object_name, transform=transform, origin=origin)
+        api_client.put_camera(object_name=object_name, perspective=perspective)
+
+    return batch.result, perf_counter() - start_time
+
+
+def get_camera_state(camera_object: Object) -> tuple[float, ...]:
+    camera: Camera = camera_object.data
+    return (
+        *(value for row in camera_object.matrix_world for value in row),
+        camera.lens,
+        camera.sensor_width,
+        camera.sensor_height,
+        camera.shift_x,
+        camera.shift_y,
+        camera.clip_start,
+        camera.clip_end,
+    )
+
+
+def states_equal(state: tuple[float, ...], other_state: tuple[float, ...]) -> bool:
+    return all(abs(value - other_value) <= LIVE_LINK_EPSILON for value, other_value in zip(state, other_state))
+
+
+def smooth(average: float, value: float) -> float:
+    if average == 0:
+        return value
+    return average + (value - average) * LIVE_LINK_STATS_SMOOTHING
@@ -1,27 +1,72 @@
+import json
 from functools import partial
 from math import radians
-from operator import delitem
-from typing import Callable
+from os import path, remove, replace
+from time import monotonic
+from typing import Sequence, TextIO
 
 import bpy
-from bpy.types import Camera, Context, Event, FCurve, Object
-from bpy_extras.anim_utils import BakeOptions, bake_action
+import numpy as np
+from bpy.types import Camera, Context, Event, Object
 from mathutils import Matrix
 
-from ..api import LEFT_HANDED_TO_RIGHT, RIGHT_HANDED_TO_LEFT, APIClient, Transform
+from ..api import (
+    CHUNKED_KEYFRAMES_FEATURE,
+    COLUMNAR_KEYFRAMES_FEATURE,
+    APIClient,
+    AsyncAPIClient,
+    SPARSE_KEYFRAMES_FEATURE,
+    KeyframeTrack,
+    PutColumnarKeyframesJson,
+    PutKeyframesJson,
+    Transform,
+    TransformBatch,
+    encode_keyframes,
+    get_api_executor,
+    reduce_keyframes,
+)
 from ..bpy_register import bpy_register
 from ..properties import (
     CameraProperties,
+    LiveCaptureProperties,
+    LiveLinkProperties,
     ObjectProperties,
     OuterScoutPreferences,
     SceneProperties,
     SceneRecordingProperties,
 )
-from ..utils import Result, add_driver, defer, operator_do, with_defers
+from ..utils import (
+    AnimationHasher,
+    Result,
+    TrackBaker,
+    defer,
+    get_segment_path,
+    matrix_to_array,
+    normalize_rotations,
+    operator_do,
+    timed_phase,
+    with_defers,
+)
 from .async_operator import AsyncOperator
 
 ORIGIN_OBJECT_NAME = "scene.origin"
 
+RECORDING_STATUS_LONG_POLL_FEATURE = "recording-status-long-poll"
+
+RECORDING_STATUS_LONG_POLL_TIMEOUT = 5
+
+BINARY_TRANSFORM_RECORDING_FEATURE = "binary-transform-recording"
+
+# in Unity camera looks forward, but in Blender it looks down
+UNITY_CAMERA_ROTATION = matrix_to_array(Matrix.Rotation(radians(-90), 4, "X"))
+
+SCENE_TRACKS_NAME = "scene.keyframes"
+
+KEYFRAME_DEFAULT_TOLERANCE = 1e-5
+
+# a sparse json keyframe takes about 5 times more bytes than a columnar value
+SPARSE_KEYFRAME_SIZE_RATIO = 5
+
 
 @bpy_register
 class RecordOperator(AsyncOperator):
@@ -40,6 +85,14 @@ class RecordOperator(AsyncOperator):
             cls.poll_message_set("Not in object mode")
             return False
 
+        if LiveLinkProperties.from_context(context).in_progress:
+            cls.poll_message_set("Stop the Live Link before recording")
+            return False
+
+        if LiveCaptureProperties.from_context(context).in_progress:
+            cls.poll_message_set("Stop the capture before recording")
+            return False
+
         scene_props = SceneProperties.from_context(context)
         return scene_props.is_scene_created
 
@@ -48,12 +101,21 @@ class RecordOperator(AsyncOperator):
     def _run_async(self, context):
         recording_props = SceneRecordingProperties.from_context(context)
 
-        if recording_props.in_progress:
+        if recording_props.in_progress or recording_props.is_sending_keyframes:
             Result.do_error("recording is in progress")
 
+        scene = context.scene
         scene_props = SceneProperties.from_context(context)
         api_client = APIClient.from_context(context)
 
+        frame_range = recording_props.get_frame_range(scene)
+        if len(frame_range) == 0 or frame_range.start < scene.frame_start or frame_range.stop - 1 > scene.frame_end:
+            Result.do_error("the recorded range must be a part of the scene frame range")
+
+        # a part of the scene range is recorded to separate files, which are spliced into the full recordings on import
+        scene_frame_range = range(scene.frame_start, scene.frame_end + 1)
+        segment = frame_range if len(frame_range) < len(scene_frame_range) else None
+
         if (
             scene_props.outer_wilds_scene != ""
             and api_client.get_environment().then()["outerWildsScene"] != scene_props.outer_wilds_scene
@@ -71,18 +133,22 @@ class RecordOperator(AsyncOperator):
 
         defer(api_client.delete_scene)
 
-        scene = context.scene
         was_on_frame = scene.frame_current
         defer(scene.frame_set, was_on_frame)
 
-        self._create_objects(context, api_client).then()
+        self._create_objects(context, api_client, frame_range, segment).then()
 
-        self._send_keyframes(context, api_client).then()
+        sent_keyframe_count, keyframe_count = (yield from self._send_keyframes(context, api_client, frame_range)).then()
+        if keyframe_count > 0:
+            self.report(
+                {"INFO"},
+                f"sent {sent_keyframe_count} of {keyframe_count} keyframes ({sent_keyframe_count / keyframe_count:.1%})",
+            )
 
         api_client.post_scene_recording(
             {
-                "startFrame": scene.frame_start,
-                "endFrame": scene.frame_end,
+                "startFrame": frame_range.start,
+                "endFrame": frame_range.stop - 1,
                 "frameRate": scene.render.fps,
             }
         ).then()
@@ -94,50 +160,78 @@ class RecordOperator(AsyncOperator):
         preferences = OuterScoutPreferences.from_context(context)
         self._add_timer(context, preferences.modal_timer_delay)
 
-        frame_count = scene.frame_end - scene.frame_start + 1
+        frame_count = len(frame_range)
+        async_api_client = AsyncAPIClient(api_client)
+
+        use_long_poll = api_client.supports(RECORDING_STATUS_LONG_POLL_FEATURE)
+        poll_interval = AdaptivePollInterval(frame_count=frame_count, min_interval=preferences.modal_timer_delay)
+        frames_recorded = 0
 
         while recording_props.in_progress:
-            recording_status = api_client.get_recording_status().then()
+            # the game might hitch while recording, so the request shouldn't block the UI
+            if use_long_poll:
+                status_future = async_api_client.wait_recording_status(
+                    frames_recorded=frames_recorded, timeout=RECORDING_STATUS_LONG_POLL_TIMEOUT
+                )
+            else:
+                status_future = async_api_client.get_recording_status()
+
+            recording_status = (yield status_future).then()
+            frames_recorded = recording_status["framesRecorded"]
 
             recording_props.in_progress = recording_status["inProgress"]
-            recording_props.progress = recording_status["framesRecorded"] / frame_count
+            recording_props.progress = frames_recorded / frame_count
             context.area.tag_redraw()
 
-            yield {"TIMER"}
+            if not use_long_poll and recording_props.in_progress:
+                self._add_timer(context, poll_interval.update(frames_recorded))
+                yield {"TIMER"}
+
+        recording_props.has_segment = segment is not None
+        if segment is not None:
+            recording_props.segment_frame_start = segment.start
+            recording_props.segment_frame_end = segment.stop - 1
+            recording_props.segment_scene_frame_start = scene_frame_range.start
+            recording_props.segment_scene_frame_end = scene_frame_range.stop - 1
 
         bpy.ops.outer_scout.import_assets()
 
     @Result.do()
-    def _create_objects(self, context: Context, api_client: APIClient):
+    def _create_objects(self, context: Context, api_client: APIClient, frame_range: range, segment: range | None):
         scene = context.scene
 
-        scene.frame_set(scene.frame_start)
+        scene.frame_set(frame_range.start)
 
-        for object in scene.objects:
-            object: Object
-            object_props = ObjectProperties.of_object(object)
+        with api_client.batch() as batch:
+            for object in scene.objects:
+                object: Object
+                object_props = ObjectProperties.of_object(object)
 
-            if not object_props.has_unity_object_name:
-                continue
+                if not object_props.has_unity_object_name:
+                    continue
 
-            if object.type == "CAMERA" or object_props.object_type == "CUSTOM":
-                object_matrix = object.matrix_world.copy()
-                if object.type == "CAMERA":
-                    object_matrix @= Matrix.Rotation(radians(-90), 4, "X")
+                if object.type == "CAMERA" or object_props.object_type == "CUSTOM":
+                    object_matrix = object.matrix_world.copy()
+                    if object.type == "CAMERA":
+                        object_matrix @= Matrix.Rotation(radians(-90), 4, "X")
 
-                api_client.post_object(
-                    name=object_props.unity_object_name,
-                    transform=Transform.from_matrix(object_matrix).to_left(),
-                    parent=ORIGIN_OBJECT_NAME,
-                ).then()
+                    api_client.post_object(
+                        name=object_props.unity_object_name,
+                        transform=Transform.from_matrix(object_matrix).to_left(),
+                        parent=ORIGIN_OBJECT_NAME,
+                    ).then()
 
-            if object.type == "CAMERA":
-                self._add_camera(context, api_client, object, object_props.unity_object_name).then()
-            else:
-                self._add_transform_recorder(api_client, object, object_props.unity_object_name).then()
+                if object.type == "CAMERA":
+                    self._add_camera(context, api_client, object, object_props.unity_object_name, segment).then()
+                else:
+                    self._add_transform_recorder(api_client, object, object_props.unity_object_name, segment).then()
+
+        batch.result.then()
 
     @Result.do()
-    def _add_camera(self, context: Context, api_client: APIClient, object: Object, object_api_name: str):
+    def _add_camera(
+        self, context: Context, api_client: APIClient, object: Object, object_api_name: str, segment: range | None
+    ):
         camera: Camera = object.data
         camera_props = CameraProperties.of_camera(camera)
         if not camera_props.is_active:
@@ -171,14 +265,24 @@ class RecordOperator(AsyncOperator):
             case not_implemented_camera_type:
                 raise NotImplementedError(f"camera of type {not_implemented_camera_type} is not implemented")
 
-        if camera_props.color_texture_props.has_recording_path:
-            api_client.post_texture_recorder(object_api_name, "color", camera_props.color_texture_props).then()
+        for texture_type, texture_props in (
+            ("color", camera_props.color_texture_props),
+            ("depth", camera_props.depth_texture_props),
+        ):
+            if not texture_props.has_recording_path:
+                continue
 
-        if camera_props.depth_texture_props.has_recording_path:
-            api_client.post_texture_recorder(object_api_name, "depth", camera_props.depth_texture_props).then()
+            api_client.post_texture_recorder(
+                object_api_name,
+                texture_type,
+                texture_props,
+                output_path=get_recording_output_path(texture_props.absolute_recording_path, segment),
+            ).then()
 
     @Result.do()
-    def _add_transform_recorder(self, api_client: APIClient, object: Object, object_api_name: str):
+    def _add_transform_recorder(
+        self, api_client: APIClient, object: Object, object_api_name: str, segment: range | None
+    ):
         object_props = ObjectProperties.of_object(object)
         transform_props = object_props.transform_props
 
@@ -187,20 +291,30 @@ class RecordOperator(AsyncOperator):
 
         api_client.post_transform_recorder(
             object_api_name,
-            {"format": "json", "outputPath": transform_props.absolute_recording_path, "origin": ORIGIN_OBJECT_NAME},
+            {
+                "format": "binary" if api_client.supports(BINARY_TRANSFORM_RECORDING_FEATURE) else "json",
+                "outputPath": get_recording_output_path(transform_props.absolute_recording_path, segment),
+                "origin": ORIGIN_OBJECT_NAME,
+            },
         ).then()
 
     @Result.do()
     @with_defers
-    def _send_keyframes(self, context: Context, api_client: APIClient):
+    def _send_keyframes(self, context: Context, api_client: APIClient, frame_range: range):
+        """Bakes, encodes and uploads the keyframes chunk by chunk, yielding the upload futures.
+        Returns the number of sent keyframes and the number of baked keyframes"""
+
         scene = context.scene
         scene_props = SceneProperties.from_context(context)
-        scene_frame_range = range(scene.frame_start, scene.frame_end + 1)
-
-        vector_index_to_axis = {0: "x", 1: "y", 2: "z", 3: "w"}
-        quaternion_index_to_axis = {0: "w", 1: "x", 2: "y", 3: "z"}  # order is converted for Unity
+        recording_props = SceneRecordingProperties.from_context(context)
+        preferences = OuterScoutPreferences.from_context(context)
+        use_columnar_keyframes = api_client.supports(COLUMNAR_KEYFRAMES_FEATURE)
+        chunk_size = (
+            preferences.keyframe_chunk_size if api_client.supports(CHUNKED_KEYFRAMES_FEATURE) else len(frame_range)
+        )
+        use_sparse_keyframes = preferences.reduce_keyframes and api_client.supports(SPARSE_KEYFRAMES_FEATURE)
 
-        scene_props_to_track = {"time.scale": "outer_scout_scene.time_scale"}
+        scene_props_to_track = {"time.scale": "time_scale"}
 
         camera_props_to_track = {
             "PERSPECTIVE": {
@@ -214,179 +328,411 @@ class RecordOperator(AsyncOperator):
             },
         }
 
-        left_to_right_empty = add_temp_empty(context, "outer_scout.left_to_right", matrix_world=LEFT_HANDED_TO_RIGHT)
+        # the baked tracks from the previous recording are reused if nothing that affects them has changed
+        content_hashes: dict[str, str] = {}
+        baked_track_names: set[str] = set()
+
+        def new_hasher() -> AnimationHasher:
+            hasher = AnimationHasher()
+            hasher.add_values(
+                frame_range.start,
+                frame_range.stop,
+                use_columnar_keyframes,
+                chunk_size,
+                use_sparse_keyframes,
+                preferences.keyframe_position_tolerance,
+                preferences.keyframe_rotation_tolerance,
+                preferences.keyframe_lens_tolerance,
+            )
+            return hasher
+
+        def should_bake(track_name: str, hasher: AnimationHasher) -> bool:
+            # the name keeps the cache files of tracks with the same animation apart
+            hasher.add_values(track_name)
+            content_hashes[track_name] = hasher.hexdigest()
+
+            # the keyframe counts of a reused track are kept in its properties, and its keyframes in the cache file
+            baked_track = recording_props.get_baked_track(track_name)
+            is_baked = (
+                baked_track is None
+                or baked_track.content_hash != content_hashes[track_name]
+                or not path.exists(get_keyframes_cache_path(content_hashes[track_name]))
+            )
+
+            if is_baked:
+                baked_track_names.add(track_name)
+            return is_baked
 
-        ground_inverse_empty = add_temp_empty(context, "outer_scout.ground_inverse")
-        if scene_props.has_ground_body:
-            generate_inverted_transform_drivers(ground_inverse_empty, scene_props.ground_body)
-        else:
-            ground_inverse_empty.matrix_world = Matrix.Identity(4)
+        track_baker = TrackBaker(scene, frame_range, chunk_size=chunk_size)
 
-        camera_rotation_empty = add_temp_empty(
-            context, "outer_scout.camera_rotation", matrix_world=Matrix.Rotation(radians(-90), 4, "X")
-        )
+        with timed_phase("send_keyframes.hash"):
+            ground_body: Object | None = scene_props.ground_body
+
+            origin_hasher = new_hasher()
+            if ground_body is not None:
+                origin_hasher.add_object(ground_body)
+
+            should_bake_origin = should_bake(ORIGIN_OBJECT_NAME, origin_hasher)
+            ground_matrices = (
+                track_baker.add_matrix(partial(getattr, ground_body, "matrix_world"))
+                if should_bake_origin and ground_body is not None
+                else None
+            )
+
+            scene_hasher = new_hasher()
+            scene_hasher.add_props(
+                scene_props,
+                scene_props_to_track.values(),
+                scene_hasher.add_animation(scene),
+                path=scene_props.path_from_id(),
+            )
+
+            scene_prop_values = (
+                track_baker.add_values(
+                    partial(get_attributes, scene_props, tuple(scene_props_to_track.values())),
+                    len(scene_props_to_track),
+                )
+                if should_bake(SCENE_TRACKS_NAME, scene_hasher)
+                else None
+            )
 
-        for object in scene.objects:
-            object: Object
-            object_props = ObjectProperties.of_object(object)
+            # world matrices are baked as they are, and converted to Unity for all frames at once
+            world_matrices: dict[str, tuple[np.ndarray, bool]] = {}
+            camera_prop_values: dict[str, tuple[np.ndarray, dict[str, str]]] = {}
 
-            if not (
-                object is ground_inverse_empty
-                or (
+            for object in scene.objects:
+                object: Object
+                object_props = ObjectProperties.of_object(object)
+
+                if not (
                     object_props.has_unity_object_name
                     and (object.type == "CAMERA" or object_props.transform_props.mode == "APPLY")
+                ):
+                    continue
+
+                camera: Camera | None = object.data if object.type == "CAMERA" else None
+                camera_props = CameraProperties.of_camera(camera) if camera is not None else None
+                props_to_track = (
+                    camera_props_to_track.get(camera_props.outer_scout_type, {})
+                    if camera_props is not None and camera_props.is_active
+                    else {}
                 )
-            ):
-                continue
 
-            object_track_empty = add_temp_empty(
-                context,
-                (
-                    f"outer_scout.object.{object_props.unity_object_name}"
-                    if object_props.has_unity_object_name
-                    else "outer_scout.scene.origin"
-                ),
-                matrix_world=RIGHT_HANDED_TO_LEFT,
-            )
+                object_hasher = new_hasher()
+                object_hasher.add_object(object)
+                if camera is not None:
+                    object_hasher.add_values(camera_props.outer_scout_type, camera_props.is_active)
+                    object_hasher.add_id(camera, props_to_track.values())
 
-            camera_props = CameraProperties.of_camera(object.data) if object.type == "CAMERA" else None
-
-            if camera_props and camera_props.is_active and camera_props.outer_scout_type in camera_props_to_track:
-                for camera_prop, camera_prop_path in camera_props_to_track[camera_props.outer_scout_type].items():
-                    object_track_empty[camera_prop] = 0.0
-                    add_driver(object_track_empty, f'["{camera_prop}"]', "value", value=(object.data, camera_prop_path))
-
-            # idea is to implement right_matrix_to_left using the Blender constraints
-            add_multiply_transform_constraint(object_track_empty, object)
-
-            if object.type == "CAMERA":
-                # in Unity camera looks forward, but in Blender it looks down
-                add_multiply_transform_constraint(object_track_empty, camera_rotation_empty)
-            elif object is ground_inverse_empty:
-                for scene_prop, scene_prop_path in scene_props_to_track.items():
-                    object_track_empty[scene_prop] = 0.0
-                    add_driver(object_track_empty, f'["{scene_prop}"]', "value", value=(scene, scene_prop_path))
-
-            add_multiply_transform_constraint(object_track_empty, left_to_right_empty)
-
-            track_action = bake_action(
-                object_track_empty,
-                action=None,
-                frames=scene_frame_range,
-                bake_options=BakeOptions(
-                    only_selected=True,
-                    do_pose=False,
-                    do_object=True,
-                    do_visual_keying=True,
-                    do_constraint_clear=True,
-                    do_parents_clear=True,
-                    do_clean=True,
-                    do_location=True,
-                    do_rotation=True,
-                    do_scale=False,
-                    do_bbone=False,
-                    do_custom_props=True,
-                ),
+                if not should_bake(object_props.unity_object_name, object_hasher):
+                    continue
+
+                world_matrices[object_props.unity_object_name] = (
+                    track_baker.add_matrix(partial(getattr, object, "matrix_world")),
+                    camera is not None,
+                )
+
+                if props_to_track:
+                    camera_prop_values[object_props.unity_object_name] = (
+                        track_baker.add_values(
+                            partial(get_attributes, camera, tuple(props_to_track.values())), len(props_to_track)
+                        ),
+                        props_to_track,
+                    )
+
+        recording_props.keyframes_progress = 0
+        recording_props.is_sending_keyframes = True
+        defer(setattr, recording_props, "is_sending_keyframes", False)
+
+        chunk_count = track_baker.chunk_count
+        is_chunked = chunk_count > 1
+
+        # only one chunk of each track exists at a time. The encoded chunks are streamed to the cache files,
+        # which replace the previous ones once every chunk is sent
+        cache_files: dict[str, TextIO] = {}
+        keyframe_counts: dict[str, int] = {}
+        sent_keyframe_counts: dict[str, int] = {}
+        last_rotations: dict[str, np.ndarray] = {}
+
+        reused_chunks: dict[str, TextIO] = {}
+        for track_name in content_hashes.keys() - baked_track_names:
+            reused_chunks[track_name] = open(
+                get_keyframes_cache_path(content_hashes[track_name]), "r", encoding="utf-8"
             )
+            defer(reused_chunks[track_name].close)
+
+        baked_chunks = track_baker.bake_chunks()
+        defer(baked_chunks.close)
+
+        for chunk_index in range(chunk_count):
+            with timed_phase("send_keyframes.bake"):
+                chunk_frames = next(baked_chunks)
+
+            chunk_length = len(chunk_frames)
+
+            with timed_phase("send_keyframes.convert"):
+                baked_tracks: dict[str, dict[str, Sequence[float]]] = {}
+
+                if should_bake_origin:
+                    if ground_matrices is not None:
+                        # the origin has the inverted ground body transform, but without the scale
+                        origin_matrices = normalize_rotations(np.linalg.inv(ground_matrices[:chunk_length]))
+                    else:
+                        origin_matrices = np.broadcast_to(np.identity(4), (chunk_length, 4, 4))
+
+                    baked_tracks[ORIGIN_OBJECT_NAME] = get_unity_transform_tracks(
+                        origin_matrices, previous_rotation=last_rotations.get(ORIGIN_OBJECT_NAME)
+                    )
+
+                for object_name, (object_world_matrices, is_camera) in world_matrices.items():
+                    object_world_matrices = object_world_matrices[:chunk_length]
+                    baked_tracks[object_name] = get_unity_transform_tracks(
+                        object_world_matrices @ UNITY_CAMERA_ROTATION if is_camera else object_world_matrices,
+                        previous_rotation=last_rotations.get(object_name),
+                    )
+
+                for object_name, (prop_values, props_to_track) in camera_prop_values.items():
+                    baked_tracks[object_name].update(get_value_tracks(prop_values[:chunk_length], props_to_track))
+
+                if scene_prop_values is not None:
+                    baked_tracks[SCENE_TRACKS_NAME] = get_value_tracks(
+                        scene_prop_values[:chunk_length], scene_props_to_track
+                    )
+
+                for track_name, tracks in baked_tracks.items():
+                    if "transform.rotation.w" in tracks:
+                        last_rotations[track_name] = get_last_rotation(tracks)
+
+            chunk_keyframes: dict[str, PutKeyframesJson | PutColumnarKeyframesJson] = {}
+
+            with timed_phase("send_keyframes.encode"):
+                for track_name, tracks in baked_tracks.items():
+                    keyframe_tracks = {
+                        prop: KeyframeTrack(chunk_frames.start, values) for prop, values in tracks.items()
+                    }
+                    chunk_keyframes[track_name], sent_keyframe_count = encode_reduced_keyframes(
+                        keyframe_tracks,
+                        columnar=use_columnar_keyframes,
+                        reduce=use_sparse_keyframes,
+                        keep_last=is_chunked,
+                        preferences=preferences,
+                    )
+
+                    if chunk_index > 0:
+                        chunk_keyframes[track_name]["merge"] = True
+
+                    if track_name not in cache_files:
+                        cache_files[track_name] = open_keyframes_cache(content_hashes[track_name])
+                        defer(discard_keyframes_cache, cache_files[track_name])
+
+                    cache_files[track_name].write(json.dumps(chunk_keyframes[track_name], separators=(",", ":")))
+                    cache_files[track_name].write("\n")
+                    keyframe_counts[track_name] = keyframe_counts.get(track_name, 0) + sum(
+                        map(len, keyframe_tracks.values())
+                    )
+                    sent_keyframe_counts[track_name] = sent_keyframe_counts.get(track_name, 0) + sent_keyframe_count
+
+                for track_name, cache_file in reused_chunks.items():
+                    chunk_keyframes[track_name] = json.loads(cache_file.readline())
+
+            with timed_phase("send_keyframes.upload"):
+                # the chunks are sent in order, the ones with "merge" are added to the previous ones
+                (yield get_api_executor().submit(put_keyframe_chunks, api_client, chunk_keyframes)).then()
+
+            recording_props.keyframes_progress = (chunk_index + 1) / chunk_count
+
+        previous_content_hashes = {baked_track.content_hash for baked_track in recording_props.baked_tracks}
+
+        for track_name, cache_file in cache_files.items():
+            cache_file.close()
+            replace(cache_file.name, get_keyframes_cache_path(content_hashes[track_name]))
+
+            baked_track = recording_props.get_baked_track(track_name)
+            if baked_track is None:
+                baked_track = recording_props.baked_tracks.add()
+                baked_track.name = track_name
+
+            baked_track.content_hash = content_hashes[track_name]
+            baked_track.keyframe_count = keyframe_counts[track_name]
+            baked_track.sent_keyframe_count = sent_keyframe_counts[track_name]
+
+        for index, baked_track in reversed(list(enumerate(recording_props.baked_tracks))):
+            if baked_track.name not in content_hashes:
+                recording_props.baked_tracks.remove(index)
+            else:
+                baked_track.is_reused = baked_track.name not in cache_files
 
-            defer(bpy.data.actions.remove, track_action, do_unlink=True)
-
-            object_animation_properties_json = {}
-            scene_animation_properties_json = {}
-
-            for fcurve in track_action.fcurves:
-                fcurve: FCurve
-
-                match fcurve.data_path:
-                    case "location":
-                        outer_scout_property = "transform.position." + vector_index_to_axis[fcurve.array_index]
-                        animation_properties_json = object_animation_properties_json
-                    case "rotation_quaternion":
-                        outer_scout_property = "transform.rotation." + quaternion_index_to_axis[fcurve.array_index]
-                        animation_properties_json = object_animation_properties_json
-                    case custom_data_path:
-                        outer_scout_property = custom_data_path[2:-2]
-                        animation_properties_json = (
-                            scene_animation_properties_json
-                            if outer_scout_property in scene_props_to_track
-                            else object_animation_properties_json
-                        )
-
-                animation_properties_json[outer_scout_property] = {
-                    "keyframes": {frame: {"value": fcurve.evaluate(frame)} for frame in scene_frame_range}
-                }
-
-            api_client.put_object_keyframes(
-                ORIGIN_OBJECT_NAME if object is ground_inverse_empty else object_props.unity_object_name,
-                {"properties": object_animation_properties_json},
-            ).then()
+        for content_hash in previous_content_hashes - set(content_hashes.values()):
+            if path.exists(cache_path := get_keyframes_cache_path(content_hash)):
+                remove(cache_path)
+
+        keyframe_count = sum(recording_props.get_baked_track(name).keyframe_count for name in content_hashes)
+        sent_keyframe_count = sum(recording_props.get_baked_track(name).sent_keyframe_count for name in content_hashes)
 
-            if len(scene_animation_properties_json):
-                api_client.put_scene_keyframes({"properties": scene_animation_properties_json}).then()
+        return sent_keyframe_count, keyframe_count
 
     def _after_event(self, context: Context, _: Event):
         context.area.tag_redraw()
 
 
-def get_camera_gate_fit(context: Context, camera: Camera):
-    match camera.sensor_fit:
-        case "AUTO":
-            render = context.scene.render
-            return "horizontal" if render.resolution_x > render.resolution_y else "vertical"
-        case "VERTICAL":
-            return "vertical"
-        case "HORIZONTAL":
-            return "horizontal"
+class AdaptivePollInterval:
+    """Derives the recording status polling interval from the observed recording speed,
+    so that the progress bar moves about once per percent instead of asking the game every timer tick"""
 
+    updates_per_recording = 100
 
-def add_temp_empty(
-    context: Context, name: str, *, rotation_mode="QUATERNION", matrix_world: Matrix | None = None
-) -> Object:
-    bpy.ops.object.empty_add()
-    empty: Object = context.active_object
-    empty.name = name
-    empty.rotation_mode = rotation_mode
-    empty.matrix_world = matrix_world or Matrix.Identity(4)
-    defer(bpy.data.objects.remove, empty, do_unlink=True)
-    return empty
+    frame_count: int
+    min_interval: float
+    max_interval: float
 
+    _start_time: float | None
+    _interval: float
 
-def add_transform_mix_constraint(object: Object, target: Object, *, mix_mode: str, type: str):
-    constraint = object.constraints.new(type)
+    def __init__(self, *, frame_count: int, min_interval: float, max_interval=1.0):
+        self.frame_count = frame_count
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
 
-    constraint.target = target
-    constraint.mix_mode = mix_mode
+        self._start_time = None
+        self._interval = min_interval
 
-    return constraint
+    def update(self, frames_recorded: int) -> float:
+        now = monotonic()
 
+        if self._start_time is None:
+            self._start_time = now
+            return self._interval
 
-add_multiply_transform_constraint = partial(add_transform_mix_constraint, type="COPY_TRANSFORMS", mix_mode="AFTER_FULL")
+        elapsed_time = now - self._start_time
 
+        if frames_recorded <= 0 or elapsed_time <= 0:
+            # the game might be still loading the scene
+            self._interval = min(self._interval * 2, self.max_interval)
+            return self._interval
 
-def generate_inverted_transform_drivers(object: Object, matrix_source: Object):
-    inverted_loc_func_name = temp_driver_namespace_func("inverted_loc", lambda m: m.inverted().to_translation())
-    inverted_rot_func_name = temp_driver_namespace_func("inverted_rot", lambda m: m.inverted().to_quaternion())
+        frames_per_second = frames_recorded / elapsed_time
+        frames_per_update = max(1, self.frame_count / self.updates_per_recording)
+        eta = (self.frame_count - frames_recorded) / frames_per_second
 
-    matrix_var_name = "m"
-    inverted_loc_expr = lambda i: f"{inverted_loc_func_name}({matrix_var_name})[{i}]"
-    inverted_rot_expr = lambda i: f"{inverted_rot_func_name}({matrix_var_name})[{i}]"
+        interval = min(frames_per_update / frames_per_second, eta)
 
-    vars = {matrix_var_name: (matrix_source, "matrix_world")}
+        self._interval = max(self.min_interval, min(interval, self.max_interval))
+        return self._interval
 
-    for loc_i in range(3):
-        add_driver(object, "location", inverted_loc_expr(loc_i), array_index=loc_i, **vars)
 
-    for rot_i in range(4):
-        add_driver(object, "rotation_quaternion", inverted_rot_expr(rot_i), array_index=rot_i, **vars)
+def get_unity_transform_tracks(
+    world_matrices: np.ndarray, *, previous_rotation: np.ndarray | None = None
+) -> dict[str, list[float]]:
+    """Converts (frames, 4, 4) Blender matrices to the Unity position and rotation tracks.
+    previous_rotation is the last rotation of the previous chunk"""
 
+    transforms = TransformBatch.from_matrices(world_matrices).to_left().make_rotations_compatible(previous_rotation)
 
-def temp_driver_namespace_func(prefix: str, func: Callable, postfix="_"):
-    func_name = prefix
+    return {
+        **{f"transform.position.{axis}": transforms.positions[:, i].tolist() for i, axis in enumerate("xyz")},
+        **{f"transform.rotation.{axis}": transforms.rotations[:, i].tolist() for i, axis in enumerate("wxyz")},
+    }
 
-    while func_name in bpy.app.driver_namespace:
-        func_name += postfix
 
-    bpy.app.driver_namespace[func_name] = func
-    defer(delitem, bpy.app.driver_namespace, func_name)
+def get_last_rotation(tracks: dict[str, Sequence[float]]) -> np.ndarray:
+    return np.array([tracks[f"transform.rotation.{axis}"][-1] for axis in "wxyz"])
+
+
+def get_keyframes_cache_path(content_hash: str) -> str:
+    """Encoded keyframe chunks of a baked track, one json document per line. The file is named after the content
+    hash of the track, so it always matches the animation. It's in the temporary directory of the Blender session,
+    which keeps the payload out of the .blend file"""
+
+    return path.join(bpy.app.tempdir, f"outer_scout_keyframes_{content_hash}.jsonl")
+
+
+def open_keyframes_cache(content_hash: str) -> TextIO:
+    return open(get_keyframes_cache_path(content_hash) + ".partial", "w", encoding="utf-8")
+
+
+def discard_keyframes_cache(cache_file: TextIO):
+    """Removes the partial cache file if the upload has failed"""
+
+    cache_file.close()
+    if path.exists(cache_file.name):
+        remove(cache_file.name)
+
+
+def encode_reduced_keyframes(
+    tracks: dict[str, KeyframeTrack],
+    *,
+    columnar: bool,
+    reduce: bool,
+    keep_last=False,
+    preferences: OuterScoutPreferences,
+) -> tuple[PutKeyframesJson | PutColumnarKeyframesJson, int]:
+    """Returns the keyframes in the smallest format and the number of keyframes in it.
+    reduce should only be set if the mod supports SPARSE_KEYFRAMES_FEATURE, otherwise the keyframes are dense.
+    keep_last is set for the chunks of a longer track, see reduce_keyframes"""
+
+    keyframe_count = sum(map(len, tracks.values()))
+
+    if not reduce:
+        return encode_keyframes(tracks, columnar=columnar), keyframe_count
+
+    with timed_phase("send_keyframes.reduce"):
+        reduced_tracks = {
+            prop: reduce_keyframes(track, tolerance=get_keyframe_tolerance(preferences, prop), keep_last=keep_last)
+            for prop, track in tracks.items()
+        }
 
-    return func_name
+    reduced_keyframe_count = sum(map(len, reduced_tracks.values()))
+
+    if columnar and reduced_keyframe_count * SPARSE_KEYFRAME_SIZE_RATIO > keyframe_count:
+        return encode_keyframes(tracks, columnar=True), keyframe_count
+
+    return encode_keyframes(reduced_tracks, columnar=False), reduced_keyframe_count
+
+
+def get_keyframe_tolerance(preferences: OuterScoutPreferences, outer_scout_prop: str) -> float:
+    if outer_scout_prop.startswith("transform.position.") or outer_scout_prop.endswith("ClipPlane"):
+        return preferences.keyframe_position_tolerance
+
+    if outer_scout_prop.startswith("transform.rotation."):
+        # the error of each quaternion component turns the rotation by at most 4 times more
+        return radians(preferences.keyframe_rotation_tolerance) / 4
+
+    if outer_scout_prop.startswith(("camera.perspective.focalLength", "camera.perspective.sensorSize.")):
+        return preferences.keyframe_lens_tolerance
+
+    return KEYFRAME_DEFAULT_TOLERANCE
+
+
+@Result.do()
+def put_keyframe_chunks(api_client: APIClient, chunk_keyframes: dict[str, PutKeyframesJson | PutColumnarKeyframesJson]):
+    for track_name, keyframes in chunk_keyframes.items():
+        if track_name == SCENE_TRACKS_NAME:
+            api_client.put_scene_keyframes(keyframes).then()
+        else:
+            api_client.put_object_keyframes(track_name, keyframes).then()
+
+
+def get_recording_output_path(recording_path: str, segment: range | None) -> str:
+    if segment is None:
+        return recording_path
+
+    return get_segment_path(recording_path, segment.start, segment.stop - 1)
+
+
+def get_attributes(source: object, paths: tuple[str, ...]) -> list[float]:
+    return [getattr(source, path) for path in paths]
+
+
+def get_value_tracks(values: np.ndarray, props_to_track: dict[str, str]) -> dict[str, list[float]]:
+    return {outer_scout_prop: values[:, i].tolist() for i, outer_scout_prop in enumerate(props_to_track)}
+
+
+def get_camera_gate_fit(context: Context, camera: Camera):
+    match camera.sensor_fit:
+        case "AUTO":
+            render = context.scene.render
+            return "horizontal" if render.resolution_x > render.resolution_y else "vertical"
+        case "VERTICAL":
+            return "vertical"
+        case "HORIZONTAL":
+            return "horizontal"
@@ -134,30 +134,18 @@ class SynchronizeOperator(Operator):
         blender_item = self._get_blender_item(context)
         blender_item_matrix = blender_item.matrix_world if isinstance(blender_item, Object) else blender_item.matrix
 
-        ground_body: Object | None = scene_props.ground_body
-        ground_matrix = ground_body.matrix_world if ground_body is not None else Matrix.Identity(4)
-        new_matrix = ground_matrix.inverted() @ blender_item_matrix
-
-        if blender_item.type == "CAMERA":
-            new_matrix @= Matrix.Rotation(radians(-90), 4, "X")
-        else:
-            new_matrix @= Matrix.Rotation(radians(180), 4, "Z")
-
-        new_transform = Transform.from_matrix(new_matrix).to_left()
+        new_transform = get_ow_local_transform(
+            scene_props,
+            blender_item_matrix,
+            is_camera=isinstance(blender_item, Object) and blender_item.type == "CAMERA",
+        )
 
         api_client.put_object(name=ow_object_name, transform=new_transform, origin=scene_props.origin_parent).then()
 
         if isinstance(blender_item, Object) and blender_item.type == "CAMERA" and self.ow_item == "ACTIVE_CAMERA":
-            blender_camera: Camera = blender_item.data
-            new_perspective: PerspectiveJson = {
-                "focalLength": blender_camera.lens,
-                "sensorSize": (blender_camera.sensor_width, blender_camera.sensor_height),
-                "lensShift": (blender_camera.shift_x, blender_camera.shift_y),
-                "nearClipPlane": blender_camera.clip_start,
-                "farClipPlane": blender_camera.clip_end,
-            }
-
-            api_client.put_camera(object_name=ow_object_name, perspective=new_perspective).then()
+            api_client.put_camera(
+                object_name=ow_object_name, perspective=get_camera_perspective_json(blender_item.data)
+            ).then()
 
         return {"FINISHED"}
 
@@ -180,3 +168,28 @@ class SynchronizeOperator(Operator):
 
         selected_objects = context.view_layer.objects.selected
         return selected_objects[0] if len(selected_objects) > 0 else context.scene.cursor
+
+
+def get_ow_local_transform(scene_props: SceneProperties, matrix_world: Matrix, *, is_camera: bool) -> Transform:
+    """Converts Blender world matrix to the Unity transform relative to the ground body"""
+
+    ground_body: Object | None = scene_props.ground_body
+    ground_matrix = ground_body.matrix_world if ground_body is not None else Matrix.Identity(4)
+    local_matrix = ground_matrix.inverted() @ matrix_world
+
+    if is_camera:
+        local_matrix @= Matrix.Rotation(radians(-90), 4, "X")
+    else:
+        local_matrix @= Matrix.Rotation(radians(180), 4, "Z")
+
+    return Transform.from_matrix(local_matrix).to_left()
+
+
+def get_camera_perspective_json(camera: Camera) -> PerspectiveJson:
+    return {
+        "focalLength": camera.lens,
+        "sensorSize": (camera.sensor_width, camera.sensor_height),
+        "lensShift": (camera.shift_x, camera.shift_y),
+        "nearClipPlane": camera.clip_start,
+        "farClipPlane": camera.clip_end,
+    }
@@ -1,7 +1,7 @@
 from bpy.types import Object, Panel
 
 from ..bpy_register import bpy_register
-from ..operators import ImportTransformRecordingOperator
+from ..operators import ConvertTransformRecordingOperator, ImportTransformRecordingOperator
 from ..properties import ObjectProperties, SceneProperties
 
 
@@ -46,3 +46,4 @@ class ObjectPanel(Panel):
                 if transform_props.has_recording_path:
                     transform_panel.prop(transform_props, "mode", expand=True)
                     transform_panel.operator(ImportTransformRecordingOperator.bl_idname, icon="IMPORT")
+                    transform_panel.operator(ConvertTransformRecordingOperator.bl_idname, icon="FILE_CACHE")
@@ -28,7 +28,7 @@ class ScenePanel(Panel):
         recording_props = SceneRecordingProperties.from_context(context)
 
         layout = self.layout
-        layout.enabled = not recording_props.in_progress
+        layout.enabled = not recording_props.in_progress and not recording_props.is_sending_keyframes
         layout.use_property_split = True
         layout.use_property_decorate = True
 
@@ -79,12 +79,33 @@ class ScenePanel(Panel):
 
         layout.separator()
 
+        layout.prop(recording_props, "use_frame_range")
+        if recording_props.use_frame_range:
+            frame_range_column = layout.column(align=True)
+            frame_range_column.prop(recording_props, "frame_start")
+            frame_range_column.prop(recording_props, "frame_end")
+
         if recording_props.in_progress:
             layout.progress(text="Recording...", factor=recording_props.progress, type="BAR")
+        elif recording_props.is_sending_keyframes:
+            layout.progress(text="Baking keyframes...", factor=recording_props.keyframes_progress, type="BAR")
         else:
             layout.operator_context = "INVOKE_DEFAULT"
             layout.operator(RecordOperator.bl_idname, icon="RENDER_ANIMATION")
 
+        if len(recording_props.baked_tracks) > 0:
+            baked_header, baked_panel = layout.panel(f"{self.bl_idname}.baked_tracks", default_closed=True)
+            baked_header.label(text="Baked Tracks")
+            if baked_panel:
+                baked_column = baked_panel.column(align=True)
+                for baked_track in recording_props.baked_tracks:
+                    baked_row = baked_column.row()
+                    baked_row.label(text=baked_track.name)
+                    baked_row.label(
+                        text=f"{'reused' if baked_track.is_reused else 'baked'}, "
+                        + f"{baked_track.sent_keyframe_count}/{baked_track.keyframe_count} keyframes"
+                    )
+
         layout.separator()
 
         layout.operator_context = "EXEC_DEFAULT"
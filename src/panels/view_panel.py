@@ -4,11 +4,13 @@ from bpy.types import Panel, SpaceView3D
 from ..bpy_register import bpy_register
 from ..operators import (
     AlignGroundBodyOperator,
+    LiveCaptureOperator,
+    LiveLinkOperator,
     SynchronizeOperator,
     ToggleGroundBodyOperator,
     WarpPlayerOperator,
 )
-from ..properties import SceneProperties
+from ..properties import LiveCaptureProperties, LiveLinkProperties, SceneProperties
 
 
 @bpy_register
@@ -76,3 +78,35 @@ class ViewPanel(Panel):
             sync_props.ow_item = "ACTIVE_CAMERA"
         elif has_active_object:
             sync_props.ow_item = "ACTIVE_CAMERA" if is_camera_selected else "PLAYER_BODY"
+
+        live_link_props = LiveLinkProperties.from_context(context)
+
+        live_link_row = layout.row(align=True)
+        live_link_row.operator_context = "INVOKE_DEFAULT"
+        live_link_row.operator(
+            LiveLinkOperator.bl_idname,
+            text="Stop Live Link" if live_link_props.in_progress else "Live Link",
+            icon="UNLINKED" if live_link_props.in_progress else "LINKED",
+            depress=live_link_props.in_progress,
+        )
+        live_link_row.prop(live_link_props, "target_rate", text="Hz")
+
+        if live_link_props.in_progress:
+            layout.label(
+                text=f"{live_link_props.achieved_rate:.0f} Hz, {live_link_props.latency * 1000:.0f} ms round trip",
+                icon="TIME",
+            )
+
+        live_capture_props = LiveCaptureProperties.from_context(context)
+
+        live_capture_row = layout.row()
+        live_capture_row.operator_context = "INVOKE_DEFAULT"
+        live_capture_row.operator(
+            LiveCaptureOperator.bl_idname,
+            text="Stop Capture" if live_capture_props.in_progress else "Capture Selected",
+            icon="PAUSE" if live_capture_props.in_progress else "REC",
+            depress=live_capture_props.in_progress,
+        )
+
+        if live_capture_props.in_progress:
+            layout.label(text=f"{live_capture_props.captured_frames} frames captured", icon="KEYFRAME")
@@ -1,4 +1,6 @@
 from .camera_props import *
+from .live_capture_props import *
+from .live_link_props import *
 from .object_props import *
 from .preferences import *
 from .scene_props import *
@@ -0,0 +1,31 @@
+from bpy.props import BoolProperty, IntProperty
+from bpy.types import Context, PropertyGroup, Scene
+
+from ..bpy_register import bpy_load_post, bpy_register_property
+
+
+@bpy_register_property(Scene, "outer_scout_live_capture")
+class LiveCaptureProperties(PropertyGroup):
+    in_progress: BoolProperty(
+        default=False,
+        options=set(),
+    )
+
+    captured_frames: IntProperty(
+        default=0,
+        min=0,
+        options=set(),
+    )
+
+    @staticmethod
+    def from_context(context: Context) -> "LiveCaptureProperties":
+        return context.scene.outer_scout_live_capture
+
+
+@bpy_load_post
+def reset_live_capture_on_load():
+    import bpy
+
+    # the modal operator doesn't survive file loading, but the flag is saved in the file
+    for scene in bpy.data.scenes:
+        scene.outer_scout_live_capture.in_progress = False
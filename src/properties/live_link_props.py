@@ -0,0 +1,46 @@
+from bpy.props import BoolProperty, FloatProperty
+from bpy.types import Context, PropertyGroup, Scene
+
+from ..bpy_register import bpy_load_post, bpy_register_property
+
+
+@bpy_register_property(Scene, "outer_scout_live_link")
+class LiveLinkProperties(PropertyGroup):
+    in_progress: BoolProperty(
+        default=False,
+        options=set(),
+    )
+
+    target_rate: FloatProperty(
+        name="Live Link Rate",
+        description="How many times per second the active camera is sent to Outer Wilds. Updates are skipped if the camera didn't change or the game is still busy with the previous one",
+        default=30,
+        min=1,
+        max=120,
+        options=set(),
+    )
+
+    achieved_rate: FloatProperty(
+        default=0,
+        min=0,
+        options=set(),
+    )
+
+    latency: FloatProperty(
+        default=0,
+        min=0,
+        options=set(),
+    )
+
+    @staticmethod
+    def from_context(context: Context) -> "LiveLinkProperties":
+        return context.scene.outer_scout_live_link
+
+
+@bpy_load_post
+def reset_live_link_on_load():
+    import bpy
+
+    # the modal operator doesn't survive file loading, but the flag is saved in the file
+    for scene in bpy.data.scenes:
+        scene.outer_scout_live_link.in_progress = False
@@ -1,6 +1,6 @@
 from bl_ui.generic_ui_list import draw_ui_list  # pyright: ignore [reportMissingImports]
-from bpy.props import CollectionProperty, FloatProperty, IntProperty, StringProperty
-from bpy.types import AddonPreferences, Context, PropertyGroup
+from bpy.props import BoolProperty, CollectionProperty, FloatProperty, IntProperty, StringProperty
+from bpy.types import AddonPreferences, Context, PropertyGroup, UILayout
 
 from ..bpy_register import bpy_load_post, bpy_register, bpy_register_post
 
@@ -48,6 +48,89 @@ class OuterScoutPreferences(AddonPreferences):
         default=2209,
     )
 
+    api_connect_timeout: FloatProperty(
+        name="Connect Timeout",
+        description="Time interval in seconds. The request fails if the connection to the mod isn't established in this time",
+        default=2,
+        min=0.1,
+        options=set(),
+    )
+
+    api_poll_timeout: FloatProperty(
+        name="Status Timeout",
+        description="Time interval in seconds. Maximum wait for a response to a short status request (recording progress, etc.)",
+        default=2,
+        min=0.1,
+        options=set(),
+    )
+
+    api_request_timeout: FloatProperty(
+        name="Request Timeout",
+        description="Time interval in seconds. Maximum wait for a response to a regular request",
+        default=10,
+        min=0.1,
+        options=set(),
+    )
+
+    api_long_request_timeout: FloatProperty(
+        name="Long Request Timeout",
+        description="Time interval in seconds. Maximum wait for a response to a slow request (mesh export, keyframes upload)",
+        default=300,
+        min=0.1,
+        options=set(),
+    )
+
+    api_max_retries: IntProperty(
+        name="Retries",
+        description="How many times an idempotent request is repeated if the mod is unreachable or temporarily unavailable. The retries share the timeout of the request",
+        default=2,
+        min=0,
+        max=10,
+        options=set(),
+    )
+
+    reduce_keyframes: BoolProperty(
+        name="Reduce Keyframes",
+        description="Before recording, drop the keyframes that the mod can restore by interpolating the neighbouring ones within the tolerances below. Constant properties are sent as a single keyframe. Only used if the mod supports sparse keyframes",
+        default=True,
+        options=set(),
+    )
+
+    keyframe_position_tolerance: FloatProperty(
+        name="Position Tolerance",
+        description="Distance in metres. Maximum error of the reduced position and clip plane keyframes",
+        default=0.0001,
+        min=0,
+        precision=5,
+        options=set(),
+    )
+
+    keyframe_rotation_tolerance: FloatProperty(
+        name="Rotation Tolerance",
+        description="Angle in degrees. Maximum error of the reduced rotation keyframes",
+        default=0.01,
+        min=0,
+        precision=4,
+        options=set(),
+    )
+
+    keyframe_lens_tolerance: FloatProperty(
+        name="Lens Tolerance",
+        description="Length in millimetres. Maximum error of the reduced focal length and sensor size keyframes",
+        default=0.01,
+        min=0,
+        precision=4,
+        options=set(),
+    )
+
+    keyframe_chunk_size: IntProperty(
+        name="Chunk Size",
+        description="Number of frames in one keyframes upload request. Long timelines are baked and sent in chunks, so that the game doesn't stall while parsing one huge request",
+        default=1000,
+        min=10,
+        options=set(),
+    )
+
     ow_bodies_folder: StringProperty(
         name="Bodies Folder",
         description="Folder that contains .fbx and .blend files of Outer Wilds planets (bodies)",
@@ -60,6 +143,12 @@ class OuterScoutPreferences(AddonPreferences):
         subtype="DIR_PATH",
     )
 
+    ffmpeg_path: StringProperty(
+        name="FFmpeg",
+        description="FFmpeg executable that splices the videos of a partial recording into the full ones. If empty, ffmpeg is searched in PATH",
+        subtype="FILE_PATH",
+    )
+
     import_ignore_paths: CollectionProperty(
         name="Ignore Paths",
         type=IgnoredAssetPath,
@@ -82,12 +171,20 @@ class OuterScoutPreferences(AddonPreferences):
 
     modal_timer_delay: FloatProperty(
         name="Modal Delay",
-        description="Time interval in seconds. Controls how often the addon will ask Outer Wilds about the recording progress",
+        description="Time interval in seconds. Controls how often the addon checks the recording progress. Outer Wilds is asked less frequently if the recording is slow",
         default=0.1,
         min=0.001,
         options=set(),
     )
 
+    api_cache_ttl: FloatProperty(
+        name="API Cache Lifetime",
+        description="Time interval in seconds. Game data that rarely changes (current scene, ground body, etc.) is reused for this long instead of being requested again",
+        default=2,
+        min=0,
+        options=set(),
+    )
+
     @staticmethod
     def from_context(context: Context) -> "OuterScoutPreferences":
         return context.preferences.addons[ADDON_PACKAGE].preferences
@@ -102,12 +199,35 @@ class OuterScoutPreferences(AddonPreferences):
         if mod_panel:
             mod_panel.prop(self, "api_port")
 
+            timeouts_column = mod_panel.column(align=True)
+            timeouts_column.prop(self, "api_connect_timeout")
+            timeouts_column.prop(self, "api_poll_timeout")
+            timeouts_column.prop(self, "api_request_timeout")
+            timeouts_column.prop(self, "api_long_request_timeout")
+
+            mod_panel.prop(self, "api_max_retries")
+
+        keyframes_panel_header, keyframes_panel = layout.panel(f"{self.bl_idname}.keyframes", default_closed=True)
+        keyframes_panel_header.label(text="Keyframes")
+
+        if keyframes_panel:
+            keyframes_panel.prop(self, "reduce_keyframes")
+
+            tolerances_column = keyframes_panel.column(align=True)
+            tolerances_column.enabled = self.reduce_keyframes
+            tolerances_column.prop(self, "keyframe_position_tolerance")
+            tolerances_column.prop(self, "keyframe_rotation_tolerance")
+            tolerances_column.prop(self, "keyframe_lens_tolerance")
+
+            keyframes_panel.prop(self, "keyframe_chunk_size")
+
         assets_panel_header, assets_panel = layout.panel(f"{self.bl_idname}.paths", default_closed=False)
         assets_panel_header.label(text="Asset Folders")
 
         if assets_panel:
             assets_panel.prop(self, "ow_bodies_folder", icon="ERROR" if not self.ow_bodies_folder else "NONE")
             assets_panel.prop(self, "ow_assets_folder", icon="ERROR" if not self.ow_assets_folder else "NONE")
+            assets_panel.prop(self, "ffmpeg_path")
 
             if not (self.ow_bodies_folder and self.ow_assets_folder):
                 assets_panel.box().label(text="Folder paths are required for planet .blend generation", icon="ERROR")
@@ -145,6 +265,41 @@ class OuterScoutPreferences(AddonPreferences):
 
         if misc_panel:
             misc_panel.prop(self, "modal_timer_delay")
+            misc_panel.prop(self, "api_cache_ttl")
+
+        diagnostics_panel_header, diagnostics_panel = layout.panel(f"{self.bl_idname}.diagnostics", default_closed=True)
+        diagnostics_panel_header.label(text="Diagnostics")
+
+        if diagnostics_panel:
+            self._draw_diagnostics(diagnostics_panel)
+
+    def _draw_diagnostics(self, layout: UILayout):
+        from ..api import API_METRICS, APISession
+
+        get_cache = APISession.of_port(self.api_port).get_cache
+        layout.label(text=f"Cache: {get_cache.hits} hits, {get_cache.misses} misses")
+
+        routes = API_METRICS.sorted_routes()
+
+        if not routes:
+            layout.label(text="No requests were sent yet")
+        else:
+            routes_column = layout.box().column(align=True)
+
+            for route, route_metrics in routes:
+                route_row = routes_column.split(factor=0.45)
+                route_row.label(text=route)
+                route_row.label(
+                    text=f"{route_metrics.count}x"
+                    + f"  avg {route_metrics.mean_latency * 1000:.0f}ms"
+                    + f"  p95 {route_metrics.latency_percentile(0.95) * 1000:.0f}ms"
+                    + f"  err {route_metrics.error_rate:.0%}"
+                    + f"  {route_metrics.bytes_sent / 1024:.0f}/{route_metrics.bytes_received / 1024:.0f} KiB"
+                )
+
+        buttons_row = layout.row()
+        buttons_row.operator("outer_scout.export_api_metrics", icon="EXPORT")
+        buttons_row.operator("outer_scout.clear_api_metrics", icon="TRASH")
 
     @property
     def has_file_paths(self) -> bool:
@@ -1,7 +1,35 @@
-from bpy.props import BoolProperty, FloatProperty
+from bpy.props import BoolProperty, CollectionProperty, FloatProperty, IntProperty, StringProperty
 from bpy.types import Context, PropertyGroup, Scene
 
-from ..bpy_register import bpy_register_property
+from ..bpy_register import bpy_register, bpy_register_property
+
+
+@bpy_register
+class BakedTrackProperties(PropertyGroup):
+    """Baked keyframes of a Unity object from the previous recording. The name is the Unity object name.
+    The encoded keyframes are in the cache file of the content hash, see get_keyframes_cache_path"""
+
+    content_hash: StringProperty(
+        default="",
+        options=set(),
+    )
+
+    keyframe_count: IntProperty(
+        default=0,
+        min=0,
+        options=set(),
+    )
+
+    sent_keyframe_count: IntProperty(
+        default=0,
+        min=0,
+        options=set(),
+    )
+
+    is_reused: BoolProperty(
+        default=False,
+        options=set(),
+    )
 
 
 @bpy_register_property(Scene, "outer_scout_recording")
@@ -18,6 +46,105 @@ class SceneRecordingProperties(PropertyGroup):
         options=set(),
     )
 
+    use_frame_range: BoolProperty(
+        name="Record Range",
+        description="Record only the frames from Start to End, and splice them into the existing recordings on import. Useful for fixing a few frames of a long shot",
+        default=False,
+        options=set(),
+    )
+
+    frame_start: IntProperty(
+        name="Start",
+        description="First frame of the recorded range",
+        default=1,
+        options=set(),
+    )
+
+    frame_end: IntProperty(
+        name="End",
+        description="Last frame of the recorded range",
+        default=250,
+        options=set(),
+    )
+
+    has_segment: BoolProperty(
+        default=False,
+        options=set(),
+    )
+
+    segment_frame_start: IntProperty(
+        default=0,
+        options=set(),
+    )
+
+    segment_frame_end: IntProperty(
+        default=0,
+        options=set(),
+    )
+
+    segment_scene_frame_start: IntProperty(
+        default=0,
+        options=set(),
+    )
+
+    segment_scene_frame_end: IntProperty(
+        default=0,
+        options=set(),
+    )
+
+    is_sending_keyframes: BoolProperty(
+        default=False,
+        options=set(),
+    )
+
+    keyframes_progress: FloatProperty(
+        default=0,
+        min=0,
+        max=1,
+        options=set(),
+    )
+
+    baked_tracks: CollectionProperty(
+        type=BakedTrackProperties,
+        options=set(),
+    )
+
     @staticmethod
     def from_context(context: Context) -> "SceneRecordingProperties":
         return context.scene.outer_scout_recording
+
+    def get_baked_track(self, name: str) -> BakedTrackProperties | None:
+        return self.baked_tracks.get(name)
+
+    def get_frame_range(self, scene: Scene) -> range:
+        """Frames of the next recording: the Start..End range, or the whole scene range"""
+
+        if self.use_frame_range:
+            return range(self.frame_start, self.frame_end + 1)
+
+        return range(scene.frame_start, scene.frame_end + 1)
+
+    @property
+    def segment_frame_range(self) -> range | None:
+        """Frames of the last recording, if only a part of the scene range was recorded.
+        The segment files are spliced into the full recordings on import"""
+
+        if not self.has_segment:
+            return None
+
+        return range(self.segment_frame_start, self.segment_frame_end + 1)
+
+    @property
+    def segment_scene_frame_range(self) -> range:
+        """Scene range when the last segment was recorded, which is the range of the full recordings"""
+
+        return range(self.segment_scene_frame_start, self.segment_scene_frame_end + 1)
+
+    def get_segment_import_range(self, scene: Scene) -> range | None:
+        """Scene frames of the last segment. They are moved with the scene range if it has moved since the recording"""
+
+        if (segment := self.segment_frame_range) is None:
+            return None
+
+        offset = scene.frame_start - self.segment_scene_frame_start
+        return range(segment.start + offset, segment.stop + offset)
@@ -9,7 +9,7 @@ from ..bpy_register import bpy_register
 class TransformRecordingProperties(PropertyGroup):
     recording_path: StringProperty(
         name="Transform Recording Path",
-        description="The path to the file where the transform recording (json) will be saved",
+        description="The path to the file where the transform recording will be saved. Newer mod versions write a compact binary file instead of json",
         subtype="FILE_PATH",
         default="",
         options={"PATH_SUPPORTS_BLEND_RELATIVE"},
@@ -1,7 +1,16 @@
+from .animation_hash import *
+from .bake import *
 from .defer import *
 from .driver import *
+from .fcurve import *
 from .iter import *
+from .json_stream import *
+from .matrix import *
 from .node import *
 from .object import *
 from .operator import *
+from .recording_workers import *
 from .result import *
+from .segment import *
+from .timing import *
+from .transform_recording import *
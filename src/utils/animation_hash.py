@@ -0,0 +1,257 @@
+from hashlib import blake2b
+from typing import Iterable, Iterator
+
+import numpy as np
+from bpy.types import ID, Action, ActionChannelbag, ActionSlot, AnimData, FCurve, Object, bpy_struct
+
+OBJECT_TRANSFORM_PROPS = (
+    "location",
+    "rotation_mode",
+    "rotation_quaternion",
+    "rotation_euler",
+    "rotation_axis_angle",
+    "scale",
+    "delta_location",
+    "delta_rotation_quaternion",
+    "delta_rotation_euler",
+    "delta_scale",
+    "matrix_parent_inverse",
+    "parent_type",
+    "parent_bone",
+    "track_axis",
+    "up_axis",
+)
+
+KEYFRAME_FLOAT_PROPS = ("co", "handle_left", "handle_right", "back", "amplitude", "period")
+
+KEYFRAME_ENUM_PROPS = ("interpolation", "easing", "handle_left_type", "handle_right_type")
+
+
+class AnimationHasher:
+    """Hashes the data that affects the evaluated animation: fcurves, NLA strips, drivers, static values,
+    parents and constraints. Objects and IDs that are referenced by parents, constraints or drivers are hashed too.
+
+    Static values of animated properties are skipped, so the hash doesn't depend on the current frame"""
+
+    _hash: "blake2b"
+    _visited: set[int]
+
+    def __init__(self):
+        self._hash = blake2b(digest_size=16)
+        self._visited = set()
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    def add_values(self, *values):
+        self._hash.update(repr(values).encode())
+
+    def add_object(self, object: Object):
+        if not self._visit(object):
+            return
+
+        animated_paths = self.add_animation(object)
+        self.add_props(object, OBJECT_TRANSFORM_PROPS, animated_paths)
+
+        if object.parent is not None:
+            self.add_object(object.parent)
+
+        for constraint in object.constraints:
+            self.add_struct(constraint, animated_paths, path=constraint.path_from_id())
+
+    def add_id(self, id: ID, props: Iterable[str] = ()):
+        """Hashes the animation of an ID and the static values of its props"""
+
+        if isinstance(id, Object):
+            self.add_object(id)
+            self.add_props(id, props, self.get_animated_paths(id))
+            return
+
+        if not self._visit(id):
+            return
+
+        animated_paths = self.add_animation(id)
+        self.add_props(id, props, animated_paths)
+
+    def add_animation(self, id: ID) -> set[tuple[str, int]]:
+        """Hashes the animation data of the ID. Returns the animated (data_path, array_index) pairs"""
+
+        anim_data: AnimData | None = getattr(id, "animation_data", None)
+        if anim_data is None:
+            self.add_values(None)
+            return set()
+
+        self.add_values(anim_data.action_blend_type, anim_data.action_influence, anim_data.use_nla)
+
+        for fcurve in get_slot_fcurves(anim_data.action, anim_data.action_slot):
+            self._add_fcurve(fcurve)
+
+        if anim_data.use_nla:
+            for nla_track in anim_data.nla_tracks:
+                self.add_values(nla_track.mute, nla_track.is_solo)
+                for strip in nla_track.strips:
+                    self.add_values(
+                        strip.mute,
+                        strip.frame_start,
+                        strip.frame_end,
+                        strip.action_frame_start,
+                        strip.action_frame_end,
+                        strip.repeat,
+                        strip.scale,
+                        strip.blend_type,
+                        strip.influence,
+                        strip.extrapolation,
+                    )
+                    for fcurve in get_slot_fcurves(strip.action, strip.action_slot):
+                        self._add_fcurve(fcurve)
+
+        for driver_fcurve in anim_data.drivers:
+            self._add_fcurve(driver_fcurve)
+            self._add_driver(driver_fcurve)
+
+        return self.get_animated_paths(id)
+
+    def add_props(self, struct: bpy_struct, props: Iterable[str], animated_paths: set[tuple[str, int]], *, path=""):
+        for prop in props:
+            prop_path = f"{path}.{prop}" if path else prop
+            value = getattr(struct, prop)
+
+            if isinstance(value, (str, int, float, bool)) or value is None:
+                self.add_values(prop, None if (prop_path, 0) in animated_paths else value)
+            elif isinstance(value, set):
+                self.add_values(prop, sorted(value))
+            elif isinstance(value, ID):
+                self.add_values(prop, value.name)
+                self.add_id(value)
+            elif isinstance(value, bpy_struct):
+                self.add_values(prop, value.bl_rna.identifier)
+            else:
+                # vectors, quaternions, matrices
+                self.add_values(
+                    prop,
+                    [
+                        None if (prop_path, index) in animated_paths else item
+                        for index, item in enumerate(np.asarray(value, dtype=np.float64).ravel().tolist())
+                    ],
+                )
+
+    def add_struct(self, struct: bpy_struct, animated_paths: set[tuple[str, int]], *, path=""):
+        """Hashes all editable non-collection properties of the struct, like constraint settings"""
+
+        props = [
+            prop.identifier
+            for prop in struct.bl_rna.properties
+            if not prop.is_readonly and prop.type != "COLLECTION" and prop.identifier != "show_expanded"
+        ]
+
+        self.add_values(struct.bl_rna.identifier)
+        self.add_props(struct, props, animated_paths, path=path)
+
+    @staticmethod
+    def get_animated_paths(id: ID) -> set[tuple[str, int]]:
+        anim_data: AnimData | None = getattr(id, "animation_data", None)
+        if anim_data is None:
+            return set()
+
+        fcurves = [*anim_data.drivers, *get_slot_fcurves(anim_data.action, anim_data.action_slot)]
+        if anim_data.use_nla:
+            fcurves += (
+                fcurve
+                for nla_track in anim_data.nla_tracks
+                for strip in nla_track.strips
+                for fcurve in get_slot_fcurves(strip.action, strip.action_slot)
+            )
+
+        return {(fcurve.data_path, fcurve.array_index) for fcurve in fcurves}
+
+    def _visit(self, id: ID) -> bool:
+        self.add_values(id.name)
+
+        if id.as_pointer() in self._visited:
+            return False
+
+        self._visited.add(id.as_pointer())
+        return True
+
+    def _add_fcurve(self, fcurve: FCurve):
+        keyframe_points = fcurve.keyframe_points
+
+        self.add_values(
+            fcurve.data_path,
+            fcurve.array_index,
+            fcurve.mute,
+            fcurve.extrapolation,
+            len(keyframe_points),
+            [(modifier.type, modifier.mute, modifier.influence) for modifier in fcurve.modifiers],
+        )
+
+        for prop in KEYFRAME_FLOAT_PROPS:
+            size = len(keyframe_points) * (2 if prop in ("co", "handle_left", "handle_right") else 1)
+            values = np.empty(size, dtype=np.float32)
+            keyframe_points.foreach_get(prop, values)
+            self._hash.update(values.tobytes())
+
+        for prop in KEYFRAME_ENUM_PROPS:
+            values = np.empty(len(keyframe_points), dtype=np.int32)
+            keyframe_points.foreach_get(prop, values)
+            self._hash.update(values.tobytes())
+
+    def _add_driver(self, driver_fcurve: FCurve):
+        driver = driver_fcurve.driver
+        self.add_values(driver.type, driver.expression, driver.use_self)
+
+        for variable in driver.variables:
+            self.add_values(variable.name, variable.type)
+
+            for target in variable.targets:
+                self.add_values(
+                    target.id_type, target.data_path, target.bone_target, target.transform_type, target.transform_space
+                )
+
+                if target.id is None:
+                    continue
+
+                self.add_id(target.id)
+
+                # the driver might read a value that isn't animated
+                if variable.type == "SINGLE_PROP" and target.data_path:
+                    self._add_driver_target_value(target.id, target.data_path)
+
+    def _add_driver_target_value(self, id: ID, data_path: str):
+        animated_paths = self.get_animated_paths(id)
+        if any(data_path.startswith(animated_path) for animated_path, _ in animated_paths):
+            return
+
+        try:
+            value = id.path_resolve(data_path)
+        except ValueError:
+            self.add_values(None)
+            return
+
+        if isinstance(value, (str, int, float, bool)):
+            self.add_values(value)
+        elif not isinstance(value, bpy_struct):
+            try:
+                self.add_values(np.asarray(value, dtype=np.float64).ravel().tolist())
+            except (TypeError, ValueError):
+                self.add_values(type(value).__name__)
+
+
+def get_slot_fcurves(action: Action | None, slot: ActionSlot | None) -> Iterator[FCurve]:
+    """Yields the fcurves that animate the slot. An action can be shared by several IDs,
+    like a camera object and its data, and Action.fcurves only has the fcurves of the first slot"""
+
+    for channelbag in get_slot_channelbags(action, slot):
+        yield from channelbag.fcurves
+
+
+def get_slot_channelbags(action: Action | None, slot: ActionSlot | None) -> Iterator[ActionChannelbag]:
+    """Yields the channelbags of the slot in every layer and strip of the action, which own its fcurves"""
+
+    if action is None or slot is None:
+        return
+
+    for layer in action.layers:
+        for strip in layer.strips:
+            if (channelbag := strip.channelbag(slot)) is not None:
+                yield channelbag
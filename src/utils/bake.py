@@ -0,0 +1,79 @@
+from typing import Callable, Iterator, Sequence
+
+import numpy as np
+from bpy.types import Scene
+from mathutils import Matrix
+
+FrameSampler = Callable[[int], None]
+
+
+class TrackBaker:
+    """Bakes values of several objects in one pass over the frame range.
+    Each frame is evaluated once, and every added track copies it into a preallocated array.
+
+    With chunk_size the arrays only hold one chunk of frames at a time, see bake_chunks"""
+
+    scene: Scene
+    frames: range
+    chunk_size: int
+
+    _samplers: list[FrameSampler]
+
+    def __init__(self, scene: Scene, frames: range, *, chunk_size: int | None = None):
+        self.scene = scene
+        self.frames = frames
+        self.chunk_size = max(1, min(chunk_size or len(frames), len(frames)))
+
+        self._samplers = []
+
+    def add_values(self, get_values: Callable[[], Sequence[float]], count: int) -> np.ndarray:
+        """Returns the (chunk_size, count) array which will contain values returned by get_values on each frame"""
+
+        values = np.zeros((self.chunk_size, count))
+
+        def sample(frame_index: int):
+            values[frame_index] = get_values()
+
+        self._samplers.append(sample)
+        return values
+
+    def add_matrix(self, get_matrix: Callable[[], Matrix]) -> np.ndarray:
+        """Returns the (chunk_size, 4, 4) array which will contain matrices returned by get_matrix on each frame"""
+
+        matrices = np.zeros((self.chunk_size, 4, 4))
+
+        def sample(frame_index: int):
+            matrices[frame_index] = get_matrix()
+
+        self._samplers.append(sample)
+        return matrices
+
+    @property
+    def chunk_count(self) -> int:
+        return len(range(0, len(self.frames), self.chunk_size))
+
+    def bake(self):
+        for _ in self.bake_chunks():
+            pass
+
+    def bake_chunks(self) -> Iterator[range]:
+        """Bakes the frames chunk by chunk. Yields the frames of each chunk when the arrays are filled with them:
+        the first len(chunk) rows are valid until the next chunk is baked.
+        The current frame is restored when the generator is exhausted or closed"""
+
+        scene = self.scene
+        samplers = self._samplers
+        frame_back = scene.frame_current
+
+        try:
+            for chunk_start in range(0, len(self.frames), self.chunk_size):
+                chunk_frames = self.frames[chunk_start : chunk_start + self.chunk_size]
+
+                for frame_index, frame in enumerate(chunk_frames if samplers else ()):
+                    scene.frame_set(frame)
+                    for sample in samplers:
+                        sample(frame_index)
+
+                yield chunk_frames
+        finally:
+            scene.frame_set(frame_back)
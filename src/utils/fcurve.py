@@ -0,0 +1,111 @@
+from typing import Collection
+
+import numpy as np
+from bpy.types import FCurve, Object
+
+from .animation_hash import get_slot_channelbags, get_slot_fcurves
+
+KEYFRAME_POINT_PROPS = (
+    ("co", 2, np.float32),
+    ("handle_left", 2, np.float32),
+    ("handle_right", 2, np.float32),
+    ("interpolation", 1, np.int32),
+    ("easing", 1, np.int32),
+    ("handle_left_type", 1, np.int32),
+    ("handle_right_type", 1, np.int32),
+    ("type", 1, np.int32),
+    ("back", 1, np.float32),
+    ("amplitude", 1, np.float32),
+    ("period", 1, np.float32),
+    ("select_control_point", 1, bool),
+    ("select_left_handle", 1, bool),
+    ("select_right_handle", 1, bool),
+)
+
+
+def insert_keyframes(object: Object, data_path: str, frames: np.ndarray, values: np.ndarray):
+    """Inserts keyframes of the (frames, array length) values on the frames, like keyframe_insert on each frame.
+    Only the first keyframe is inserted with keyframe_insert, which creates the action and the fcurves
+    with the user preferences. The rest are added to each fcurve at once"""
+
+    if len(frames) == 0:
+        return
+
+    object.keyframe_insert(data_path, frame=float(frames[0]))
+
+    anim_data = object.animation_data
+    fcurves = {
+        fcurve.array_index: fcurve
+        for fcurve in get_slot_fcurves(anim_data.action, anim_data.action_slot)
+        if fcurve.data_path == data_path
+    }
+
+    for array_index, fcurve in fcurves.items():
+        merge_keyframe_points(fcurve, frames, values[:, array_index])
+
+
+def remove_keyframes(object: Object, data_paths: Collection[str], frames: range | None = None):
+    """Removes the fcurves of the data paths from the action slot of the object.
+    With frames, only the keyframes on them are removed"""
+
+    if (anim_data := object.animation_data) is None:
+        return
+
+    for channelbag in get_slot_channelbags(anim_data.action, anim_data.action_slot):
+        for fcurve in list(channelbag.fcurves):
+            if fcurve.data_path not in data_paths:
+                continue
+
+            if frames is not None:
+                remove_keyframes_in_range(fcurve, frames)
+            else:
+                channelbag.fcurves.remove(fcurve)
+
+
+def remove_keyframes_in_range(fcurve: FCurve, frames: range):
+    keyframe_points = fcurve.keyframe_points
+
+    for keyframe_point in reversed(list(keyframe_points)):
+        if frames.start <= keyframe_point.co.x < frames.stop:
+            keyframe_points.remove(keyframe_point, fast=True)
+
+    fcurve.update()
+
+
+def merge_keyframe_points(fcurve: FCurve, frames: np.ndarray, values: np.ndarray):
+    """Replaces the keyframes on the frames, and adds the missing ones. New keyframes copy the settings
+    (interpolation, handle types, ...) of the existing keyframe on the first frame"""
+
+    keyframe_points = fcurve.keyframe_points
+    existing_count = len(keyframe_points)
+
+    existing_props: dict[str, np.ndarray] = {}
+    for prop, size, dtype in KEYFRAME_POINT_PROPS:
+        prop_values = np.empty(existing_count * size, dtype=dtype)
+        keyframe_points.foreach_get(prop, prop_values)
+        existing_props[prop] = prop_values.reshape(existing_count, size)
+
+    existing_frames = existing_props["co"][:, 0]
+    template_index = int(np.flatnonzero(existing_frames == np.float32(frames[0]))[0])
+    is_kept = ~np.isin(existing_frames, np.asarray(frames, dtype=np.float32))
+
+    new_co = np.column_stack((frames, values)).astype(np.float32)
+
+    merged_props: dict[str, np.ndarray] = {}
+    for prop, size, _ in KEYFRAME_POINT_PROPS:
+        if prop in ("co", "handle_left", "handle_right"):
+            # auto handles are calculated by update, the others start at the keyframe
+            new_values = new_co
+        else:
+            new_values = np.repeat(existing_props[prop][template_index : template_index + 1], len(frames), axis=0)
+
+        merged_props[prop] = np.concatenate((existing_props[prop][is_kept], new_values))
+
+    order = np.argsort(merged_props["co"][:, 0], kind="stable")
+
+    keyframe_points.add(len(order) - existing_count)
+
+    for prop, merged_values in merged_props.items():
+        keyframe_points.foreach_set(prop, merged_values[order].ravel())
+
+    fcurve.update()
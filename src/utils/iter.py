@@ -1,4 +1,4 @@
-from typing import Any, Generator, Generic, Iterable, TypeVar
+from typing import Any, Callable, Generator, Generic, Iterable, TypeVar
 
 TItem = TypeVar("TItem")
 
@@ -30,8 +30,17 @@ class GeneratorWithState(Generic[TYield, TSend, TReturn]):
         return self
 
     def __next__(self):
+        return self._step(lambda: next(self._generator))
+
+    def send(self, value: TSend) -> TYield:
+        return self._step(lambda: self._generator.send(value))
+
+    def throw(self, exception: BaseException) -> TYield:
+        return self._step(lambda: self._generator.throw(exception))
+
+    def _step(self, step: Callable[[], TYield]) -> TYield:
         try:
-            yielded = self.last_yielded = next(self._generator)
+            yielded = self.last_yielded = step()
             return yielded
         except StopIteration as stop:
             self.returned = stop.value
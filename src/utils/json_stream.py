@@ -0,0 +1,148 @@
+import codecs
+import json
+from typing import Any, Generator, Iterable, Iterator
+
+WHITESPACE = " \t\n\r"
+
+# characters that can continue a number. A valid number is never followed by them
+NUMBER_CHARACTERS = "0123456789.eE+-"
+
+JSON_DECODER = json.JSONDecoder()
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+class _TextBuffer:
+    text: str
+    position: int
+
+    _chunks: Iterator[bytes]
+    _decoder: codecs.IncrementalDecoder
+    _is_exhausted: bool
+
+    def __init__(self, chunks: Iterable[bytes], encoding: str):
+        self.text = ""
+        self.position = 0
+
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._is_exhausted = False
+
+    def fill(self) -> bool:
+        """Appends the next chunks to the text, until the unconsumed text is at least twice as long.
+        A value split across many chunks is then decoded again O(log n) times instead of once per chunk.
+        Returns False if there's no more data"""
+
+        if self._is_exhausted:
+            return False
+
+        unconsumed_size = len(self.text) - self.position
+        texts = [self.text]
+        read_size = 0
+
+        while read_size == 0 or read_size < unconsumed_size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._is_exhausted = True
+                texts.append(self._decoder.decode(b"", final=True))
+                break
+
+            texts.append(self._decoder.decode(chunk))
+            read_size += len(texts[-1])
+
+        self.text = "".join(texts)
+        return True
+
+    def discard_consumed(self):
+        self.text = self.text[self.position :]
+        self.position = 0
+
+    def peek(self) -> str:
+        while True:
+            while self.position < len(self.text) and self.text[self.position] in WHITESPACE:
+                self.position += 1
+
+            if self.position < len(self.text):
+                return self.text[self.position]
+
+            if not self.fill():
+                raise JsonStreamError("unexpected end of json stream")
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if character not in characters:
+            raise JsonStreamError(f"expected one of '{characters}' at json stream, got '{character}'")
+
+        self.position += 1
+        return character
+
+    def decode_value(self) -> Any:
+        self.peek()
+
+        while True:
+            # a value inside an object or array is always followed by something, so if it ends
+            # at the end of the buffer, it might be incomplete (like a number split between chunks)
+            try:
+                value, end = JSON_DECODER.raw_decode(self.text, self.position)
+                if end < len(self.text) and not self._is_number_cut(value, end):
+                    self.position = end
+                    return value
+            except json.JSONDecodeError as decode_error:
+                if not self._is_exhausted:
+                    self.fill()
+                    continue
+                raise JsonStreamError(str(decode_error)) from decode_error
+
+            if not self.fill():
+                raise JsonStreamError("unexpected end of json stream")
+
+    def _is_number_cut(self, value: Any, end: int) -> bool:
+        """Whether the decoded number continues in the next chunk, like 3. + 25 (which decodes as 3)"""
+
+        is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+        return is_number and not self._is_exhausted and self.text[end] in NUMBER_CHARACTERS
+
+
+def iter_json_object(
+    chunks: Iterable[bytes], *, streamed_keys: set[str], encoding="utf-8"
+) -> Generator[tuple[str, Any], None, None]:
+    """Incrementally parses a JSON object from byte chunks.
+
+    Yields (key, value) pairs in the order of the document. Arrays at the streamed_keys
+    are not materialized: each of their items is yielded as a separate (key, item) pair"""
+
+    buffer = _TextBuffer(chunks, encoding)
+
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+
+    while True:
+        key = buffer.decode_value()
+        if not isinstance(key, str):
+            raise JsonStreamError("expected string key at json stream")
+
+        buffer.expect(":")
+
+        if key in streamed_keys and buffer.peek() == "[":
+            buffer.expect("[")
+
+            if buffer.peek() != "]":
+                while True:
+                    item = buffer.decode_value()
+                    buffer.discard_consumed()
+                    yield key, item
+
+                    if buffer.expect(",]") == "]":
+                        break
+            else:
+                buffer.expect("]")
+        else:
+            value = buffer.decode_value()
+            buffer.discard_consumed()
+            yield key, value
+
+        if buffer.expect(",}") == "}":
+            return
@@ -0,0 +1,92 @@
+import numpy as np
+from mathutils import Matrix
+
+
+def matrix_to_array(matrix: Matrix) -> np.ndarray:
+    return np.array(matrix, dtype=np.float64)
+
+
+def normalize_rotations(matrices: np.ndarray) -> np.ndarray:
+    """Removes the scale of each (N, 4, 4) matrix, keeping the rotation and the translation"""
+
+    normalized = matrices.copy()
+    normalized[:, :3, :3] /= np.linalg.norm(matrices[:, :3, :3], axis=1, keepdims=True)
+    return normalized
+
+
+def matrices_to_quaternions(matrices: np.ndarray) -> np.ndarray:
+    """Converts the rotation of (N, 4, 4) or (N, 3, 3) matrices to (N, 4) quaternions (w, x, y, z),
+    like Matrix.to_quaternion: the scale is ignored and w is never negative"""
+
+    rotations = matrices[:, :3, :3] / np.linalg.norm(matrices[:, :3, :3], axis=1, keepdims=True)
+    rotations[np.linalg.det(rotations) < 0] *= -1
+
+    m00, m01, m02 = rotations[:, 0, 0], rotations[:, 0, 1], rotations[:, 0, 2]
+    m10, m11, m12 = rotations[:, 1, 0], rotations[:, 1, 1], rotations[:, 1, 2]
+    m20, m21, m22 = rotations[:, 2, 0], rotations[:, 2, 1], rotations[:, 2, 2]
+
+    trace = m00 + m11 + m22
+    quaternions = np.empty((len(matrices), 4))
+
+    # the largest component is computed from the diagonal, the others are divided by it for the precision
+    is_w = trace > 0
+    is_x = ~is_w & (m00 > m11) & (m00 > m22)
+    is_y = ~is_w & ~is_x & (m11 > m22)
+    is_z = ~(is_w | is_x | is_y)
+
+    i = is_w
+    s = 2 * np.sqrt(1 + trace[i])
+    quaternions[i] = np.stack((s / 4, (m21[i] - m12[i]) / s, (m02[i] - m20[i]) / s, (m10[i] - m01[i]) / s), axis=1)
+
+    i = is_x
+    s = 2 * np.sqrt(1 + m00[i] - m11[i] - m22[i])
+    quaternions[i] = np.stack(((m21[i] - m12[i]) / s, s / 4, (m01[i] + m10[i]) / s, (m02[i] + m20[i]) / s), axis=1)
+
+    i = is_y
+    s = 2 * np.sqrt(1 + m11[i] - m00[i] - m22[i])
+    quaternions[i] = np.stack(((m02[i] - m20[i]) / s, (m01[i] + m10[i]) / s, s / 4, (m12[i] + m21[i]) / s), axis=1)
+
+    i = is_z
+    s = 2 * np.sqrt(1 + m22[i] - m00[i] - m11[i])
+    quaternions[i] = np.stack(((m10[i] - m01[i]) / s, (m02[i] + m20[i]) / s, (m12[i] + m21[i]) / s, s / 4), axis=1)
+
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    quaternions[quaternions[:, 0] < 0] *= -1
+
+    return quaternions
+
+
+def make_quaternions_compatible(quaternions: np.ndarray, previous: np.ndarray | None = None) -> np.ndarray:
+    """Flips the (N, 4) quaternions in place so that each one is in the same hemisphere as the previous one.
+    Otherwise interpolation might take the long way around.
+
+    The first quaternion is made compatible with previous, if it's given"""
+
+    if previous is not None and len(quaternions) > 0 and np.dot(quaternions[0], previous) < 0:
+        quaternions[0] *= -1
+
+    if len(quaternions) < 2:
+        return quaternions
+
+    flips = np.einsum("ij,ij->i", quaternions[1:], quaternions[:-1]) < 0
+    signs = np.cumprod(np.where(flips, -1.0, 1.0))
+    quaternions[1:] *= signs[:, np.newaxis]
+
+    return quaternions
+
+
+def multiply_quaternions(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Multiplies (N, 4) or (4,) quaternions (w, x, y, z), like left @ right of mathutils quaternions"""
+
+    lw, lx, ly, lz = np.moveaxis(left, -1, 0)
+    rw, rx, ry, rz = np.moveaxis(right, -1, 0)
+
+    return np.stack(
+        (
+            lw * rw - lx * rx - ly * ry - lz * rz,
+            lw * rx + lx * rw + ly * rz - lz * ry,
+            lw * ry - lx * rz + ly * rw + lz * rx,
+            lw * rz + lx * ry - ly * rx + lz * rw,
+        ),
+        axis=-1,
+    )
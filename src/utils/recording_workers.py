@@ -0,0 +1,95 @@
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from os import close, cpu_count, path, remove
+from typing import Sequence
+
+import numpy as np
+
+from . import transform_recording
+from .result import Result
+from .transform_recording import read_transform_recording, sniff_transform_recording_format
+
+# smaller json recordings are parsed faster than a worker process starts
+WORKER_MIN_FILE_SIZE = 1 << 20
+
+
+def read_transform_recordings(
+    recording_paths: Sequence[str], *, max_workers: int | None = None
+) -> list[Result[np.ndarray, str]]:
+    """Reads the values of each recording, like read_transform_recording.
+
+    Json parsing is pure Python and holds the GIL, so large json recordings are parsed concurrently
+    in worker processes which run transform_recording.py as a script. The rest are read on the calling
+    thread meanwhile: binary recordings are only memory-mapped"""
+
+    worker_count = max_workers if max_workers is not None else (cpu_count() or 1)
+    worker_paths = [recording_path for recording_path in recording_paths if _is_worth_a_worker(recording_path)]
+    if worker_count < 2 or len(worker_paths) < 2:
+        worker_paths = []
+
+    # the threads only wait for the worker processes
+    with ThreadPoolExecutor(max_workers=max(1, min(worker_count, len(worker_paths)))) as executor:
+        worker_futures = {
+            recording_path: executor.submit(_read_in_worker, recording_path) for recording_path in worker_paths
+        }
+
+        # the other recordings are read while the workers parse theirs
+        local_results = {
+            recording_path: _read_on_this_thread(recording_path).map_error(str)
+            for recording_path in recording_paths
+            if recording_path not in worker_futures
+        }
+
+        return [
+            (
+                worker_futures[recording_path].result()
+                if recording_path in worker_futures
+                else local_results[recording_path]
+            )
+            for recording_path in recording_paths
+        ]
+
+
+def _is_worth_a_worker(recording_path: str) -> bool:
+    try:
+        return (
+            path.getsize(recording_path) >= WORKER_MIN_FILE_SIZE
+            and sniff_transform_recording_format(recording_path) == "json"
+        )
+    except OSError:
+        return False
+
+
+@Result.do()
+def _read_on_this_thread(recording_path: str) -> np.ndarray:
+    with Result.do_catch((OSError, ValueError)):
+        return read_transform_recording(recording_path)
+
+
+@Result.do()
+def _read_in_worker(recording_path: str) -> np.ndarray:
+    descriptor, npy_path = tempfile.mkstemp(prefix="outer_scout_", suffix=".npy")
+    close(descriptor)
+
+    try:
+        process = subprocess.run(
+            [sys.executable, "-I", transform_recording.__file__, recording_path, npy_path],
+            capture_output=True,
+            text=True,
+            creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0,
+        )
+
+        if process.returncode != 0:
+            # the last line of the traceback is the exception, like "ValueError: invalid transform"
+            error_lines = process.stderr.strip().splitlines()
+            if not error_lines:
+                Result.do_error(f"worker exited with code {process.returncode}")
+
+            _, _, message = error_lines[-1].partition(": ")
+            Result.do_error(message or error_lines[-1])
+
+        return np.load(npy_path)
+    finally:
+        remove(npy_path)
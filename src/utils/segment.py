@@ -0,0 +1,136 @@
+import json
+import subprocess
+from os import path, remove, replace
+
+import numpy as np
+
+from .transform_recording import (
+    convert_json_transform_recording,
+    map_binary_transform_recording,
+    read_transform_recording,
+    sniff_transform_recording_format,
+)
+
+
+def get_segment_path(recording_path: str, frame_start: int, frame_end: int) -> str:
+    """Path of the recording of a frame sub-range, next to the full recording"""
+
+    root, extension = path.splitext(recording_path)
+    return f"{root}.{frame_start}-{frame_end}{extension}"
+
+
+def splice_transform_recording(recording_path: str, segment_path: str, *, offset: int):
+    """Replaces the transforms of the recording, starting from the offset frame, with the ones from the segment.
+    A json recording is converted to the binary format if the segment is binary. The segment file is removed"""
+
+    if sniff_transform_recording_format(segment_path) == "binary" or (
+        sniff_transform_recording_format(recording_path) == "binary"
+    ):
+        _splice_binary_transform_recording(recording_path, segment_path, offset=offset)
+        return
+
+    with open(recording_path, "r") as recording_file:
+        recording_json = json.load(recording_file)
+
+    with open(segment_path, "r") as segment_file:
+        segment_values = json.load(segment_file)["values"]
+
+    values = recording_json["values"]
+    if offset < 0 or offset + len(segment_values) > len(values):
+        raise ValueError("the segment doesn't fit into the recording, record the whole range first")
+
+    values[offset : offset + len(segment_values)] = segment_values
+
+    temp_path = recording_path + ".splice"
+    with open(temp_path, "w") as temp_file:
+        json.dump(recording_json, temp_file)
+
+    replace(temp_path, recording_path)
+    remove(segment_path)
+
+
+def _splice_binary_transform_recording(recording_path: str, segment_path: str, *, offset: int):
+    # the segment is copied, so that its file isn't mapped when it's removed
+    segment_values = np.array(read_transform_recording(segment_path))
+
+    if sniff_transform_recording_format(recording_path) == "json":
+        convert_json_transform_recording(recording_path)
+
+    records = map_binary_transform_recording(recording_path, writable=True)
+    if offset < 0 or offset + len(segment_values) > len(records):
+        raise ValueError("the segment doesn't fit into the recording, record the whole range first")
+
+    # the records are written in place, only the segment frames are touched
+    if len(segment_values) > 0:
+        records[offset : offset + len(segment_values)] = segment_values
+        records.flush()
+    del records
+
+    remove(segment_path)
+
+
+def splice_video(
+    ffmpeg_path: str,
+    recording_path: str,
+    segment_path: str,
+    *,
+    offset: int,
+    frame_count: int,
+    recording_frame_count: int,
+    constant_rate_factor: int,
+):
+    """Replaces frame_count video frames, starting from the offset frame, with the frames of the segment video.
+    The video is encoded again with FFmpeg, which is still much faster than recording it again.
+    The segment file is removed"""
+
+    _, extension = path.splitext(recording_path)
+    temp_path = f"{recording_path}.splice{extension}"
+
+    # the recording is trimmed to the frames before and after the segment, and the segment is put between them
+    has_before = offset > 0
+    has_after = offset + frame_count < recording_frame_count
+
+    filters: list[str] = []
+    parts: list[str] = []
+
+    sources = [label for label, is_used in (("[before_source]", has_before), ("[after_source]", has_after)) if is_used]
+    if len(sources) == 2:
+        filters.append(f"[0:v]split{''.join(sources)}")
+    elif len(sources) == 1:
+        filters.append(f"[0:v]null{sources[0]}")
+
+    if has_before:
+        filters.append(f"[before_source]trim=end_frame={offset},setpts=PTS-STARTPTS[before]")
+        parts.append("[before]")
+
+    filters.append("[1:v]setpts=PTS-STARTPTS[segment]")
+    parts.append("[segment]")
+
+    if has_after:
+        filters.append(f"[after_source]trim=start_frame={offset + frame_count},setpts=PTS-STARTPTS[after]")
+        parts.append("[after]")
+
+    filters.append(f"{''.join(parts)}concat=n={len(parts)}:v=1:a=0[video]")
+
+    process = subprocess.run(
+        [
+            ffmpeg_path,
+            *("-y", "-loglevel", "error"),
+            *("-i", recording_path),
+            *("-i", segment_path),
+            *("-filter_complex", ";".join(filters)),
+            *("-map", "[video]"),
+            *("-c:v", "libx264", "-crf", str(constant_rate_factor), "-pix_fmt", "yuv420p"),
+            temp_path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    if process.returncode != 0:
+        if path.isfile(temp_path):
+            remove(temp_path)
+        raise RuntimeError(f"FFmpeg failed to splice the video: {process.stderr.strip()}")
+
+    replace(temp_path, recording_path)
+    remove(segment_path)
@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from typing import Generator
+
+_PHASE_COLLECTORS: list[dict[str, float]] = []
+
+_PHASE_COLLECTORS_LOCK = Lock()
+
+
+@contextmanager
+def timed_phase(name: str) -> Generator[None, None, None]:
+    """Measures the time spent in the context if some collect_phase_timings is active.
+    Durations of phases with the same name are summed up"""
+
+    if not _PHASE_COLLECTORS:
+        yield
+        return
+
+    start_time = perf_counter()
+    try:
+        yield
+    finally:
+        duration = perf_counter() - start_time
+        with _PHASE_COLLECTORS_LOCK:
+            for phase_timings in _PHASE_COLLECTORS:
+                phase_timings[name] = phase_timings.get(name, 0) + duration
+
+
+@contextmanager
+def collect_phase_timings() -> Generator[dict[str, float], None, None]:
+    """Yields a dict that is filled with the phase durations in seconds while the context is active"""
+
+    phase_timings: dict[str, float] = {}
+
+    with _PHASE_COLLECTORS_LOCK:
+        _PHASE_COLLECTORS.append(phase_timings)
+
+    try:
+        yield phase_timings
+    finally:
+        with _PHASE_COLLECTORS_LOCK:
+            _PHASE_COLLECTORS.remove(phase_timings)
@@ -0,0 +1,182 @@
+import struct
+import sys
+from functools import partial
+from os import path, replace
+from typing import Any, Iterator, Literal, Sequence
+
+import numpy as np
+
+if __package__:
+    from .json_stream import iter_json_object
+else:
+    # the worker of read_transform_recordings runs this file as a script, outside of the add-on package.
+    # The directory is appended, so that the add-on modules don't shadow the standard library
+    sys.path.append(path.dirname(path.abspath(__file__)))
+    from json_stream import iter_json_object
+
+TransformRecordingFormat = Literal["json", "binary"]
+
+# values of each frame, in the order of the json fields: position (x, y, z), rotation (x, y, z, w), scale (x, y, z)
+TRANSFORM_RECORDING_CHANNELS = 10
+
+BINARY_TRANSFORM_RECORDING_MAGIC = b"OSTR"
+
+BINARY_TRANSFORM_RECORDING_VERSION = 1
+
+# magic, version, channel count, frame count. The little-endian float32 records of each frame follow it
+BINARY_TRANSFORM_RECORDING_HEADER = struct.Struct("<4sIII")
+
+BINARY_TRANSFORM_RECORDING_DTYPE = np.dtype("<f4")
+
+JSON_RECORDING_BLOCK_SIZE = 4096
+
+JSON_RECORDING_READ_SIZE = 1 << 16
+
+
+def sniff_transform_recording_format(recording_path: str) -> TransformRecordingFormat:
+    with open(recording_path, "rb") as recording_file:
+        is_binary = recording_file.read(len(BINARY_TRANSFORM_RECORDING_MAGIC)) == BINARY_TRANSFORM_RECORDING_MAGIC
+
+    return "binary" if is_binary else "json"
+
+
+def read_transform_recording(recording_path: str) -> np.ndarray:
+    """Returns the (frames, TRANSFORM_RECORDING_CHANNELS) values of a recording in any format.
+    Binary recordings are memory-mapped, so only the used frames are read. The values of malformed frames are NaN.
+    Raises ValueError if the recording is malformed"""
+
+    if sniff_transform_recording_format(recording_path) == "binary":
+        return map_binary_transform_recording(recording_path)
+
+    return load_json_transform_recording(recording_path)
+
+
+def load_json_transform_recording(recording_path: str) -> np.ndarray:
+    blocks = list(iter_json_transform_recording(recording_path))
+    return np.concatenate(blocks) if blocks else np.empty((0, TRANSFORM_RECORDING_CHANNELS))
+
+
+def iter_json_transform_recording(recording_path: str, *, block_size=JSON_RECORDING_BLOCK_SIZE) -> Iterator[np.ndarray]:
+    """Parses the {"values": [...]} json recording incrementally. Yields (block_size, TRANSFORM_RECORDING_CHANNELS)
+    arrays of values, the last one can be shorter. Only the current block and about one read of the file text
+    are in memory, unlike json.load which keeps the whole document and its lists.
+    The values of a malformed transform are NaN, so that the other frames can still be imported.
+    Raises ValueError if the recording is malformed"""
+
+    with open(recording_path, "rb") as recording_file:
+        chunks = iter(partial(recording_file.read, JSON_RECORDING_READ_SIZE), b"")
+
+        block = np.empty((block_size, TRANSFORM_RECORDING_CHANNELS))
+        count = 0
+
+        for key, transform_json in iter_json_object(chunks, streamed_keys={"values"}, encoding="utf-8"):
+            if key != "values":
+                continue
+
+            try:
+                block[count] = _transform_json_row(transform_json)
+            except (KeyError, TypeError, ValueError):
+                block[count] = np.nan
+
+            count += 1
+            if count == block_size:
+                yield block
+                block = np.empty((block_size, TRANSFORM_RECORDING_CHANNELS))
+                count = 0
+
+        if count > 0:
+            yield block[:count]
+
+
+def map_binary_transform_recording(recording_path: str, *, writable=False) -> np.ndarray:
+    """Memory-maps the records of a binary recording without reading them. Raises ValueError if the header
+    doesn't match the file"""
+
+    with open(recording_path, "rb") as recording_file:
+        header = recording_file.read(BINARY_TRANSFORM_RECORDING_HEADER.size)
+
+    if len(header) < BINARY_TRANSFORM_RECORDING_HEADER.size:
+        raise ValueError("binary transform recording is too short")
+
+    magic, version, channel_count, frame_count = BINARY_TRANSFORM_RECORDING_HEADER.unpack(header)
+    if magic != BINARY_TRANSFORM_RECORDING_MAGIC:
+        raise ValueError("not a binary transform recording")
+    if version != BINARY_TRANSFORM_RECORDING_VERSION:
+        raise ValueError(f"unsupported binary transform recording version {version}")
+    if channel_count != TRANSFORM_RECORDING_CHANNELS:
+        raise ValueError(f"binary transform recording has {channel_count} channels instead of 10")
+
+    records_size = frame_count * channel_count * BINARY_TRANSFORM_RECORDING_DTYPE.itemsize
+    if path.getsize(recording_path) < BINARY_TRANSFORM_RECORDING_HEADER.size + records_size:
+        raise ValueError(f"binary transform recording is truncated, expected {frame_count} frames")
+
+    # empty files can't be mapped
+    if frame_count == 0:
+        return np.empty((0, channel_count), dtype=BINARY_TRANSFORM_RECORDING_DTYPE)
+
+    return np.memmap(
+        recording_path,
+        dtype=BINARY_TRANSFORM_RECORDING_DTYPE,
+        mode="r+" if writable else "r",
+        offset=BINARY_TRANSFORM_RECORDING_HEADER.size,
+        shape=(frame_count, channel_count),
+    )
+
+
+def write_binary_transform_recording(recording_path: str, values: np.ndarray):
+    """Writes the (frames, TRANSFORM_RECORDING_CHANNELS) values as a binary recording"""
+
+    records = np.ascontiguousarray(values, dtype=BINARY_TRANSFORM_RECORDING_DTYPE)
+    if records.ndim != 2 or records.shape[1] != TRANSFORM_RECORDING_CHANNELS:
+        raise ValueError(f"expected (frames, {TRANSFORM_RECORDING_CHANNELS}) values, got {records.shape}")
+
+    with open(recording_path, "wb") as recording_file:
+        recording_file.write(
+            BINARY_TRANSFORM_RECORDING_HEADER.pack(
+                BINARY_TRANSFORM_RECORDING_MAGIC, BINARY_TRANSFORM_RECORDING_VERSION, records.shape[1], len(records)
+            )
+        )
+        recording_file.write(records.tobytes())
+
+
+def convert_json_transform_recording(json_path: str, binary_path: str | None = None):
+    """Converts a json recording to the binary format. Without binary_path the json file is replaced"""
+
+    values = load_json_transform_recording(json_path)
+
+    temp_path = (binary_path or json_path) + ".convert"
+    write_binary_transform_recording(temp_path, values)
+    replace(temp_path, binary_path or json_path)
+
+
+def json_transforms_to_values(json_list: Sequence[dict[str, Any]]) -> np.ndarray:
+    """Returns the (frames, TRANSFORM_RECORDING_CHANNELS) values of the json transforms.
+    Missing fields are identity values. Raises ValueError if some transform is malformed"""
+
+    if len(json_list) == 0:
+        return np.empty((0, TRANSFORM_RECORDING_CHANNELS))
+
+    try:
+        return np.array([_transform_json_row(transform_json) for transform_json in json_list], dtype=np.float64)
+    except (KeyError, TypeError, ValueError) as error:
+        raise ValueError(f"invalid transform: {error!r}")
+
+
+def _transform_json_row(transform_json: dict[str, Any]) -> tuple[float, ...]:
+    row = (
+        *(transform_json["position"] or (0, 0, 0)),
+        *(transform_json["rotation"] or (0, 0, 0, 1)),
+        *(transform_json["scale"] or (1, 1, 1)),
+    )
+
+    if len(row) != TRANSFORM_RECORDING_CHANNELS:
+        raise ValueError("position and scale need 3 values, rotation needs 4")
+
+    return row
+
+
+if __name__ == "__main__":
+    # worker process of read_transform_recordings: parses the json recording into a .npy array.
+    # It runs without bpy, so this module can only depend on the standard library, NumPy and json_stream
+    json_path, npy_path = sys.argv[1:3]
+    np.save(npy_path, load_json_transform_recording(json_path))
@@ -0,0 +1,45 @@
+"""Most tests cover the modules of the add-on that don't depend on bpy, so they run without Blender.
+The add-on packages are registered without running their __init__, which imports bpy.
+Tests that need Blender use the addon fixture, and are skipped without the bpy module"""
+
+import importlib.util
+import sys
+from os import path
+from types import ModuleType
+
+import pytest
+
+SOURCE_PATH = path.join(path.dirname(path.dirname(path.abspath(__file__))), "src")
+
+PACKAGE_NAME = "outer_scout"
+
+# the whole add-on is loaded as another package, next to the bpy-free one
+ADDON_PACKAGE_NAME = "outer_scout_addon"
+
+
+def _register_package(name: str, package_path: str):
+    package = ModuleType(name)
+    package.__path__ = [package_path]
+    sys.modules[name] = package
+
+
+_register_package(PACKAGE_NAME, SOURCE_PATH)
+
+for subpackage in ("api", "api.http", "utils"):
+    _register_package(f"{PACKAGE_NAME}.{subpackage}", path.join(SOURCE_PATH, *subpackage.split(".")))
+
+
+@pytest.fixture(scope="session")
+def addon() -> ModuleType:
+    """The add-on package with all of its modules. It isn't registered"""
+
+    pytest.importorskip("bpy")
+
+    spec = importlib.util.spec_from_file_location(
+        ADDON_PACKAGE_NAME, path.join(SOURCE_PATH, "__init__.py"), submodule_search_locations=[SOURCE_PATH]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_PACKAGE_NAME] = package
+    spec.loader.exec_module(package)
+
+    return package
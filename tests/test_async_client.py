@@ -0,0 +1,119 @@
+import importlib
+import sys
+from concurrent.futures import Future
+from os import path
+from time import perf_counter, sleep
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(path.join(path.dirname(path.dirname(path.abspath(__file__))), "tools"))
+
+from mock_server import MockServer, MockServerConfig
+
+LATENCY = 0.3
+
+
+@pytest.fixture
+def slow_server():
+    mock_server = MockServer(MockServerConfig(port=0, latency=LATENCY))
+    mock_server.start()
+
+    yield mock_server
+
+    mock_server.shutdown()
+    mock_server.server_close()
+
+
+@pytest.fixture
+def api(addon):
+    return importlib.import_module(f"{addon.__name__}.api")
+
+
+@pytest.fixture
+def api_client(api, slow_server):
+    preferences = SimpleNamespace(
+        api_port=slow_server.port,
+        api_cache_ttl=0,
+        api_connect_timeout=1,
+        api_poll_timeout=5,
+        api_request_timeout=5,
+        api_long_request_timeout=5,
+        api_max_retries=0,
+    )
+
+    yield api.APIClient(preferences)
+
+    api.shutdown_api_executor()
+
+
+class FakeWindowManager:
+    def __init__(self):
+        self.timers: list[float] = []
+        self.modal_handlers: list = []
+
+    def event_timer_add(self, time_step: float, window=None):
+        self.timers.append(time_step)
+        return time_step
+
+    def event_timer_remove(self, timer):
+        self.timers.remove(timer)
+
+    def modal_handler_add(self, operator):
+        self.modal_handlers.append(operator)
+
+
+def test_future_resolves_without_blocking(api, api_client):
+    start_time = perf_counter()
+    environment_future = api.AsyncAPIClient(api_client).get_environment()
+
+    assert isinstance(environment_future, Future)
+    assert not environment_future.done()
+    assert perf_counter() - start_time < LATENCY / 2
+
+    environment_result = environment_future.result(timeout=5)
+
+    assert environment_result.is_ok
+    assert environment_result.unwrap()["outerWildsScene"] == "SolarSystem"
+
+
+def test_async_operator_resumes_with_the_result(addon, api, api_client):
+    AsyncOperator = importlib.import_module(f"{addon.__name__}.operators.async_operator").AsyncOperator
+
+    class Operator:
+        """The AsyncOperator methods without bpy_struct, which can only be created by Blender"""
+
+        invoke = AsyncOperator.invoke
+        modal = AsyncOperator.modal
+        future_poll_delay = AsyncOperator.future_poll_delay
+        runs_in_background = False
+        _after_event = AsyncOperator._after_event
+        _ended = AsyncOperator._ended
+        _add_timer = AsyncOperator._add_timer
+        _AsyncOperator__poll_async_generator = AsyncOperator._AsyncOperator__poll_async_generator
+        _AsyncOperator__remove_timer = AsyncOperator._AsyncOperator__remove_timer
+
+        def _run_async(self, context):
+            self.environment_result = yield api.get_api_executor().submit(api_client.get_environment)
+            return {"FINISHED"}
+
+    operator = Operator()
+    context = SimpleNamespace(window=None, window_manager=FakeWindowManager())
+    timer_event = SimpleNamespace(type="TIMER", value="NOTHING")
+
+    assert operator.invoke(context, None) == {"RUNNING_MODAL"}
+    assert context.window_manager.modal_handlers == [operator]
+
+    # the timer events are handled without waiting while the request is sent
+    start_time = perf_counter()
+    poll_count = 0
+    while (result := operator.modal(context, timer_event)) == {"RUNNING_MODAL"}:
+        poll_count += 1
+        assert perf_counter() - start_time < 5
+        sleep(operator.future_poll_delay)
+
+    assert result == {"FINISHED"}
+    assert poll_count > 0
+    assert operator.environment_result.is_ok
+    assert operator.environment_result.unwrap()["outerWildsScene"] == "SolarSystem"
+    assert context.window_manager.timers == []
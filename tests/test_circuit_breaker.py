@@ -0,0 +1,38 @@
+from outer_scout.api.http.circuit_breaker import CircuitBreaker
+
+
+def open_circuit_breaker() -> CircuitBreaker:
+    circuit_breaker = CircuitBreaker(failure_threshold=2, cooldown=0)
+    circuit_breaker.record_failure()
+    circuit_breaker.record_failure()
+
+    return circuit_breaker
+
+
+def test_half_open_allows_one_probe():
+    circuit_breaker = open_circuit_breaker()
+
+    assert circuit_breaker.allow_request()
+    assert not circuit_breaker.allow_request()
+    assert not circuit_breaker.allow_request()
+
+
+def test_probe_success_closes_the_circuit():
+    circuit_breaker = open_circuit_breaker()
+    assert circuit_breaker.allow_request()
+
+    circuit_breaker.record_success()
+
+    assert circuit_breaker.allow_request()
+    assert circuit_breaker.allow_request()
+
+
+def test_probe_failure_opens_the_circuit_again():
+    circuit_breaker = open_circuit_breaker()
+    assert circuit_breaker.allow_request()
+
+    circuit_breaker.cooldown = 60
+    circuit_breaker.record_failure()
+
+    assert not circuit_breaker.allow_request()
+    assert circuit_breaker.remaining_cooldown > 0
@@ -0,0 +1,59 @@
+import socket
+import threading
+from time import perf_counter
+
+import pytest
+
+
+@pytest.fixture
+def silent_server():
+    """Accepts connections but never responds"""
+
+    server_socket = socket.create_server(("localhost", 0))
+    connections = []
+
+    def accept():
+        while True:
+            try:
+                connections.append(server_socket.accept()[0])
+            except OSError:
+                return
+
+    threading.Thread(target=accept, daemon=True).start()
+
+    yield server_socket.getsockname()[1]
+
+    server_socket.close()
+    for connection in connections:
+        connection.close()
+
+
+def unused_port() -> int:
+    with socket.create_server(("localhost", 0)) as server_socket:
+        return server_socket.getsockname()[1]
+
+
+def test_read_timeout_is_not_retried(addon, silent_server):
+    from outer_scout_addon.api import APIClient
+    from outer_scout_addon.api.http import Request, RequestTimeout
+
+    request = Request(url=f"http://localhost:{silent_server}/", method="GET", timeout=RequestTimeout(1, 0.5))
+
+    start_time = perf_counter()
+    response, retries = APIClient._send_with_retries(request, max_retries=3)
+
+    assert response is None
+    assert retries == 0
+    assert perf_counter() - start_time < 1
+
+
+def test_refused_connection_is_retried(addon):
+    from outer_scout_addon.api import APIClient
+    from outer_scout_addon.api.http import Request, RequestTimeout
+
+    request = Request(url=f"http://localhost:{unused_port()}/", method="GET", timeout=RequestTimeout(1, 5))
+
+    response, retries = APIClient._send_with_retries(request, max_retries=2)
+
+    assert response is None
+    assert retries == 2
@@ -0,0 +1,113 @@
+import importlib
+
+import numpy as np
+import pytest
+
+
+class ReportingOperator:
+    def __init__(self):
+        self.reports: list[tuple[set[str], str]] = []
+
+    def report(self, type: set[str], message: str):
+        self.reports.append((type, message))
+
+
+@pytest.fixture
+def import_transform_recording(addon):
+    return importlib.import_module(f"{addon.__name__}.operators.import_transform_recording")
+
+
+@pytest.fixture
+def scene():
+    import bpy
+
+    scene = bpy.context.scene
+    scene.frame_start = 1
+
+    yield scene
+
+    for object in list(scene.objects):
+        bpy.data.objects.remove(object)
+
+
+def get_keyframe_values(addon, object, data_path: str) -> np.ndarray:
+    """(frames, array length) values of the keyframes of the object"""
+
+    anim_data = object.animation_data
+    fcurves = sorted(
+        (
+            fcurve
+            for fcurve in addon.utils.get_slot_fcurves(anim_data.action, anim_data.action_slot)
+            if fcurve.data_path == data_path
+        ),
+        key=lambda fcurve: fcurve.array_index,
+    )
+    return np.array([[point.co.y for point in fcurve.keyframe_points] for fcurve in fcurves]).T
+
+
+@pytest.mark.parametrize("has_parent", [False, True])
+def test_negative_w_recording(addon, import_transform_recording, scene, has_parent):
+    import bpy
+    from mathutils import Matrix
+
+    object = bpy.data.objects.new("recorded", None)
+    scene.collection.objects.link(object)
+
+    if has_parent:
+        parent = bpy.data.objects.new("parent", None)
+        scene.collection.objects.link(parent)
+        parent.location = (4, 5, 6)
+        parent.rotation_euler = (0.5, 0, 0)
+        object.parent = parent
+        bpy.context.view_layer.update()
+
+    # position, rotation (x, y, z, w) and scale. The last rotations are the same with either sign
+    half_turn = np.sqrt(0.5)
+    values = np.array(
+        [
+            (1, 2, 3, 0, half_turn, 0, -half_turn, 1, 1, 1),
+            (1, 2, 3, 0.5, 0.5, 0.5, -0.5, 1, 1, 1),
+            (1, 2, 3, 0, 0, 0, 1, 1, 1, 1),
+            (1, 2, 3, 0, 0, 0, -1, 1, 1, 1),
+        ],
+        dtype=np.float32,
+    )
+
+    import_transform_recording.apply_transform_recording(ReportingOperator(), bpy.context, object, values, None)
+
+    rotations = get_keyframe_values(addon, object, "rotation_quaternion")
+    assert len(rotations) == len(values)
+    assert np.all(rotations[:, 0] >= 0)
+
+    # the same rotations as setting matrix_world to each recorded transform
+    world_matrices = addon.api.TransformBatch.from_values(values).to_right().to_matrices()
+    for world_matrix, rotation in zip(world_matrices, rotations):
+        object.matrix_world = Matrix(world_matrix.tolist())
+        assert np.allclose(rotation, object.rotation_quaternion, atol=1e-6)
+
+
+def test_malformed_frames_are_skipped(addon, import_transform_recording, scene):
+    import bpy
+
+    object = bpy.data.objects.new("recorded", None)
+    scene.collection.objects.link(object)
+
+    values = np.array(
+        [
+            (1, 2, 3, 0, 0, 0, 1, 1, 1, 1),
+            (np.nan,) * 10,
+            (4, 5, 6, 0, 0, 0, 1, 1, 1, 1),
+        ]
+    )
+
+    operator = ReportingOperator()
+    import_transform_recording.apply_transform_recording(operator, bpy.context, object, values, None)
+
+    locations = get_keyframe_values(addon, object, "location")
+    assert np.allclose(locations, [(1, 3, 2), (4, 6, 5)])
+
+    anim_data = object.animation_data
+    for fcurve in addon.utils.get_slot_fcurves(anim_data.action, anim_data.action_slot):
+        assert [point.co.x for point in fcurve.keyframe_points] == [1, 3]
+
+    assert [type for type, _ in operator.reports] == [{"WARNING"}]
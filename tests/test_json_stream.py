@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from outer_scout.utils.json_stream import JsonStreamError, iter_json_object
+
+
+def parse(chunks: list[bytes], streamed_keys=frozenset({"sectors"})) -> list:
+    return list(iter_json_object(chunks, streamed_keys=set(streamed_keys)))
+
+
+@pytest.mark.parametrize(
+    "chunks, expected",
+    [
+        ([b'{"sectors": [3.', b"25]}"], [("sectors", 3.25)]),
+        ([b'{"a": 1.', b'5, "b": 2}'], [("a", 1.5), ("b", 2)]),
+        ([b'{"a": 2.5e', b"-7}"], [("a", 2.5e-7)]),
+        ([b'{"a": -', b"12}"], [("a", -12)]),
+        ([b'{"a": 12', b"34, ", b'"b": tr', b"ue}"], [("a", 1234), ("b", True)]),
+    ],
+)
+def test_value_split_between_chunks(chunks, expected):
+    assert parse(chunks) == expected
+
+
+def test_every_split_position():
+    document = {"name": "été", "sectors": [1.5, -2e-3, {"x": [0.25, 10]}, "s", None, 3], "time": 12.0625}
+    text = json.dumps(document).encode()
+
+    for split in range(1, len(text)):
+        pairs = parse([text[:split], text[split:]])
+
+        assert pairs == [("name", "été"), *(("sectors", item) for item in document["sectors"]), ("time", 12.0625)]
+
+
+def test_large_value_in_small_chunks():
+    values = [index * 0.5 for index in range(20000)]
+    text = json.dumps({"sectors": [{"values": values}]}).encode()
+
+    pairs = parse([text[start : start + 7] for start in range(0, len(text), 7)])
+
+    assert pairs == [("sectors", {"values": values})]
+
+
+def test_truncated_stream():
+    with pytest.raises(JsonStreamError):
+        parse([b'{"sectors": [1, 2'])
@@ -0,0 +1,74 @@
+import importlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def live_capture(addon):
+    return importlib.import_module(f"{addon.__name__}.operators.live_capture")
+
+
+@pytest.fixture
+def scene():
+    import bpy
+
+    scene = bpy.context.scene
+    scene.frame_start = 1
+
+    yield scene
+
+    for object in list(scene.objects):
+        bpy.data.objects.remove(object)
+
+
+def test_missing_fields_are_identity(live_capture):
+    capture_buffer = live_capture.TransformCaptureBuffer(frame_start=1, frame_end=3, object_count=2)
+    capture_buffer.write(2, [{"position": None, "rotation": (0.5, 0.5, 0.5, 0.5)}, {"position": (1, 2, 3)}])
+
+    assert capture_buffer.captured_frames() == [2]
+
+    first = capture_buffer.read_transforms(0)
+    assert np.allclose(first.positions, [(0, 0, 0)])
+    assert np.allclose(first.rotations, [(0.5, 0.5, 0.5, 0.5)])
+    assert np.allclose(first.scales, [(1, 1, 1)])
+
+    second = capture_buffer.read_transforms(1)
+    assert np.allclose(second.positions, [(1, 2, 3)])
+    assert np.allclose(second.rotations, [(1, 0, 0, 0)])
+
+
+def test_captured_keyframes_keep_parent_and_delta_transforms(addon, live_capture, scene):
+    import bpy
+
+    parent = bpy.data.objects.new("parent", None)
+    scene.collection.objects.link(parent)
+    parent.location = (4, 5, 6)
+    parent.rotation_euler = (0.5, 0, 0)
+
+    object = bpy.data.objects.new("captured", None)
+    scene.collection.objects.link(object)
+    object.parent = parent
+    object.delta_location = (1, 0, 0)
+    object.delta_scale = (2, 2, 2)
+    bpy.context.view_layer.update()
+
+    transforms = [
+        {"position": (1, 2, 3), "rotation": (0, 0, 0, 1), "scale": (1, 1, 1)},
+        {"position": (-2, 0, 1), "rotation": (0.5, 0.5, 0.5, -0.5), "scale": (2, 1, 1)},
+    ]
+
+    capture_buffer = live_capture.TransformCaptureBuffer(frame_start=1, frame_end=4, object_count=1)
+    for frame, transform in zip((2, 4), transforms):
+        capture_buffer.write(frame, [transform])
+
+    live_capture.insert_captured_keyframes(SimpleNamespace(ground_body=None), object, capture_buffer, 0)
+
+    # the object is at the captured world transforms, like an imported recording
+    expected_matrices = addon.api.TransformBatch.from_values(
+        addon.utils.json_transforms_to_values(transforms)
+    ).to_right()
+    for frame, expected_matrix in zip((2, 4), expected_matrices.to_matrices()):
+        scene.frame_set(frame)
+        assert np.allclose(np.array(object.matrix_world), expected_matrix, atol=1e-5)
@@ -0,0 +1,117 @@
+import subprocess
+from os import path
+
+import pytest
+
+from outer_scout.utils import segment
+from outer_scout.utils.segment import splice_video
+
+
+class FakeFFmpeg:
+    """Stands in for subprocess.run. Records the arguments and writes the output file like FFmpeg would"""
+
+    def __init__(self, *, returncode=0, stderr=""):
+        self.returncode = returncode
+        self.stderr = stderr
+        self.args: list[str] | None = None
+
+    def __call__(self, args: list[str], **kwargs) -> subprocess.CompletedProcess:
+        self.args = args
+        with open(args[-1], "w") as output_file:
+            output_file.write("spliced")
+
+        return subprocess.CompletedProcess(args, self.returncode, stdout="", stderr=self.stderr)
+
+
+@pytest.fixture
+def recording(tmp_path) -> tuple[str, str]:
+    recording_path = str(tmp_path / "color.mp4")
+    segment_path = str(tmp_path / "color.11-20.mp4")
+
+    for file_path in (recording_path, segment_path):
+        with open(file_path, "w") as file:
+            file.write(path.basename(file_path))
+
+    return recording_path, segment_path
+
+
+def test_splice_in_the_middle(recording, monkeypatch):
+    recording_path, segment_path = recording
+    ffmpeg = FakeFFmpeg()
+    monkeypatch.setattr(segment.subprocess, "run", ffmpeg)
+
+    splice_video(
+        "ffmpeg",
+        recording_path,
+        segment_path,
+        offset=10,
+        frame_count=10,
+        recording_frame_count=30,
+        constant_rate_factor=18,
+    )
+
+    assert ffmpeg.args == [
+        "ffmpeg",
+        *("-y", "-loglevel", "error"),
+        *("-i", recording_path),
+        *("-i", segment_path),
+        "-filter_complex",
+        "[0:v]split[before_source][after_source];"
+        "[before_source]trim=end_frame=10,setpts=PTS-STARTPTS[before];"
+        "[1:v]setpts=PTS-STARTPTS[segment];"
+        "[after_source]trim=start_frame=20,setpts=PTS-STARTPTS[after];"
+        "[before][segment][after]concat=n=3:v=1:a=0[video]",
+        *("-map", "[video]"),
+        *("-c:v", "libx264", "-crf", "18", "-pix_fmt", "yuv420p"),
+        f"{recording_path}.splice.mp4",
+    ]
+
+    with open(recording_path) as recording_file:
+        assert recording_file.read() == "spliced"
+    assert not path.exists(segment_path)
+    assert not path.exists(f"{recording_path}.splice.mp4")
+
+
+def test_splice_at_the_start(recording, monkeypatch):
+    recording_path, segment_path = recording
+    ffmpeg = FakeFFmpeg()
+    monkeypatch.setattr(segment.subprocess, "run", ffmpeg)
+
+    splice_video(
+        "ffmpeg",
+        recording_path,
+        segment_path,
+        offset=0,
+        frame_count=10,
+        recording_frame_count=30,
+        constant_rate_factor=18,
+    )
+
+    filter_complex = ffmpeg.args[ffmpeg.args.index("-filter_complex") + 1]
+    assert filter_complex == (
+        "[0:v]null[after_source];"
+        "[1:v]setpts=PTS-STARTPTS[segment];"
+        "[after_source]trim=start_frame=10,setpts=PTS-STARTPTS[after];"
+        "[segment][after]concat=n=2:v=1:a=0[video]"
+    )
+
+
+def test_failed_splice_keeps_the_files(recording, monkeypatch):
+    recording_path, segment_path = recording
+    monkeypatch.setattr(segment.subprocess, "run", FakeFFmpeg(returncode=1, stderr="Invalid data found\n"))
+
+    with pytest.raises(RuntimeError, match="Invalid data found"):
+        splice_video(
+            "ffmpeg",
+            recording_path,
+            segment_path,
+            offset=10,
+            frame_count=10,
+            recording_frame_count=30,
+            constant_rate_factor=18,
+        )
+
+    with open(recording_path) as recording_file:
+        assert recording_file.read() == "color.mp4"
+    assert path.exists(segment_path)
+    assert not path.exists(f"{recording_path}.splice.mp4")
@@ -0,0 +1,76 @@
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from outer_scout.utils import transform_recording
+from outer_scout.utils.transform_recording import json_transforms_to_values, load_json_transform_recording
+
+TRANSFORMS = [
+    {"position": [1.25, -2.5e-3, 300.0], "rotation": [0.0, 0.7071, 0.0, -0.7071], "scale": [1, 1, 1]},
+    {"position": [12.5, 0.125, -3e2], "rotation": [0.5, 0.5, 0.5, 0.5], "scale": None},
+    {"position": None, "rotation": None, "scale": [2.0, 0.5, 1e-2]},
+]
+
+
+@pytest.fixture
+def recording_path(tmp_path) -> str:
+    recording_path = str(tmp_path / "transform.json")
+    with open(recording_path, "w", encoding="utf-8") as recording_file:
+        json.dump({"fps": 60.5, "values": TRANSFORMS}, recording_file)
+
+    return recording_path
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 7, 1 << 16])
+def test_numbers_split_between_reads(recording_path, monkeypatch, read_size):
+    monkeypatch.setattr(transform_recording, "JSON_RECORDING_READ_SIZE", read_size)
+
+    values = load_json_transform_recording(recording_path)
+
+    assert np.array_equal(values, json_transforms_to_values(TRANSFORMS))
+
+
+def test_split_key_value(tmp_path, monkeypatch):
+    recording_path = tmp_path / "transform.json"
+    recording_path.write_text('{"fps": 60.5, "values": []}', encoding="utf-8")
+    monkeypatch.setattr(transform_recording, "JSON_RECORDING_READ_SIZE", len('{"fps": 60.'))
+
+    assert load_json_transform_recording(str(recording_path)).shape == (0, 10)
+
+
+def test_blocks(recording_path):
+    blocks = list(transform_recording.iter_json_transform_recording(recording_path, block_size=2))
+
+    assert [len(block) for block in blocks] == [2, 1]
+
+
+def test_malformed_transform(tmp_path):
+    recording_path = tmp_path / "transform.json"
+    recording_path.write_text(
+        json.dumps({"values": [TRANSFORMS[0], {"position": [1, 2], "rotation": None, "scale": None}, TRANSFORMS[2]]}),
+        encoding="utf-8",
+    )
+
+    values = load_json_transform_recording(str(recording_path))
+
+    assert np.isnan(values[1]).all()
+    assert np.array_equal(values[[0, 2]], json_transforms_to_values([TRANSFORMS[0], TRANSFORMS[2]]))
+
+
+def test_malformed_recording(tmp_path):
+    recording_path = tmp_path / "transform.json"
+    recording_path.write_text('{"values": [{"position": [1, 2, 3], "rotation": nul', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_json_transform_recording(str(recording_path))
+
+
+def test_worker_script(recording_path, tmp_path):
+    npy_path = str(tmp_path / "transform.npy")
+
+    subprocess.run([sys.executable, "-I", transform_recording.__file__, recording_path, npy_path], check=True)
+
+    assert np.array_equal(np.load(npy_path), json_transforms_to_values(TRANSFORMS))
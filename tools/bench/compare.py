@@ -0,0 +1,103 @@
+"""Compares two results of tools/bench/run.py and flags the regressions
+
+Usage: python tools/bench/compare.py baseline.json current.json --threshold 0.1
+Exits with code 1 if the median time of some benchmark or phase has increased more than the threshold
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    baseline: float | None
+    current: float | None
+    is_regression: bool
+
+    @property
+    def change(self) -> float | None:
+        if self.baseline is None or self.current is None or self.baseline == 0:
+            return None
+        return self.current / self.baseline - 1
+
+
+def compare_results(baseline: dict, current: dict, *, threshold: float, min_delta: float) -> list[Comparison]:
+    comparisons: list[Comparison] = []
+
+    def compare(name: str, baseline_stats: dict | None, current_stats: dict | None):
+        baseline_median = baseline_stats["median"] if baseline_stats is not None else None
+        current_median = current_stats["median"] if current_stats is not None else None
+
+        # tiny phases are too noisy to compare relatively
+        is_regression = (
+            baseline_median is not None
+            and current_median is not None
+            and current_median - baseline_median > min_delta
+            and current_median > baseline_median * (1 + threshold)
+        )
+
+        comparisons.append(Comparison(name, baseline_median, current_median, is_regression))
+
+    baseline_benchmarks: dict = baseline["benchmarks"]
+    current_benchmarks: dict = current["benchmarks"]
+
+    for benchmark_name in sorted(baseline_benchmarks.keys() | current_benchmarks.keys()):
+        baseline_benchmark = baseline_benchmarks.get(benchmark_name, {})
+        current_benchmark = current_benchmarks.get(benchmark_name, {})
+
+        compare(benchmark_name, baseline_benchmark.get("total"), current_benchmark.get("total"))
+
+        baseline_phases: dict = baseline_benchmark.get("phases", {})
+        current_phases: dict = current_benchmark.get("phases", {})
+
+        for phase_name in sorted(baseline_phases.keys() | current_phases.keys()):
+            compare(f"  {phase_name}", baseline_phases.get(phase_name), current_phases.get(phase_name))
+
+    return comparisons
+
+
+def format_time(seconds: float | None) -> str:
+    return f"{seconds * 1000:.2f}ms" if seconds is not None else "-"
+
+
+def format_change(change: float | None) -> str:
+    return f"{change:+.1%}" if change is not None else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown of the median")
+    parser.add_argument("--min-delta", type=float, default=0.001, help="ignore slowdowns less than this many seconds")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+
+    if baseline["parameters"] != current["parameters"]:
+        print("warning: benchmark parameters are different, the comparison might be meaningless")
+
+    comparisons = compare_results(baseline, current, threshold=args.threshold, min_delta=args.min_delta)
+
+    name_width = max((len(comparison.name) for comparison in comparisons), default=0)
+
+    for comparison in comparisons:
+        print(
+            f"{comparison.name:<{name_width}}  {format_time(comparison.baseline):>12}  {format_time(comparison.current):>12}"
+            + f"  {format_change(comparison.change):>8}"
+            + ("  REGRESSION" if comparison.is_regression else "")
+        )
+
+    regression_count = sum(comparison.is_regression for comparison in comparisons)
+    if regression_count > 0:
+        print(f"\n{regression_count} regression(s) over {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,594 @@
+"""Headless benchmarks of the add-on hot paths. The mod is replaced with tools/mock_server.py
+
+Usage: blender --background --factory-startup --python tools/bench/run.py -- --output bench.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Generator
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent.parent
+
+sys.path[:0] = [str(BENCH_DIR), str(BENCH_DIR.parent)]
+
+import bpy  # must be imported first when running as the bpy module instead of Blender
+import addon_utils
+import scenes
+from mock_server import MockServer, MockServerConfig
+
+ADDON_MODULE = "outer_scout"
+
+
+@dataclass
+class BenchParameters:
+    objects: int
+    scaling_objects: list[int]
+    scaling_frames: list[int]
+    streaming_frames: int
+    requests: int
+    cameras: int
+    frames: int
+    sectors: int
+    assets_per_sector: int
+    unique_assets: int
+    repeat: int
+    latency: float
+
+
+@dataclass
+class BenchSample:
+    total: float
+    phases: dict[str, float] = field(default_factory=dict)
+    peak_memory: int | None = None
+    payload_size: int | None = None
+
+
+@dataclass
+class BenchContext:
+    parameters: BenchParameters
+    work_dir: Path
+    samples: list[BenchSample] = field(default_factory=list)
+
+    @contextmanager
+    def measure(self) -> Generator[None, None, None]:
+        from outer_scout.utils import collect_phase_timings
+
+        with collect_phase_timings() as phase_timings:
+            start_time = perf_counter()
+            yield
+            total = perf_counter() - start_time
+
+        self.samples.append(BenchSample(total, dict(phase_timings)))
+
+
+Benchmark = Callable[[BenchContext], None]
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    def decorator(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+@benchmark("send_keyframes")
+def bench_send_keyframes(bench: BenchContext):
+    from outer_scout.operators.record import RecordOperator
+
+    parameters = bench.parameters
+    context = bpy.context
+
+    for _ in range(parameters.repeat):
+        api_client = _prepare_send_keyframes(
+            context, objects=parameters.objects, cameras=parameters.cameras, frames=parameters.frames
+        )
+
+        with bench.measure():
+            # the method doesn't use the operator instance, which can't be created outside of bpy.ops
+            _run_async_steps(
+                RecordOperator._send_keyframes(None, context, api_client, _scene_frame_range(context))
+            ).unwrap()
+
+
+@benchmark("send_keyframes_scaling")
+def bench_send_keyframes_scaling(bench: BenchContext):
+    """Bakes the keyframes for each of the --scaling-objects counts. Each count is a phase of one sample,
+    so the phase medians show how the baking time grows with the number of objects"""
+
+    from outer_scout.operators.record import RecordOperator
+    from outer_scout.utils import collect_phase_timings
+
+    parameters = bench.parameters
+    context = bpy.context
+
+    for _ in range(parameters.repeat):
+        sample = BenchSample(total=0)
+
+        for object_count in parameters.scaling_objects:
+            api_client = _prepare_send_keyframes(
+                context, objects=object_count, cameras=parameters.cameras, frames=parameters.frames
+            )
+
+            with collect_phase_timings() as phase_timings:
+                _run_async_steps(
+                    RecordOperator._send_keyframes(None, context, api_client, _scene_frame_range(context))
+                ).unwrap()
+
+            bake_time = phase_timings["send_keyframes.bake"]
+            sample.phases[f"objects.{object_count:04}.bake"] = bake_time
+            sample.total += bake_time
+
+        bench.samples.append(sample)
+
+
+def _run_async_steps(generator: Generator):
+    """Runs a generator of AsyncOperator steps to the end, waiting for the yielded futures instead of events"""
+
+    sent_value = None
+
+    while True:
+        try:
+            yielded = generator.send(sent_value)
+        except StopIteration as stop:
+            return stop.value
+
+        sent_value = yielded.result() if isinstance(yielded, Future) else None
+
+
+def _scene_frame_range(context) -> range:
+    return range(context.scene.frame_start, context.scene.frame_end + 1)
+
+
+def _prepare_send_keyframes(context, *, objects: int, cameras: int, frames: int):
+    from outer_scout.api import APIClient, Transform
+    from outer_scout.operators.record import ORIGIN_OBJECT_NAME
+
+    scenes.reset_scene()
+    tracked_objects = scenes.build_recording_scene(context, objects=objects, cameras=cameras, frames=frames)
+
+    api_client = APIClient.from_context(context)
+    api_client.delete_scene().unwrap()
+    api_client.post_scene({"origin": {"parent": scenes.GROUND_BODY_NAME}, "hidePlayerModel": True}).unwrap()
+
+    with api_client.batch() as batch:
+        for tracked_object in tracked_objects:
+            api_client.post_object(
+                name=tracked_object.outer_scout_object.unity_object_name,
+                transform=Transform.from_matrix(tracked_object.matrix_world),
+                parent=ORIGIN_OBJECT_NAME,
+            )
+
+    batch.result.unwrap()
+
+    return api_client
+
+
+@benchmark("import_transform_recording")
+def bench_import_transform_recording(bench: BenchContext):
+    parameters = bench.parameters
+    context = bpy.context
+
+    recordings_dir = bench.work_dir / "recordings"
+    recordings_dir.mkdir(exist_ok=True)
+
+    recording_paths = [recordings_dir / f"object.{i}.json" for i in range(parameters.objects)]
+    for i, recording_path in enumerate(recording_paths):
+        scenes.write_transform_recording(recording_path, frames=parameters.frames, seed=i)
+
+    for _ in range(parameters.repeat):
+        scenes.reset_scene()
+
+        context.scene.frame_start = 1
+        context.scene.frame_end = parameters.frames
+
+        recorded_objects = []
+        for recording_path in recording_paths:
+            empty = bpy.data.objects.new(recording_path.stem, None)
+            empty.outer_scout_object.unity_object_name = empty.name
+            empty.outer_scout_object.transform_props.recording_path = str(recording_path)
+            context.scene.collection.objects.link(empty)
+            recorded_objects.append(empty)
+
+        with bench.measure():
+            for empty in recorded_objects:
+                context.view_layer.objects.active = empty
+                _run_operator(bpy.ops.outer_scout.import_transform_recording)
+
+
+@benchmark("import_transform_recording_scaling")
+def bench_import_transform_recording_scaling(bench: BenchContext):
+    """Imports one recording for each of the --scaling-frames lengths. Each length is a phase of one sample,
+    so the phase medians show how the import time grows with the recording length"""
+
+    _import_transform_recordings_scaling(bench, binary=False)
+
+
+@benchmark("import_transform_recording_binary_scaling")
+def bench_import_transform_recording_binary_scaling(bench: BenchContext):
+    """Same as import_transform_recording_scaling, with memory-mapped binary recordings"""
+
+    _import_transform_recordings_scaling(bench, binary=True)
+
+
+def _import_transform_recordings_scaling(bench: BenchContext, *, binary: bool):
+    parameters = bench.parameters
+    context = bpy.context
+
+    recordings_dir = bench.work_dir / "recordings"
+    recordings_dir.mkdir(exist_ok=True)
+
+    extension = "bin" if binary else "json"
+    recording_paths = {frames: recordings_dir / f"long.{frames}.{extension}" for frames in parameters.scaling_frames}
+    for frames, recording_path in recording_paths.items():
+        scenes.write_transform_recording(recording_path, frames=frames, binary=binary)
+
+    for _ in range(parameters.repeat):
+        sample = BenchSample(total=0)
+
+        for frames, recording_path in recording_paths.items():
+            scenes.reset_scene()
+
+            context.scene.frame_start = 1
+            context.scene.frame_end = frames
+
+            empty = bpy.data.objects.new(recording_path.stem, None)
+            empty.outer_scout_object.unity_object_name = empty.name
+            empty.outer_scout_object.transform_props.recording_path = str(recording_path)
+            context.scene.collection.objects.link(empty)
+            context.view_layer.objects.active = empty
+
+            start_time = perf_counter()
+            _run_operator(bpy.ops.outer_scout.import_transform_recording)
+            import_time = perf_counter() - start_time
+
+            sample.phases[f"frames.{frames:05}.import"] = import_time
+            sample.total += import_time
+
+        bench.samples.append(sample)
+
+
+@benchmark("import_assets")
+def bench_import_assets(bench: BenchContext):
+    """Imports --objects json recordings of the longest --scaling-frames length at once,
+    so the parse stage can run in worker processes"""
+
+    parameters = bench.parameters
+    context = bpy.context
+    frames = max(parameters.scaling_frames)
+
+    recordings_dir = bench.work_dir / "recordings"
+    recordings_dir.mkdir(exist_ok=True)
+
+    recording_paths = [recordings_dir / f"object.{i}.json" for i in range(parameters.objects)]
+    for i, recording_path in enumerate(recording_paths):
+        scenes.write_transform_recording(recording_path, frames=frames, seed=i)
+
+    for _ in range(parameters.repeat):
+        scenes.reset_scene()
+
+        context.scene.frame_start = 1
+        context.scene.frame_end = frames
+        context.scene.outer_scout_scene.origin_parent = scenes.GROUND_BODY_NAME
+
+        for recording_path in recording_paths:
+            empty = bpy.data.objects.new(recording_path.stem, None)
+            empty.outer_scout_object.unity_object_name = empty.name
+            empty.outer_scout_object.transform_props.recording_path = str(recording_path)
+            context.scene.collection.objects.link(empty)
+
+        with bench.measure():
+            _run_operator(bpy.ops.outer_scout.import_assets)
+
+
+@benchmark("load_json_transform_recording")
+def bench_load_json_transform_recording(bench: BenchContext):
+    """Loads a --streaming-frames long json recording with the streaming reader. The peak memory in bytes
+    is measured by tracemalloc in a separate load, because tracing slows the parsing down"""
+
+    from outer_scout.utils import load_json_transform_recording
+
+    recording_path = bench.work_dir / "streaming.json"
+    scenes.write_transform_recording(recording_path, frames=bench.parameters.streaming_frames)
+
+    for _ in range(bench.parameters.repeat):
+        with bench.measure():
+            load_json_transform_recording(str(recording_path))
+
+        tracemalloc.start()
+        try:
+            load_json_transform_recording(str(recording_path))
+            bench.samples[-1].peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def _bench_encode_keyframes(bench: BenchContext, *, columnar: bool):
+    """Encodes the baked tracks of --objects objects with --frames frames into the request bodies.
+    The payload size is the total number of body bytes. The peak memory in bytes is measured by tracemalloc
+    in a separate encode, because tracing slows the encoding down"""
+
+    from outer_scout.api import KeyframeTrack, encode_keyframes
+
+    parameters = bench.parameters
+
+    object_tracks = [
+        {prop: KeyframeTrack(1, values) for prop, values in tracks.items()}
+        for tracks in scenes.build_keyframe_tracks(objects=parameters.objects, frames=parameters.frames)
+    ]
+
+    def encode_payload() -> int:
+        # the json is encoded like the body of a Request
+        return sum(len(json.dumps(encode_keyframes(tracks, columnar=columnar)).encode()) for tracks in object_tracks)
+
+    for _ in range(parameters.repeat):
+        with bench.measure():
+            payload_size = encode_payload()
+
+        bench.samples[-1].payload_size = payload_size
+
+        tracemalloc.start()
+        try:
+            encode_payload()
+            bench.samples[-1].peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+@benchmark("encode_keyframes_dict")
+def bench_encode_keyframes_dict(bench: BenchContext):
+    _bench_encode_keyframes(bench, columnar=False)
+
+
+@benchmark("encode_keyframes_columnar")
+def bench_encode_keyframes_columnar(bench: BenchContext):
+    _bench_encode_keyframes(bench, columnar=True)
+
+
+def _bench_requests(bench: BenchContext, *, pooled: bool):
+    """Sends --requests small requests one after another, like the scene setup sends its objects.
+    Pooled requests reuse the keep-alive connections, the others open a new http.client connection each,
+    because the pool doesn't keep any idle ones. The "request" phase is the median latency of a request"""
+
+    from outer_scout.api.http import ConnectionPool, Request, RequestTimeout
+
+    parameters = bench.parameters
+    api_port = bpy.context.preferences.addons[ADDON_MODULE].preferences.api_port
+
+    request = Request(url=f"http://localhost:{api_port}/environment", method="GET", timeout=RequestTimeout(5, 5))
+
+    for _ in range(parameters.repeat):
+        pool = ConnectionPool() if pooled else ConnectionPool(max_idle_per_host=0)
+        latencies: list[float] = []
+
+        for _ in range(parameters.requests):
+            start_time = perf_counter()
+            response = request.send(pool)
+            latencies.append(perf_counter() - start_time)
+
+            if response is None or response.is_error:
+                raise RuntimeError("the mock server didn't respond")
+
+        pool.close_all()
+
+        bench.samples.append(BenchSample(total=sum(latencies), phases={"request": statistics.median(latencies)}))
+
+
+@benchmark("requests_pooled")
+def bench_requests_pooled(bench: BenchContext):
+    _bench_requests(bench, pooled=True)
+
+
+@benchmark("requests_new_connection")
+def bench_requests_new_connection(bench: BenchContext):
+    _bench_requests(bench, pooled=False)
+
+
+@benchmark("generate_body")
+def bench_generate_body(bench: BenchContext):
+    parameters = bench.parameters
+    context = bpy.context
+
+    bodies_folder = bench.work_dir / "bodies"
+    assets_folder = bench.work_dir / "extracted"
+
+    scenes.reset_scene()
+    scenes.build_body_assets(
+        context,
+        bodies_folder=bodies_folder,
+        assets_folder=assets_folder,
+        sectors=parameters.sectors,
+        assets_per_sector=parameters.assets_per_sector,
+        unique_assets=parameters.unique_assets,
+    )
+
+    preferences = context.preferences.addons[ADDON_MODULE].preferences
+    preferences.ow_bodies_folder = str(bodies_folder)
+    preferences.ow_assets_folder = str(assets_folder)
+
+    for _ in range(parameters.repeat):
+        scenes.reset_scene()
+
+        with bench.measure():
+            _run_operator(bpy.ops.outer_scout.generate_body, body_name=scenes.GROUND_BODY_NAME)
+
+
+@benchmark("generate_compositor_nodes")
+def bench_generate_compositor_nodes(bench: BenchContext):
+    parameters = bench.parameters
+    context = bpy.context
+
+    for _ in range(parameters.repeat):
+        scenes.reset_scene()
+        scenes.build_recording_scene(context, objects=0, cameras=parameters.cameras, frames=parameters.frames)
+
+        with bench.measure():
+            _run_operator(bpy.ops.outer_scout.generate_compositor_nodes)
+
+
+def _run_operator(operator, **kwargs):
+    if (result := operator(**kwargs)) != {"FINISHED"}:
+        raise RuntimeError(f"{operator.idname_py()} returned {result}")
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    return {
+        "min": min(values),
+        "median": statistics.median(values),
+        "mean": statistics.fmean(values),
+        "max": max(values),
+    }
+
+
+def summarize_samples(samples: list[BenchSample]) -> dict:
+    phase_names = sorted({phase_name for sample in samples for phase_name in sample.phases})
+
+    peak_memories = [sample.peak_memory for sample in samples if sample.peak_memory is not None]
+    payload_sizes = [sample.payload_size for sample in samples if sample.payload_size is not None]
+
+    return {
+        "total": summarize([sample.total for sample in samples]),
+        "phases": {
+            phase_name: summarize([sample.phases.get(phase_name, 0) for sample in samples])
+            for phase_name in phase_names
+        },
+        **({"peakMemory": summarize(peak_memories)} if peak_memories else {}),
+        **({"payloadSize": summarize(payload_sizes)} if payload_sizes else {}),
+        "samples": [asdict(sample) for sample in samples],
+    }
+
+
+def enable_addon(addons_dir: Path):
+    """Enables the add-on from the repository without installing it"""
+
+    (addons_dir / ADDON_MODULE).symlink_to(REPO_DIR / "src", target_is_directory=True)
+    sys.path.insert(0, str(addons_dir))
+
+    if addon_utils.enable(ADDON_MODULE, default_set=True) is None:
+        raise RuntimeError(f"failed to enable the {ADDON_MODULE} add-on")
+
+    addon_utils.enable("io_scene_fbx", default_set=True)
+
+
+def parse_args() -> argparse.Namespace:
+    # Blender passes its own arguments too, script arguments are after "--"
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--benchmarks", default=",".join(BENCHMARKS), help="comma separated benchmark names")
+    parser.add_argument("--objects", type=int, default=20, help="number of animated or recorded objects")
+    parser.add_argument(
+        "--scaling-objects", default="1,10,50,100", help="comma separated object counts of send_keyframes_scaling"
+    )
+    parser.add_argument(
+        "--scaling-frames",
+        default="1000,5000,10000",
+        help="comma separated recording lengths of the import_transform_recording scaling benchmarks",
+    )
+    parser.add_argument(
+        "--streaming-frames", type=int, default=100_000, help="recording length of load_json_transform_recording"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="number of sequential requests of the connection benchmarks"
+    )
+    parser.add_argument("--cameras", type=int, default=2)
+    parser.add_argument("--frames", type=int, default=250)
+    parser.add_argument("--sectors", type=int, default=8)
+    parser.add_argument("--assets-per-sector", type=int, default=64)
+    parser.add_argument("--unique-assets", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0, help="mock server latency in seconds")
+    parser.add_argument("--output", type=Path, default=None, help="results .json file, printed if not set")
+
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    parameters = BenchParameters(
+        objects=args.objects,
+        scaling_objects=[int(count) for count in args.scaling_objects.split(",") if count],
+        scaling_frames=[int(count) for count in args.scaling_frames.split(",") if count],
+        streaming_frames=args.streaming_frames,
+        requests=args.requests,
+        cameras=args.cameras,
+        frames=args.frames,
+        sectors=args.sectors,
+        assets_per_sector=args.assets_per_sector,
+        unique_assets=args.unique_assets,
+        repeat=args.repeat,
+        latency=args.latency,
+    )
+
+    benchmark_names = [name for name in args.benchmarks.split(",") if name]
+    if unknown_names := set(benchmark_names) - BENCHMARKS.keys():
+        raise ValueError(f"unknown benchmarks: {', '.join(sorted(unknown_names))}")
+
+    mock_server = MockServer(
+        MockServerConfig(
+            port=0,
+            latency=parameters.latency,
+            mesh_sectors=parameters.sectors,
+            mesh_assets_per_sector=parameters.assets_per_sector,
+            mesh_unique_assets=parameters.unique_assets,
+        )
+    )
+    mock_server.start()
+
+    results = {
+        "blenderVersion": bpy.app.version_string,
+        "pythonVersion": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": asdict(parameters),
+        "benchmarks": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="outer_scout_bench_") as temp_dir:
+        temp_dir = Path(temp_dir)
+
+        addons_dir = temp_dir / "addons"
+        addons_dir.mkdir()
+        enable_addon(addons_dir)
+
+        bpy.context.preferences.addons[ADDON_MODULE].preferences.api_port = mock_server.port
+
+        for name in benchmark_names:
+            work_dir = temp_dir / name
+            work_dir.mkdir()
+
+            print(f"[bench] {name}...")
+            bench = BenchContext(parameters, work_dir)
+            BENCHMARKS[name](bench)
+
+            results["benchmarks"][name] = summarize_samples(bench.samples)
+            print(f"[bench] {name}: {results['benchmarks'][name]['total']['median'] * 1000:.1f}ms median")
+
+        addon_utils.disable(ADDON_MODULE)
+
+    mock_server.shutdown()
+
+    results_json = json.dumps(results, indent=2)
+
+    if args.output is None:
+        print(results_json)
+    else:
+        args.output.write_text(results_json)
+        print(f"[bench] results are saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Synthetic scenes and asset fixtures for the benchmarks"""
+
+import json
+import random
+from math import radians
+from pathlib import Path
+
+import bpy
+from bpy.types import Context, Object
+from mock_server import mock_plain_mesh_path, mock_sector_path, mock_streamed_mesh_path
+
+GROUND_BODY_NAME = "TimberHearth_Body"
+
+TRANSFORM_TRACK_PROPERTIES = tuple(
+    f"transform.{field}.{axis}"
+    for field, axes in (("position", "xyz"), ("rotation", "wxyz"), ("scale", "xyz"))
+    for axis in axes
+)
+
+
+def reset_scene():
+    """Deletes everything the previous benchmark run has created, but keeps the add-on preferences"""
+    bpy.ops.wm.read_homefile(use_empty=True)
+
+
+def build_recording_scene(context: Context, *, objects: int, cameras: int, frames: int, seed=0) -> list[Object]:
+    """Creates animated cameras and replayed empties, like the ones that RecordOperator sends to the game"""
+
+    random_generator = random.Random(seed)
+
+    scene = context.scene
+    scene.frame_start = 1
+    scene.frame_end = frames
+
+    scene_props = scene.outer_scout_scene
+    scene_props.origin_parent = GROUND_BODY_NAME
+
+    tracked_objects: list[Object] = []
+
+    for camera_index in range(cameras):
+        camera = bpy.data.cameras.new(f"bench.camera.{camera_index}")
+        camera.outer_scout_camera.outer_scout_type = "PERSPECTIVE"
+
+        camera_object = bpy.data.objects.new(camera.name, camera)
+        camera_object.outer_scout_object.unity_object_name = camera.name
+        scene.collection.objects.link(camera_object)
+
+        _animate(camera_object, frames, random_generator)
+
+        camera.lens = 35
+        camera.keyframe_insert("lens", frame=1)
+        camera.lens = 50
+        camera.keyframe_insert("lens", frame=frames)
+
+        tracked_objects.append(camera_object)
+
+    for object_index in range(objects):
+        empty = bpy.data.objects.new(f"bench.object.{object_index}", None)
+        empty.outer_scout_object.unity_object_name = empty.name
+        empty.outer_scout_object.transform_props.mode = "APPLY"
+        scene.collection.objects.link(empty)
+
+        _animate(empty, frames, random_generator)
+
+        tracked_objects.append(empty)
+
+    return tracked_objects
+
+
+def _animate(object: Object, frames: int, random_generator: random.Random, *, keyframe_step=10):
+    object.rotation_mode = "QUATERNION"
+
+    for frame in range(1, frames + 1, keyframe_step):
+        object.location = [random_generator.uniform(-10, 10) for _ in range(3)]
+        object.rotation_euler = [radians(random_generator.uniform(-180, 180)) for _ in range(3)]
+        object.rotation_quaternion = object.rotation_euler.to_quaternion()
+        object.keyframe_insert("location", frame=frame)
+        object.keyframe_insert("rotation_quaternion", frame=frame)
+
+
+def build_keyframe_tracks(*, objects: int, frames: int, seed=0) -> list[dict[str, list[float]]]:
+    """Baked transform values of each object, like the tracks that RecordOperator encodes"""
+
+    random_generator = random.Random(seed)
+
+    object_tracks = []
+
+    for _ in range(objects):
+        tracks: dict[str, list[float]] = {}
+
+        for prop in TRANSFORM_TRACK_PROPERTIES:
+            # a random walk has the full float precision of the baked values, unlike constant or keyframed ones
+            value = random_generator.uniform(-100, 100)
+            values = []
+            for _ in range(frames):
+                value += random_generator.gauss(0, 0.1)
+                values.append(value)
+
+            tracks[prop] = values
+
+        object_tracks.append(tracks)
+
+    return object_tracks
+
+
+def write_transform_recording(file_path: Path, *, frames: int, seed=0, binary=False):
+    """Writes a file in the format of the mod transform recorder, json or binary"""
+
+    random_generator = random.Random(seed)
+
+    values = [
+        {
+            "position": [random_generator.uniform(-100, 100) for _ in range(3)],
+            "rotation": [0, 0, 0, 1],
+            "scale": [1, 1, 1],
+        }
+        for _ in range(frames)
+    ]
+
+    with open(file_path, "w") as recording_file:
+        json.dump({"values": values}, recording_file)
+
+    if binary:
+        from outer_scout.utils import convert_json_transform_recording
+
+        convert_json_transform_recording(str(file_path))
+
+
+def build_body_assets(
+    context: Context,
+    *,
+    bodies_folder: Path,
+    assets_folder: Path,
+    sectors: int,
+    assets_per_sector: int,
+    unique_assets: int,
+):
+    """Exports the .fbx body and the extracted .obj assets with the same paths as the mock server mesh"""
+
+    scene_collection = context.scene.collection
+
+    body = bpy.data.objects.new(GROUND_BODY_NAME, None)
+    scene_collection.objects.link(body)
+
+    for sector_index in range(sectors):
+        sector = bpy.data.objects.new(mock_sector_path(GROUND_BODY_NAME, sector_index).split("/")[-1], None)
+        sector.parent = body
+        scene_collection.objects.link(sector)
+
+        for asset_index in range(0, assets_per_sector, 2):
+            plain_mesh_name = mock_plain_mesh_path(GROUND_BODY_NAME, sector_index, asset_index).split("/")[-1]
+            plain_mesh = bpy.data.objects.new(plain_mesh_name, _cube_mesh(plain_mesh_name))
+            plain_mesh.parent = sector
+            scene_collection.objects.link(plain_mesh)
+
+    bodies_folder.mkdir(parents=True, exist_ok=True)
+    bpy.ops.export_scene.fbx(filepath=str(bodies_folder / f"{GROUND_BODY_NAME}.fbx"), use_selection=False)
+
+    reset_scene()
+
+    for asset_index in range(unique_assets):
+        asset_path = mock_streamed_mesh_path(GROUND_BODY_NAME, asset_index)
+        obj_path = assets_folder / (asset_path.removesuffix(".asset") + ".obj")
+        obj_path.parent.mkdir(parents=True, exist_ok=True)
+
+        streamed_mesh = bpy.data.objects.new(obj_path.stem, _cube_mesh(obj_path.stem))
+        context.scene.collection.objects.link(streamed_mesh)
+
+        bpy.ops.object.select_all(action="DESELECT")
+        streamed_mesh.select_set(True)
+        bpy.ops.wm.obj_export(filepath=str(obj_path), export_selected_objects=True, export_materials=False)
+
+    reset_scene()
+
+
+def _cube_mesh(name: str):
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(
+        [(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)],
+        [],
+        [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)],
+    )
+    return mesh
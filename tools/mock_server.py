@@ -0,0 +1,810 @@
+"""Stand-in for the Outer Scout mod API. Used for offline development and benchmarks.
+
+Implements the routes used by src/api/client.py with in-memory state, a synthetic recording
+progression and generated mesh payloads. Latency, throughput and failures can be injected.
+
+Usage: python tools/mock_server.py --port 2209 --latency 0.02 --failure-rate 0.05
+"""
+
+import argparse
+import base64
+import binascii
+import gzip
+import json
+import random
+import re
+import socket
+import struct
+import threading
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import makedirs, path
+from time import monotonic, sleep
+from typing import Any, Callable
+from urllib.parse import parse_qs, unquote, urlsplit
+
+API_VERSION = {"major": 0, "minor": 1, "patch": 0}
+
+ALL_FEATURES = (
+    "batch",
+    "recording-status-long-poll",
+    "columnar-keyframes",
+    "chunked-keyframes",
+    "gzip",
+    "binary-transform-recording",
+    "sparse-keyframes",
+)
+
+GZIP_RESPONSE_THRESHOLD = 1024
+
+ORIGIN_OBJECT_NAME = "scene.origin"
+
+# same layout as src/utils/transform_recording.py: magic, version, channel count, frame count, float32 records
+BINARY_TRANSFORM_RECORDING_HEADER = struct.Struct("<4sIII")
+
+
+@dataclass
+class MockServerConfig:
+    host: str = "127.0.0.1"
+    port: int = 2209
+    features: tuple[str, ...] = ALL_FEATURES
+    latency: float = 0
+    """Seconds added before every response"""
+    latency_jitter: float = 0
+    """Maximum random seconds added to the latency"""
+    throughput: int | None = None
+    """Response bytes per second. None means unlimited"""
+    failure_rate: float = 0
+    """Fraction of requests that get 503 Service Unavailable"""
+    drop_rate: float = 0
+    """Fraction of requests after which the connection is closed without a response"""
+    recording_fps: float = 120
+    """How many frames the synthetic recording progresses per second"""
+    mesh_sectors: int = 8
+    mesh_assets_per_sector: int = 64
+    mesh_unique_assets: int = 16
+    """Streamed meshes reuse this many different assets, as sectors in the game do"""
+    ground_body: str = "TimberHearth_Body"
+    seed: int | None = None
+
+
+@dataclass
+class MockRecording:
+    start_frame: int
+    end_frame: int
+    frame_rate: int
+    started_at: float
+    finished: bool = False
+
+    @property
+    def frame_count(self) -> int:
+        return self.end_frame - self.start_frame + 1
+
+
+@dataclass
+class MockObject:
+    name: str
+    transform: dict[str, Any]
+    camera: dict[str, Any] | None = None
+    recorders: list[dict[str, Any]] = field(default_factory=list)
+    keyframes: dict[str, list[float]] = field(default_factory=dict)
+    keyframe_start_frames: dict[str, int] = field(default_factory=dict)
+
+
+class MockAPIError(Exception):
+    status: HTTPStatus
+    detail: str | None
+
+    def __init__(self, status: HTTPStatus, detail: str | None = None):
+        super().__init__(detail or status.phrase)
+        self.status = status
+        self.detail = detail
+
+    def to_json(self) -> dict[str, str]:
+        problem = {"type": self.status.phrase.lower().replace(" ", "-"), "title": self.status.phrase}
+        if self.detail is not None:
+            problem["detail"] = self.detail
+        return problem
+
+
+MockResponse = tuple[HTTPStatus, Any | None]
+
+RouteHandler = Callable[..., MockResponse]
+
+
+class MockOuterScout:
+    """In-memory state of the game and the mod. Methods are called from the server threads"""
+
+    config: MockServerConfig
+
+    scene: dict[str, Any] | None
+    objects: dict[str, MockObject]
+    scene_keyframes: dict[str, list[float]]
+    scene_keyframe_start_frames: dict[str, int]
+    recording: MockRecording | None
+    request_count: int
+
+    _routes: list[tuple[str, re.Pattern, RouteHandler]]
+    _lock: threading.Lock
+    _recording_changed: threading.Condition
+
+    def __init__(self, config: MockServerConfig):
+        self.config = config
+
+        self.scene = None
+        self.objects = {}
+        self.scene_keyframes = {}
+        self.scene_keyframe_start_frames = {}
+        self.recording = None
+        self.request_count = 0
+
+        self._lock = threading.Lock()
+        self._recording_changed = threading.Condition(self._lock)
+        self._routes = [
+            ("GET", re.compile(r"api/version"), self._get_version),
+            ("GET", re.compile(r"environment"), self._get_environment),
+            ("POST", re.compile(r"batch"), self._post_batch),
+            ("POST", re.compile(r"scene"), self._post_scene),
+            ("DELETE", re.compile(r"scene"), self._delete_scene),
+            ("PUT", re.compile(r"scene/keyframes"), self._put_scene_keyframes),
+            ("POST", re.compile(r"scene/recording"), self._post_recording),
+            ("GET", re.compile(r"scene/recording/status"), self._get_recording_status),
+            ("GET", re.compile(r"scene/active-camera"), self._get_active_camera),
+            ("POST", re.compile(r"objects"), self._post_object),
+            ("GET", re.compile(r"objects/(?P<name>[^/]+)"), self._get_object),
+            ("PUT", re.compile(r"objects/(?P<name>[^/]+)"), self._put_object),
+            ("GET", re.compile(r"objects/(?P<name>[^/]+)/mesh"), self._get_object_mesh),
+            ("GET", re.compile(r"objects/(?P<name>[^/]+)/camera"), self._get_camera),
+            ("POST", re.compile(r"objects/(?P<name>[^/]+)/camera"), self._post_camera),
+            ("PUT", re.compile(r"objects/(?P<name>[^/]+)/camera"), self._put_camera),
+            ("POST", re.compile(r"objects/(?P<name>[^/]+)/recorders"), self._post_recorder),
+            ("PUT", re.compile(r"objects/(?P<name>[^/]+)/keyframes"), self._put_object_keyframes),
+            ("GET", re.compile(r"player/ground-body"), self._get_ground_body),
+            ("GET", re.compile(r"player/sectors"), self._get_player_sectors),
+            ("POST", re.compile(r"player/warp"), self._post_warp),
+        ]
+
+    def handle(self, method: str, route: str, query: dict[str, str], body: Any | None) -> MockResponse:
+        route = route.strip("/")
+
+        with self._lock:
+            self.request_count += 1
+
+        route_found = False
+        for route_method, route_pattern, handler in self._routes:
+            if (route_match := route_pattern.fullmatch(route)) is None:
+                continue
+
+            route_found = True
+            if route_method != method:
+                continue
+
+            try:
+                return handler(query=query, body=body, **{k: unquote(v) for k, v in route_match.groupdict().items()})
+            except MockAPIError as api_error:
+                return api_error.status, api_error.to_json()
+
+        if route_found:
+            return HTTPStatus.METHOD_NOT_ALLOWED, MockAPIError(HTTPStatus.METHOD_NOT_ALLOWED).to_json()
+
+        return HTTPStatus.NOT_FOUND, MockAPIError(HTTPStatus.NOT_FOUND, f"route {route} not found").to_json()
+
+    def _get_version(self, **_) -> MockResponse:
+        return HTTPStatus.OK, {**API_VERSION, "features": list(self.config.features)}
+
+    def _get_environment(self, **_) -> MockResponse:
+        return HTTPStatus.OK, {"outerWildsScene": "SolarSystem"}
+
+    def _post_batch(self, *, body: Any, **_) -> MockResponse:
+        self._require_feature("batch")
+
+        responses = []
+        for request in _require_field(body, "requests"):
+            status, response_body = self.handle(
+                request["method"], request["route"], request.get("query") or {}, request.get("body")
+            )
+            response = {"status": int(status)}
+            if response_body is not None:
+                response["body"] = response_body
+            responses.append(response)
+
+        return HTTPStatus.OK, {"responses": responses}
+
+    def _post_scene(self, *, body: Any, **_) -> MockResponse:
+        with self._lock:
+            if self.scene is not None:
+                raise MockAPIError(HTTPStatus.CONFLICT, "scene already exists")
+
+            self.scene = body or {}
+            self.objects = {ORIGIN_OBJECT_NAME: MockObject(ORIGIN_OBJECT_NAME, _require_field(body, "origin"))}
+            self.scene_keyframes = {}
+            self.scene_keyframe_start_frames = {}
+            self.recording = None
+
+        return HTTPStatus.CREATED, None
+
+    def _delete_scene(self, **_) -> MockResponse:
+        with self._lock:
+            self.scene = None
+            self.objects = {}
+            self.scene_keyframes = {}
+            self.scene_keyframe_start_frames = {}
+            self.recording = None
+            self._recording_changed.notify_all()
+
+        return HTTPStatus.OK, None
+
+    def _put_scene_keyframes(self, *, body: Any, **_) -> MockResponse:
+        keyframes = self._decode_keyframes(body)
+
+        with self._lock:
+            self._require_scene()
+            _store_keyframes(
+                self.scene_keyframes, self.scene_keyframe_start_frames, keyframes, merge=body.get("merge", False)
+            )
+
+        return HTTPStatus.OK, None
+
+    def _post_recording(self, *, body: Any, **_) -> MockResponse:
+        with self._lock:
+            self._require_scene()
+
+            if self.recording is not None and not self.recording.finished:
+                raise MockAPIError(HTTPStatus.CONFLICT, "recording is in progress")
+
+            self.recording = MockRecording(
+                start_frame=_require_field(body, "startFrame"),
+                end_frame=_require_field(body, "endFrame"),
+                frame_rate=_require_field(body, "frameRate"),
+                started_at=monotonic(),
+            )
+
+            if self.recording.frame_count <= 0:
+                self.recording = None
+                raise MockAPIError(HTTPStatus.BAD_REQUEST, "invalid frame range")
+
+        return HTTPStatus.CREATED, None
+
+    def _get_recording_status(self, *, query: dict[str, str], **_) -> MockResponse:
+        frames_recorded = query.get("framesRecorded")
+        timeout = float(query.get("timeout", 0))
+
+        if frames_recorded is not None:
+            self._require_feature("recording-status-long-poll")
+
+        deadline = monotonic() + timeout
+
+        with self._lock:
+            while True:
+                status = self._recording_status()
+                if status is None:
+                    raise MockAPIError(HTTPStatus.NOT_FOUND, "recording is not started")
+
+                remaining_time = deadline - monotonic()
+                if (
+                    frames_recorded is None
+                    or status["framesRecorded"] != int(frames_recorded)
+                    or not status["inProgress"]
+                    or remaining_time <= 0
+                ):
+                    return HTTPStatus.OK, status
+
+                # the synthetic recording advances with time, so there's nothing to be notified about
+                self._recording_changed.wait(min(remaining_time, 1 / self.config.recording_fps))
+
+    def _recording_status(self) -> dict[str, Any] | None:
+        recording = self.recording
+        if recording is None:
+            return None
+
+        frames_recorded = min(
+            recording.frame_count, int((monotonic() - recording.started_at) * self.config.recording_fps)
+        )
+
+        if frames_recorded == recording.frame_count and not recording.finished:
+            recording.finished = True
+            self._write_transform_recordings(recording)
+
+        return {
+            "inProgress": not recording.finished,
+            "startFrame": recording.start_frame,
+            "endFrame": recording.end_frame,
+            "currentFrame": recording.start_frame + frames_recorded,
+            "framesRecorded": frames_recorded,
+        }
+
+    def _write_transform_recordings(self, recording: MockRecording):
+        for mock_object in self.objects.values():
+            for recorder in mock_object.recorders:
+                if recorder["property"] != "transform":
+                    continue
+
+                values = [
+                    {
+                        "position": (frame * 0.01, 0, 0),
+                        "rotation": (0, 0, 0, 1),
+                        "scale": (1, 1, 1),
+                    }
+                    for frame in range(recording.frame_count)
+                ]
+
+                output_path = recorder["outputPath"]
+                makedirs(path.dirname(output_path) or ".", exist_ok=True)
+                if recorder.get("format") == "binary":
+                    _write_binary_transform_recording(output_path, values)
+                else:
+                    with open(output_path, "w") as output_file:
+                        json.dump({"values": values}, output_file)
+
+    def _get_active_camera(self, **_) -> MockResponse:
+        with self._lock:
+            # the mod switches to the first scene camera, otherwise the player camera is active
+            for mock_object in self.objects.values():
+                if mock_object.camera is not None:
+                    return HTTPStatus.OK, {"name": mock_object.name, "camera": mock_object.camera}
+
+        return HTTPStatus.OK, {"name": "PlayerCamera", "camera": {"type": "unity"}}
+
+    def _post_object(self, *, body: Any, **_) -> MockResponse:
+        name = _require_field(body, "name")
+
+        with self._lock:
+            self._require_scene()
+
+            if name in self.objects:
+                raise MockAPIError(HTTPStatus.CONFLICT, f"object {name} already exists")
+
+            self.objects[name] = MockObject(name, _require_field(body, "transform"))
+
+        return HTTPStatus.CREATED, None
+
+    def _get_object(self, *, name: str, **_) -> MockResponse:
+        with self._lock:
+            mock_object = self.objects.get(name)
+            transform = mock_object.transform if mock_object is not None else _synthetic_transform(name)
+
+        return HTTPStatus.OK, {"name": name, "transform": transform}
+
+    def _put_object(self, *, name: str, body: Any, **_) -> MockResponse:
+        with self._lock:
+            mock_object = self._require_object(name)
+            if (transform := (body or {}).get("transform")) is not None:
+                mock_object.transform = transform
+
+        return HTTPStatus.OK, None
+
+    def _get_object_mesh(self, *, name: str, query: dict[str, str], **_) -> MockResponse:
+        random_generator = random.Random(name)
+        ignore_paths = [ignore_path for ignore_path in query.get("ignorePaths", "").split(",") if ignore_path]
+
+        def mesh_asset(asset_path: str) -> dict[str, Any]:
+            return {
+                "path": asset_path,
+                "transform": {
+                    "position": tuple(random_generator.uniform(-500, 500) for _ in range(3)),
+                    "rotation": (0, 0, 0, 1),
+                    "scale": (1, 1, 1),
+                },
+            }
+
+        sectors = []
+        for sector_index in range(self.config.mesh_sectors):
+            sector_path = mock_sector_path(name, sector_index)
+            if any(ignore_path in sector_path for ignore_path in ignore_paths):
+                continue
+
+            asset_indices = range(self.config.mesh_assets_per_sector)
+            sectors.append(
+                {
+                    "path": sector_path,
+                    "plainMeshes": [
+                        mesh_asset(mock_plain_mesh_path(name, sector_index, asset_index))
+                        for asset_index in asset_indices[::2]
+                    ],
+                    "streamedMeshes": [
+                        mesh_asset(mock_streamed_mesh_path(name, asset_index % self.config.mesh_unique_assets))
+                        for asset_index in asset_indices[1::2]
+                    ],
+                }
+            )
+
+        body = {"name": name, "path": name, "transform": _synthetic_transform(name)}
+
+        return HTTPStatus.OK, {"body": body, "sectors": sectors}
+
+    def _get_camera(self, *, name: str, **_) -> MockResponse:
+        with self._lock:
+            mock_object = self._require_object(name)
+            if mock_object.camera is None:
+                raise MockAPIError(HTTPStatus.NOT_FOUND, f"object {name} doesn't have a camera")
+
+            return HTTPStatus.OK, mock_object.camera
+
+    def _post_camera(self, *, name: str, body: Any, **_) -> MockResponse:
+        camera_type = _require_field(body, "type")
+        if camera_type not in ("perspective", "equirectangular"):
+            raise MockAPIError(HTTPStatus.BAD_REQUEST, f"unknown camera type {camera_type}")
+
+        with self._lock:
+            mock_object = self._require_object(name)
+            if mock_object.camera is not None:
+                raise MockAPIError(HTTPStatus.CONFLICT, f"object {name} already has a camera")
+
+            mock_object.camera = body
+
+        return HTTPStatus.CREATED, None
+
+    def _put_camera(self, *, name: str, body: Any, **_) -> MockResponse:
+        with self._lock:
+            mock_object = self._require_object(name)
+            if mock_object.camera is None:
+                raise MockAPIError(HTTPStatus.NOT_FOUND, f"object {name} doesn't have a camera")
+
+            if (perspective := (body or {}).get("perspective")) is not None:
+                mock_object.camera["perspective"] = perspective
+
+        return HTTPStatus.OK, None
+
+    def _post_recorder(self, *, name: str, body: Any, **_) -> MockResponse:
+        _require_field(body, "property")
+        _require_field(body, "outputPath")
+
+        with self._lock:
+            self._require_object(name).recorders.append(body)
+
+        return HTTPStatus.CREATED, None
+
+    def _put_object_keyframes(self, *, name: str, body: Any, **_) -> MockResponse:
+        keyframes = self._decode_keyframes(body)
+
+        with self._lock:
+            mock_object = self._require_object(name)
+            _store_keyframes(
+                mock_object.keyframes, mock_object.keyframe_start_frames, keyframes, merge=body.get("merge", False)
+            )
+
+        return HTTPStatus.OK, None
+
+    def _get_ground_body(self, **_) -> MockResponse:
+        ground_body = self.config.ground_body
+        return HTTPStatus.OK, {"name": ground_body, "transform": _synthetic_transform(ground_body)}
+
+    def _get_player_sectors(self, **_) -> MockResponse:
+        sectors = [
+            {"name": f"Sector_{sector_index}", "id": f"{self.config.ground_body}/Sector_{sector_index}"}
+            for sector_index in range(min(self.config.mesh_sectors, 2))
+        ]
+        return HTTPStatus.OK, {"lastEntered": sectors[-1]["name"] if sectors else "", "sectors": sectors}
+
+    def _post_warp(self, *, body: Any, **_) -> MockResponse:
+        _require_field(body, "groundBody")
+        _require_field(body, "transform")
+        return HTTPStatus.OK, None
+
+    def _decode_keyframes(self, body: Any) -> dict[str, tuple[int, list[float]]]:
+        if body.get("merge", False):
+            self._require_feature("chunked-keyframes")
+
+        return _decode_keyframes(body, columnar_supported="columnar-keyframes" in self.config.features)
+
+    def _require_feature(self, feature: str):
+        if feature not in self.config.features:
+            raise MockAPIError(HTTPStatus.NOT_FOUND, f"feature {feature} is disabled")
+
+    def _require_scene(self):
+        if self.scene is None:
+            raise MockAPIError(HTTPStatus.NOT_FOUND, "scene is not created")
+
+    def _require_object(self, name: str) -> MockObject:
+        self._require_scene()
+        if (mock_object := self.objects.get(name)) is None:
+            raise MockAPIError(HTTPStatus.NOT_FOUND, f"object {name} not found")
+        return mock_object
+
+
+def mock_sector_path(body_name: str, sector_index: int) -> str:
+    return f"{body_name}/Sector_{sector_index}"
+
+
+def mock_plain_mesh_path(body_name: str, sector_index: int, asset_index: int) -> str:
+    """Path of a mesh that is a child of the body .fbx hierarchy"""
+    return f"{mock_sector_path(body_name, sector_index)}/Plain_{sector_index}_{asset_index}"
+
+
+def mock_streamed_mesh_path(body_name: str, asset_index: int) -> str:
+    """Path of a mesh that is imported from the extracted .obj assets"""
+    return f"Assets/Mesh/{body_name}/Streamed_{asset_index}.asset"
+
+
+def _require_field(body: Any, field_name: str) -> Any:
+    if not isinstance(body, dict) or field_name not in body:
+        raise MockAPIError(HTTPStatus.BAD_REQUEST, f"missing {field_name} field")
+    return body[field_name]
+
+
+def _synthetic_transform(name: str) -> dict[str, Any]:
+    random_generator = random.Random(name)
+    return {
+        "position": tuple(random_generator.uniform(-1000, 1000) for _ in range(3)),
+        "rotation": (0, 0, 0, 1),
+        "scale": (1, 1, 1),
+    }
+
+
+def _write_binary_transform_recording(output_path: str, values: list[dict[str, Any]]):
+    records = [
+        value for transform in values for field in ("position", "rotation", "scale") for value in transform[field]
+    ]
+
+    with open(output_path, "wb") as output_file:
+        output_file.write(BINARY_TRANSFORM_RECORDING_HEADER.pack(b"OSTR", 1, 10, len(values)))
+        output_file.write(struct.pack(f"<{len(records)}f", *records))
+
+
+def _decode_keyframes(body: Any, *, columnar_supported: bool) -> dict[str, tuple[int, list[float]]]:
+    """Returns the start frame and the values on each frame for every property"""
+
+    properties = _require_field(body, "properties")
+
+    if body.get("format") != "columnar":
+        return {
+            property_name: _interpolate_keyframes(animation["keyframes"])
+            for property_name, animation in properties.items()
+        }
+
+    if not columnar_supported:
+        raise MockAPIError(HTTPStatus.BAD_REQUEST, "columnar keyframes are not supported")
+
+    keyframes: dict[str, tuple[int, list[float]]] = {}
+
+    for property_name, animation in properties.items():
+        try:
+            values = base64.b64decode(animation["values"], validate=True)
+        except binascii.Error as decode_error:
+            raise MockAPIError(HTTPStatus.BAD_REQUEST, f"{property_name}: {decode_error}")
+
+        if len(values) % 4 != 0:
+            raise MockAPIError(HTTPStatus.BAD_REQUEST, f"{property_name}: values are not float32 array")
+
+        keyframes[property_name] = (int(animation.get("startFrame", 0)), list(memoryview(values).cast("f")))
+
+    return keyframes
+
+
+def _interpolate_keyframes(keyframes_json: dict[str, Any]) -> tuple[int, list[float]]:
+    """Expands sparse keyframes to one value per frame from the first keyframe to the last,
+    like a mod with the sparse-keyframes feature does"""
+
+    keyframes = sorted((int(frame), keyframe["value"]) for frame, keyframe in keyframes_json.items())
+    values: list[float] = []
+
+    for (frame, value), (next_frame, next_value) in zip(keyframes, keyframes[1:]):
+        values += (value + (next_value - value) * (i / (next_frame - frame)) for i in range(next_frame - frame))
+
+    if keyframes:
+        values.append(keyframes[-1][1])
+
+    return (keyframes[0][0] if keyframes else 0), values
+
+
+def _store_keyframes(
+    keyframes: dict[str, list[float]],
+    start_frames: dict[str, int],
+    new_keyframes: dict[str, tuple[int, list[float]]],
+    *,
+    merge: bool,
+):
+    """Replaces the values of the properties, or splices them into the existing values if merge is set.
+    Merged chunks must overlap or touch the existing frames, otherwise the mod would interpolate over the gap"""
+
+    for property_name, (start_frame, values) in new_keyframes.items():
+        if not merge or property_name not in keyframes:
+            keyframes[property_name] = values
+            start_frames[property_name] = start_frame
+            continue
+
+        existing_start_frame = start_frames[property_name]
+        existing_values = keyframes[property_name]
+        existing_end_frame = existing_start_frame + len(existing_values)
+        end_frame = start_frame + len(values)
+
+        if start_frame > existing_end_frame or end_frame < existing_start_frame:
+            raise MockAPIError(
+                HTTPStatus.BAD_REQUEST,
+                f"{property_name}: chunk {start_frame}..{end_frame - 1} is not adjacent to the existing keyframes",
+            )
+
+        merged_start_frame = min(start_frame, existing_start_frame)
+        merged_values = [0.0] * (max(end_frame, existing_end_frame) - merged_start_frame)
+        merged_values[existing_start_frame - merged_start_frame : existing_end_frame - merged_start_frame] = (
+            existing_values
+        )
+        merged_values[start_frame - merged_start_frame : end_frame - merged_start_frame] = values
+
+        keyframes[property_name] = merged_values
+        start_frames[property_name] = merged_start_frame
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    server: "MockServer"
+
+    def setup(self):
+        super().setup()
+        # small responses shouldn't wait for the client ACK
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_PUT(self):
+        self._handle()
+
+    def do_DELETE(self):
+        self._handle()
+
+    def log_message(self, format: str, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _handle(self):
+        config = self.server.config
+        random_generator = self.server.random_generator
+
+        body = self._read_body()
+
+        if config.latency > 0 or config.latency_jitter > 0:
+            sleep(config.latency + random_generator.uniform(0, config.latency_jitter))
+
+        if random_generator.random() < config.drop_rate:
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+
+        if random_generator.random() < config.failure_rate:
+            api_error = MockAPIError(HTTPStatus.SERVICE_UNAVAILABLE, "injected failure")
+            self._respond(api_error.status, api_error.to_json())
+            return
+
+        split_url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(split_url.query).items()}
+
+        try:
+            json_body = json.loads(body) if body else None
+        except json.JSONDecodeError as decode_error:
+            api_error = MockAPIError(HTTPStatus.BAD_REQUEST, f"invalid json body: {decode_error}")
+            self._respond(api_error.status, api_error.to_json())
+            return
+
+        status, response_body = self.server.outer_scout.handle(self.command, split_url.path, query, json_body)
+
+        self._respond(status, response_body)
+
+    def _read_body(self) -> bytes:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+
+        return body
+
+    def _respond(self, status: HTTPStatus, body: Any | None):
+        config = self.server.config
+
+        self.send_response(status)
+
+        encoded_body = b""
+        if body is not None:
+            encoded_body = json.dumps(body).encode()
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+
+            if (
+                "gzip" in config.features
+                and "gzip" in self.headers.get("Accept-Encoding", "")
+                and len(encoded_body) >= GZIP_RESPONSE_THRESHOLD
+            ):
+                encoded_body = gzip.compress(encoded_body, compresslevel=5)
+                self.send_header("Content-Encoding", "gzip")
+
+        self.send_header("Content-Length", str(len(encoded_body)))
+        self.end_headers()
+
+        if config.throughput is None:
+            self.wfile.write(encoded_body)
+            return
+
+        chunk_size = max(1, config.throughput // 100)
+        for chunk_start in range(0, len(encoded_body), chunk_size):
+            chunk = encoded_body[chunk_start : chunk_start + chunk_size]
+            self.wfile.write(chunk)
+            self.wfile.flush()
+            sleep(len(chunk) / config.throughput)
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    config: MockServerConfig
+    outer_scout: MockOuterScout
+    random_generator: random.Random
+    verbose: bool
+
+    def __init__(self, config: MockServerConfig, *, verbose=False):
+        self.config = config
+        self.outer_scout = MockOuterScout(config)
+        self.random_generator = random.Random(config.seed)
+        self.verbose = verbose
+
+        super().__init__((config.host, config.port), MockRequestHandler)
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> threading.Thread:
+        """Serves in a background thread. Stop it with shutdown()"""
+        thread = threading.Thread(target=self.serve_forever, name="outer_scout_mock_server", daemon=True)
+        thread.start()
+        return thread
+
+
+def parse_args(args: list[str] | None = None) -> tuple[MockServerConfig, bool]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2209, help="0 picks a free port")
+    parser.add_argument(
+        "--features",
+        default=",".join(ALL_FEATURES),
+        help="comma separated optional API features. Empty string emulates an old mod version",
+    )
+    parser.add_argument("--latency", type=float, default=0, help="seconds added before every response")
+    parser.add_argument("--latency-jitter", type=float, default=0, help="maximum random seconds added to the latency")
+    parser.add_argument("--throughput", type=int, default=None, help="response bytes per second")
+    parser.add_argument("--failure-rate", type=float, default=0, help="fraction of requests that get 503")
+    parser.add_argument("--drop-rate", type=float, default=0, help="fraction of connections closed without response")
+    parser.add_argument("--recording-fps", type=float, default=120, help="synthetic recording speed")
+    parser.add_argument("--mesh-sectors", type=int, default=8)
+    parser.add_argument("--mesh-assets-per-sector", type=int, default=64)
+    parser.add_argument("--mesh-unique-assets", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=None, help="seed of the injected failures")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+
+    parsed_args = parser.parse_args(args)
+
+    config = MockServerConfig(
+        host=parsed_args.host,
+        port=parsed_args.port,
+        features=tuple(feature for feature in parsed_args.features.split(",") if feature),
+        latency=parsed_args.latency,
+        latency_jitter=parsed_args.latency_jitter,
+        throughput=parsed_args.throughput,
+        failure_rate=parsed_args.failure_rate,
+        drop_rate=parsed_args.drop_rate,
+        recording_fps=parsed_args.recording_fps,
+        mesh_sectors=parsed_args.mesh_sectors,
+        mesh_assets_per_sector=parsed_args.mesh_assets_per_sector,
+        mesh_unique_assets=parsed_args.mesh_unique_assets,
+        seed=parsed_args.seed,
+    )
+
+    return config, parsed_args.verbose
+
+
+def main():
+    config, verbose = parse_args()
+
+    with MockServer(config, verbose=verbose) as server:
+        print(f"Outer Scout mock server is listening at http://{config.host}:{server.port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()